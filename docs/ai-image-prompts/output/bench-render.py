@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Render-backend benchmark
+Renders the same deck with every available backend (render_backends.py) and compares them
+
+Each backend runs in a fresh process that starts it, renders every slide
+of the deck to PNG and to PDF, then prints the whole deck as one PDF
+(slide_deck.py). Reported per backend:
+
+    startup     seconds from start() until the backend can render
+    ms/page     mean PNG and PDF latency per slide, readiness wait included
+    deck        seconds for the single-call deck PDF
+    peak RSS    highest combined RSS of the worker and every process it
+                started (browser, GPU and renderer processes), above the
+                worker's own baseline; sampled from /proc, so Linux only
+    output      total PNG, PDF and deck PDF bytes
+
+Usage:
+    python bench-render.py                              # aidd-exact-style-slides, every backend
+    python bench-render.py --deck maxiality-style-slides --backends chrome playwright
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+
+from render_backends import available_backends, get_backend, load_plugins, tree_rss
+from slide_deck import deck_html_file
+
+class PeakSampler(threading.Thread):
+    """Samples tree_rss of this process every `interval` seconds and keeps the peak"""
+
+    def __init__(self, interval=0.02):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.peak = max(self.peak, tree_rss(os.getpid()))
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        self.peak = max(self.peak, tree_rss(os.getpid()))
+        return self.peak
+
+def worker(name, deck_dir):
+    """Child process: benchmark one backend and print the result as JSON"""
+    html_files = sorted(Path(deck_dir).glob("slide-*.html"), key=lambda path: int(path.stem.split("-")[-1]))
+    result = {"backend": name, "pages": len(html_files), "errors": []}
+    baseline = tree_rss(os.getpid())
+    sampler = PeakSampler()
+    sampler.start()
+    with tempfile.TemporaryDirectory() as out_dir:
+        start = time.perf_counter()
+        try:
+            backend = get_backend(name, log=lambda message: result["errors"].append(message))
+        except Exception as e:
+            result["errors"].append(str(e))
+            sampler.stop()
+            print(json.dumps(result))
+            return
+        result["startup"] = time.perf_counter() - start
+        try:
+            for fmt in backend.formats:
+                jobs = [(html_file, Path(out_dir) / f"{html_file.stem}.{fmt}") for html_file in html_files]
+                start = time.perf_counter()
+                results = backend.render_batch(jobs)
+                result[f"{fmt}_ms"] = 1000 * (time.perf_counter() - start) / len(jobs)
+                result["errors"].extend(f"{Path(path).name}: {error}" for path, error in results if error)
+                result[f"{fmt}_bytes"] = sum(path.stat().st_size for _, path in jobs if path.exists())
+            if "pdf" in backend.formats:
+                deck_pdf = Path(out_dir) / "deck.pdf"
+                with deck_html_file(html_files) as deck_file:
+                    start = time.perf_counter()
+                    try:
+                        backend.render_pdf(deck_file, deck_pdf, css_page_size=True)
+                        result["deck_s"] = time.perf_counter() - start
+                        result["deck_bytes"] = deck_pdf.stat().st_size
+                    except Exception as e:
+                        result["errors"].append(f"deck: {e}")
+        finally:
+            backend.close()
+    result["peak_bytes"] = sampler.stop() - baseline
+    print(json.dumps(result))
+
+def _cell(result, key, unit, fmt):
+    """result[key] / unit formatted with fmt, or a right-aligned "-" when the backend did not produce it"""
+    if key not in result:
+        return "-".rjust(len(fmt.format(0)))
+    return fmt.format(result[key] / unit)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare render backends on one slide deck")
+    parser.add_argument("--deck", default="aidd-exact-style-slides", help="folder with slide-N.html files")
+    parser.add_argument("--backends", nargs="+", choices=load_plugins(), help="default: every available backend")
+    parser.add_argument("--worker", nargs=2, metavar=("BACKEND", "DECK"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(*args.worker)
+        return 0
+
+    if not any(Path(args.deck).glob("slide-*.html")):
+        print(f"❌ No slide-N.html files in '{args.deck}'")
+        return 1
+    names = args.backends or available_backends()
+    if not names:
+        print("❌ No render backend is installed (Chrome, Playwright, Selenium, wkhtmltopdf or html2image)")
+        return 1
+
+    print(f"🧪 Rendering {args.deck} with: {', '.join(names)}")
+    print(f"{'Backend':<12} {'Startup':>8} {'PNG ms/page':>12} {'PDF ms/page':>12} {'Deck PDF':>9} "
+          f"{'Peak RSS':>9} {'PNG KB':>8} {'PDF KB':>8} {'Deck KB':>8}")
+    print("-" * 96)
+    failures = 0
+    for name in names:
+        completed = subprocess.run([sys.executable, __file__, "--worker", name, args.deck],
+                                   capture_output=True, text=True)
+        lines = completed.stdout.strip().splitlines()
+        try:
+            result = json.loads(lines[-1])
+        except (IndexError, ValueError):
+            result = {"errors": [completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else
+                                 f"worker exited with {completed.returncode}"]}
+        print(f"{name:<12} {_cell(result, 'startup', 1, '{:>7.2f}s')} {_cell(result, 'png_ms', 1, '{:>12.0f}')} "
+              f"{_cell(result, 'pdf_ms', 1, '{:>12.0f}')} {_cell(result, 'deck_s', 1, '{:>8.2f}s')} "
+              f"{_cell(result, 'peak_bytes', 1024 * 1024, '{:>7.0f}MB')} {_cell(result, 'png_bytes', 1024, '{:>8.0f}')} "
+              f"{_cell(result, 'pdf_bytes', 1024, '{:>8.0f}')} {_cell(result, 'deck_bytes', 1024, '{:>8.0f}')}")
+        for error in result.get("errors", []):
+            print(f"   ⚠️  {error}")
+        failures += "startup" not in result
+    return 1 if failures == len(names) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Peak-memory benchmark for slide screenshot processing
+Compares peak RSS of slide_images.py with the old open/crop/resize as the slide count grows
+
+Each run happens in a fresh process that turns the same 2400x2400 "full
+window" screenshot (a 1200x1200 viewport at 2x) into N 1080x1080 slides and
+reports its peak RSS:
+
+    naive    open → crop → LANCZOS resize → save, as capture_slide used to
+    bounded  slide_images.SlideWriter (one-pass crop+resize, reused
+             buffer; JPEG draft decode with --format jpeg)
+
+Usage:
+    python bench-slide-memory.py                     # 6, 24 and 96 slides
+    python bench-slide-memory.py --slides 6 60 600 --format jpeg
+"""
+
+import sys
+import json
+import time
+import argparse
+import resource
+import subprocess
+import tempfile
+from pathlib import Path
+
+from PIL import Image, ImageDraw
+
+from slide_images import SLIDE_SIZE, SlideWriter
+
+FRAME_SIZE = (2400, 2400)
+SLIDE_BOX = 2000   # slide edge in the frame at 2x
+
+def make_screenshot(path, fmt):
+    """A busy 2x screenshot (gradient plus shapes) that compresses like a real slide"""
+    image = Image.linear_gradient("L").resize(FRAME_SIZE).convert("RGB")
+    draw = ImageDraw.Draw(image)
+    for i in range(0, FRAME_SIZE[0], 48):
+        draw.rectangle((i, (i * 7) % FRAME_SIZE[1], i + 40, (i * 7) % FRAME_SIZE[1] + 300),
+                       fill=((i * 3) % 256, (i * 5) % 256, (i * 11) % 256))
+        draw.text((i, i), "AI-Driven Development", fill=(255, 255, 255))
+    if fmt == "png":
+        image.convert("RGBA").save(path, "PNG", compress_level=1)
+    else:
+        image.save(path, "JPEG", quality=92)
+
+def slide_box(index):
+    """Where slide index sits in the frame (it moves as the page scrolls)"""
+    top = (index * 97) % (FRAME_SIZE[1] - SLIDE_BOX)
+    return (200, top, 200 + SLIDE_BOX, top + SLIDE_BOX)
+
+def run_naive(screenshot, slides, out_dir):
+    for index in range(slides):
+        full_image = Image.open(screenshot)
+        slide_image = full_image.crop(slide_box(index))
+        slide_image = slide_image.resize(SLIDE_SIZE, Image.LANCZOS)
+        slide_image.save(out_dir / f"slide-{index % 6 + 1}.png", "PNG", optimize=True)
+
+def run_bounded(screenshot, slides, out_dir):
+    writer = SlideWriter()
+    for index in range(slides):
+        writer.process(screenshot, out_dir / f"slide-{index % 6 + 1}.png", slide_box(index))
+
+def worker(mode, screenshot, slides):
+    """Child process: process the slides and print peak RSS as JSON"""
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    with tempfile.TemporaryDirectory() as out_dir:
+        start = time.perf_counter()
+        (run_naive if mode == "naive" else run_bounded)(screenshot, slides, Path(out_dir))
+        elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"baseline_kb": baseline, "peak_kb": peak, "elapsed": elapsed}))
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare peak RSS of naive and bounded slide processing")
+    parser.add_argument("--slides", type=int, nargs="+", default=[6, 24, 96], help="slide counts to run")
+    parser.add_argument("--format", choices=("png", "jpeg"), default="png", help="screenshot format")
+    parser.add_argument("--modes", nargs="+", choices=("naive", "bounded"), default=["naive", "bounded"])
+    parser.add_argument("--worker", nargs=3, metavar=("MODE", "SCREENSHOT", "SLIDES"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        mode, screenshot, slides = args.worker
+        worker(mode, screenshot, int(slides))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        screenshot = Path(tmp) / f"frame.{args.format}"
+        make_screenshot(screenshot, args.format)
+        print(f"🧪 {FRAME_SIZE[0]}x{FRAME_SIZE[1]} {args.format.upper()} screenshot "
+              f"({screenshot.stat().st_size // 1024} KB) → {SLIDE_SIZE[0]}x{SLIDE_SIZE[1]} slides")
+        print(f"{'Mode':<10} {'Slides':>7} {'Peak RSS':>10} {'Above base':>11} {'ms/slide':>9}")
+        print("-" * 52)
+        for mode in args.modes:
+            for slides in args.slides:
+                output = subprocess.run([sys.executable, __file__, "--worker", mode, str(screenshot), str(slides)],
+                                        capture_output=True, text=True, check=True).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                print(f"{mode:<10} {slides:>7} {result['peak_kb'] / 1024:>8.0f}MB "
+                      f"{(result['peak_kb'] - result['baseline_kb']) / 1024:>9.0f}MB "
+                      f"{1000 * result['elapsed'] / slides:>9.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Minimal Chrome DevTools Protocol client over --remote-debugging-pipe
+Drives headless Chrome directly, so scripts can wait for real page readiness and get PDFs/PNGs back as bytes
+
+Chrome reads NUL-terminated JSON commands from fd 3 and writes responses and
+events to fd 4. No websocket library, driver binary or debugging port is
+needed, only the Chrome executable: CHROME_PATH, else the first of
+google-chrome/chromium/... on PATH, the macOS app, or a Chromium that
+Playwright or Puppeteer downloaded (see find_chrome).
+
+    with ChromePipe() as chrome:
+        session = chrome.new_page(1080, 1080)
+        chrome.navigate(session, "file:///.../slide-1.html")
+        pdf_bytes = chrome.print_to_pdf(session)
+"""
+
+import os
+import json
+import time
+import base64
+import glob
+import fcntl
+import select
+import shutil
+import tempfile
+import subprocess
+
+MAC_CHROME = "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"
+CHROME_NAMES = ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome",
+                "chrome-headless-shell")
+DOWNLOADED_CHROMES = (
+    "~/.cache/ms-playwright/chromium-*/chrome-linux*/chrome",
+    "~/.cache/ms-playwright/chromium_headless_shell-*/chrome-headless-shell-linux64/chrome-headless-shell",
+    "~/.cache/ms-playwright/chromium_headless_shell-*/chrome-linux/headless_shell",
+    "~/.cache/puppeteer/chrome/*/chrome-linux64/chrome",
+    "~/.cache/puppeteer/chrome-headless-shell/*/chrome-headless-shell-linux64/chrome-headless-shell",
+)
+
+def find_chrome():
+    """Path of a Chrome/Chromium executable, or None when there is none"""
+    if os.getenv("CHROME_PATH"):
+        return os.getenv("CHROME_PATH")
+    for name in CHROME_NAMES:
+        if shutil.which(name):
+            return shutil.which(name)
+    if os.path.exists(MAC_CHROME):
+        return MAC_CHROME
+    for pattern in DOWNLOADED_CHROMES:
+        found = sorted(glob.glob(os.path.expanduser(pattern)), reverse=True)  # newest version first
+        if found:
+            return found[0]
+    return None
+
+CHROME_PATH = find_chrome() or MAC_CHROME
+DEFAULT_TIMEOUT = 30.0
+
+class CDPError(RuntimeError):
+    """Chrome answered a command with an error, exited, or did not answer in time"""
+
+class ChromePipe:
+    """One headless Chrome process and the pipe used to drive it"""
+
+    def __init__(self, chrome_path=None, args=()):
+        self.chrome_path = chrome_path or CHROME_PATH
+        self.args = list(args)
+        if hasattr(os, "geteuid") and os.geteuid() == 0:
+            self.args.append("--no-sandbox")  # Chrome refuses to start as root with its sandbox
+        self.process = None
+        self._next_id = 0
+        self._buffer = b""
+        self._events = []
+        self._targets = {}
+        self._profile = None
+
+    def launch(self):
+        if not os.path.exists(self.chrome_path):
+            raise CDPError(f"Chrome not found at {self.chrome_path} (set CHROME_PATH)")
+        self._profile = tempfile.mkdtemp(prefix="chrome-cdp-")
+        # Chrome reads commands from fd 3 and writes to fd 4. Move our ends above
+        # the low fds first so the dup2 calls in the child cannot clobber each other.
+        command_read, command_write = os.pipe()
+        reply_read, reply_write = os.pipe()
+        child_read = fcntl.fcntl(command_read, fcntl.F_DUPFD, 10)
+        child_write = fcntl.fcntl(reply_write, fcntl.F_DUPFD, 10)
+        os.close(command_read)
+        os.close(reply_write)
+
+        def attach_pipe():
+            os.dup2(child_read, 3)
+            os.dup2(child_write, 4)
+
+        self.process = subprocess.Popen(
+            [self.chrome_path, "--headless", "--disable-gpu", "--remote-debugging-pipe",
+             "--no-first-run", "--no-default-browser-check", f"--user-data-dir={self._profile}",
+             *self.args, "about:blank"],
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            pass_fds=(3, 4), preexec_fn=attach_pipe)
+        os.close(child_read)
+        os.close(child_write)
+        self._writer = command_write
+        self._reader = reply_read
+        return self
+
+    def close(self):
+        if self.process:
+            try:
+                self.send("Browser.close", timeout=5)
+            except CDPError:
+                pass
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+            os.close(self._writer)
+            os.close(self._reader)
+            self.process = None
+        if self._profile:
+            shutil.rmtree(self._profile, ignore_errors=True)
+            self._profile = None
+
+    def __enter__(self):
+        return self.launch()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _read_message(self, deadline):
+        """Next message from Chrome, or CDPError once deadline (a perf_counter time) passes"""
+        while b"\0" not in self._buffer:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0 or not select.select([self._reader], [], [], remaining)[0]:
+                raise CDPError("timed out waiting for Chrome")
+            chunk = os.read(self._reader, 1 << 16)
+            if not chunk:
+                raise CDPError("Chrome closed the DevTools pipe")
+            self._buffer += chunk
+        message, self._buffer = self._buffer.split(b"\0", 1)
+        return json.loads(message)
+
+    def send(self, method, params=None, session_id=None, timeout=DEFAULT_TIMEOUT):
+        """Send one command and return its result; events that arrive meanwhile are kept for wait_for_event"""
+        self._next_id += 1
+        message = {"id": self._next_id, "method": method, "params": params or {}}
+        if session_id:
+            message["sessionId"] = session_id
+        os.write(self._writer, json.dumps(message).encode() + b"\0")
+        deadline = time.perf_counter() + timeout
+        while True:
+            reply = self._read_message(deadline)
+            if reply.get("id") == self._next_id:
+                if "error" in reply:
+                    raise CDPError(f"{method}: {reply['error'].get('message')}")
+                return reply.get("result", {})
+            if "method" in reply:
+                self._events.append(reply)
+
+    def wait_for_event(self, method, session_id=None, timeout=DEFAULT_TIMEOUT):
+        """Block until event `method` arrives for session_id; returns its params"""
+        deadline = time.perf_counter() + timeout
+        while True:
+            for event in self._events:
+                if event["method"] == method and event.get("sessionId") == session_id:
+                    self._events.remove(event)
+                    return event.get("params", {})
+            self._events.append(self._read_message(deadline))
+
+    def new_page(self, width=1080, height=1080, scale=1):
+        """Open a tab with the given viewport; returns its session id"""
+        target = self.send("Target.createTarget", {"url": "about:blank"})["targetId"]
+        session_id = self.send("Target.attachToTarget", {"targetId": target, "flatten": True})["sessionId"]
+        self.send("Page.enable", session_id=session_id)
+        self.send("Emulation.setDeviceMetricsOverride",
+                  {"width": width, "height": height, "deviceScaleFactor": scale, "mobile": False},
+                  session_id=session_id)
+        self._targets[session_id] = target
+        return session_id
+
+    def close_page(self, session_id):
+        self.send("Target.closeTarget", {"targetId": self._targets.pop(session_id)})
+
+    def navigate(self, session_id, url, timeout=DEFAULT_TIMEOUT):
+        """Load url and wait for its load event"""
+        self._events = [event for event in self._events if event.get("sessionId") != session_id]
+        result = self.send("Page.navigate", {"url": url}, session_id=session_id, timeout=timeout)
+        if result.get("errorText"):
+            raise CDPError(f"could not load {url}: {result['errorText']}")
+        self.wait_for_event("Page.loadEventFired", session_id, timeout=timeout)
+
+    def evaluate(self, session_id, expression, timeout=DEFAULT_TIMEOUT):
+        """Evaluate expression in the page (awaiting a returned promise); returns its JSON value"""
+        result = self.send("Runtime.evaluate", {"expression": expression, "awaitPromise": True,
+                                                "returnByValue": True}, session_id=session_id, timeout=timeout)
+        if "exceptionDetails" in result:
+            raise CDPError(f"script failed: {result['exceptionDetails'].get('text')}")
+        return result["result"].get("value")
+
+    def print_to_pdf(self, session_id, timeout=DEFAULT_TIMEOUT, **options):
+        """PDF of the page as bytes (options are Page.printToPDF parameters)"""
+        params = {"printBackground": True, "marginTop": 0, "marginBottom": 0,
+                  "marginLeft": 0, "marginRight": 0, **options}
+        return base64.b64decode(self.send("Page.printToPDF", params, session_id=session_id, timeout=timeout)["data"])
+
+    def screenshot(self, session_id, clip=None, fmt="png", timeout=DEFAULT_TIMEOUT):
+        """Screenshot as bytes; clip is {x, y, width, height, scale} in CSS pixels"""
+        params = {"format": fmt, "captureBeyondViewport": clip is not None}
+        if clip:
+            params["clip"] = {"scale": 1, **clip}
+        return base64.b64decode(self.send("Page.captureScreenshot", params, session_id=session_id, timeout=timeout)["data"])
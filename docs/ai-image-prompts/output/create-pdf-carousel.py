@@ -2,57 +2,61 @@
 """
 Convert HTML slides to PDF for LinkedIn carousel upload
 Creates individual PDFs and a combined PDF document
+
+Modes:
+    deck    (default) one wkhtmltopdf run over a document holding every
+            slide on its own 1080x1080 page (see slide_deck.py)
+    slides  one PDF per slide, merged with pdftk afterwards
+
+wkhtmltopdf is driven through render_backends.py (the wkhtmltopdf backend).
 """
 
 import os
+import argparse
 import subprocess
 import sys
 from pathlib import Path
 
-def check_dependencies():
-    """Check if required dependencies are available"""
-    dependencies = {
-        'wkhtmltopdf': 'brew install wkhtmltopdf',
-        'pdftk': 'brew install pdftk-java'
-    }
-    
-    missing = []
-    for cmd, install_cmd in dependencies.items():
-        try:
-            subprocess.run([cmd, '--version'], capture_output=True, check=True)
-            print(f"✅ {cmd} is installed")
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            print(f"❌ {cmd} is not installed")
-            print(f"   Install with: {install_cmd}")
-            missing.append(cmd)
-    
-    return len(missing) == 0
+from render_backends import RenderError, get_backend
+from slide_deck import deck_html_file
 
-def convert_html_to_pdf(html_file, pdf_file):
-    """Convert a single HTML file to PDF using wkhtmltopdf"""
-    cmd = [
-        'wkhtmltopdf',
-        '--page-size', 'A4',
-        '--orientation', 'Portrait',
-        '--margin-top', '0',
-        '--margin-bottom', '0',
-        '--margin-left', '0',
-        '--margin-right', '0',
-        '--disable-smart-shrinking',
-        '--zoom', '0.75',  # Adjust zoom to fit content better
-        html_file,
-        pdf_file
-    ]
-    
+def check_dependencies(need_pdftk=True):
+    """Check that pdftk, used to merge per-slide PDFs, is available"""
+    if not need_pdftk:
+        return True
+    try:
+        subprocess.run(['pdftk', '--version'], capture_output=True, check=True)
+        print("✅ pdftk is installed")
+        return True
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        print("❌ pdftk is not installed")
+        print("   Install with: brew install pdftk-java")
+        return False
+
+def convert_html_to_pdf(backend, html_file, pdf_file, css_page_size=False):
+    """
+    Convert a single HTML file to PDF with the wkhtmltopdf backend.
+
+    wkhtmltopdf prints once the page script sets window.status (images
+    loaded and window.__slideReady, see slide_readiness.py); a page that
+    never gets there is given up on after the deadline. css_page_size
+    prints on 1080x1080 pages (wkhtmltopdf ignores @page, so the backend
+    passes the size itself).
+    """
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        backend.render_pdf(html_file, pdf_file, css_page_size=css_page_size)
         print(f"✅ Created {pdf_file}")
         return True
-    except subprocess.CalledProcessError as e:
+    except RenderError as e:
         print(f"❌ Failed to create {pdf_file}")
-        print(f"   Error: {e.stderr}")
+        print(f"   Error: {e}")
         return False
 
+def convert_deck_to_pdf(backend, html_files, pdf_file):
+    """Render every slide into pdf_file with a single wkhtmltopdf run"""
+    with deck_html_file(html_files) as deck_file:
+        return convert_html_to_pdf(backend, deck_file, pdf_file, css_page_size=True)
+
 def combine_pdfs(pdf_files, output_file):
     """Combine multiple PDFs into one using pdftk"""
     cmd = ['pdftk'] + pdf_files + ['cat', 'output', output_file]
@@ -68,10 +72,15 @@ def combine_pdfs(pdf_files, output_file):
 
 def main():
     """Main function to convert HTML slides to PDF"""
+    parser = argparse.ArgumentParser(description="Convert HTML carousel slides to PDF with wkhtmltopdf")
+    parser.add_argument("--mode", choices=("deck", "slides"), default="deck",
+                        help="deck: one wkhtmltopdf run for the whole carousel (default); slides: per-slide PDFs + pdftk")
+    args = parser.parse_args()
+    
     print("🔄 Converting HTML slides to PDF...")
     
-    # Check dependencies
-    if not check_dependencies():
+    # Check dependencies (pdftk is only needed to merge per-slide PDFs)
+    if not check_dependencies(need_pdftk=args.mode == "slides"):
         print("\n💡 Please install missing dependencies and try again")
         return 1
     
@@ -103,13 +112,28 @@ def main():
     
     print(f"📄 Found {len(html_files)} slides to convert")
     
+    try:
+        backend = get_backend("wkhtmltopdf", fmt="pdf")
+    except RenderError as e:
+        print(f"❌ {e}")
+        print("   Install with: brew install wkhtmltopdf")
+        return 1
+    
+    combined_pdf = f"{output_dir}/ai-development-insights-carousel.pdf"
+    if args.mode == "deck":
+        if not convert_deck_to_pdf(backend, html_files, combined_pdf):
+            return 1
+        print(f"\n🎉 LinkedIn carousel PDF ready: {combined_pdf}")
+        print("   • Each slide is one 1080x1080 page; upload it as a 'Document' post")
+        return 0
+    
     # Convert each HTML to PDF
     pdf_files = []
     for html_file in html_files:
         slide_name = os.path.basename(html_file).replace('.html', '')
         pdf_file = f"{output_dir}/{slide_name}.pdf"
         
-        if convert_html_to_pdf(html_file, pdf_file):
+        if convert_html_to_pdf(backend, html_file, pdf_file):
             pdf_files.append(pdf_file)
     
     if not pdf_files:
@@ -119,7 +143,6 @@ def main():
     print(f"\n✅ Successfully created {len(pdf_files)} individual PDFs")
     
     # Combine all PDFs into one
-    combined_pdf = f"{output_dir}/ai-development-insights-carousel.pdf"
     if combine_pdfs(pdf_files, combined_pdf):
         print(f"\n🎉 LinkedIn carousel PDF ready: {combined_pdf}")
         print("\n💡 Upload options:")
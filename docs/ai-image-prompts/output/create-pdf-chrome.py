@@ -2,56 +2,53 @@
 """
 Simple PDF generator using Chrome headless mode
 Creates PDFs from HTML slides for LinkedIn carousel
+
+Modes:
+    deck    (default) one carousel PDF, every slide on its own 1080x1080
+            page, printed in a single call (see slide_deck.py)
+    slides  one PDF per slide
+
+Rendering goes through render_backends.py: headless Chrome over the DevTools
+pipe by default, or any other backend with --backend.
 """
 
 import os
-import subprocess
 import sys
+import time
+import argparse
 from pathlib import Path
 
-def create_pdf_with_chrome(html_file, pdf_file):
-    """Create PDF using Chrome headless mode"""
-    cmd = [
-        '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
-        '--headless',
-        '--disable-gpu',
-        '--run-all-compositor-stages-before-draw',
-        '--virtual-time-budget=5000',
-        '--print-to-pdf=' + pdf_file,
-        '--print-to-pdf-no-header',
-        '--disable-pdf-tagging',
-        '--no-pdf-header-footer',
-        '--no-margins',
-        html_file
-    ]
-    
+from render_backends import RenderError, get_backend, load_plugins
+from slide_deck import deck_html_file
+
+def create_pdf_with_chrome(backend, html_file, pdf_file, css_page_size=False):
+    """
+    Create PDF with a started render backend (headless Chrome by default).
+
+    Printing starts as soon as the slide is ready (fonts, images, network,
+    animations, window.__slideReady; see slide_readiness.py) rather than after
+    a fixed virtual-time budget; css_page_size uses the document's @page size
+    instead of the default paper.
+    """
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-        if os.path.exists(pdf_file):
-            print(f"✅ Created {pdf_file}")
-            return True
-        else:
-            print(f"❌ Failed to create {pdf_file}")
-            if result.stderr:
-                print(f"   Error: {result.stderr}")
-            return False
-    except subprocess.TimeoutExpired:
-        print(f"⏰ Timeout creating {pdf_file}")
-        return False
+        start = time.perf_counter()
+        backend.render_pdf(html_file, pdf_file, css_page_size=css_page_size)
+        print(f"✅ Created {pdf_file} ({time.perf_counter() - start:.1f}s)")
+        return True
     except Exception as e:
-        print(f"❌ Error creating {pdf_file}: {e}")
+        print(f"❌ Failed to create {pdf_file}: {e}")
         return False
 
 def main():
     """Main function to convert HTML slides to PDF"""
-    print("🔄 Converting HTML slides to PDF using Chrome...")
+    parser = argparse.ArgumentParser(description="Convert HTML carousel slides to PDF with headless Chrome")
+    parser.add_argument("--mode", choices=("deck", "slides"), default="deck",
+                        help="deck: one carousel PDF in one print call (default); slides: one PDF per slide")
+    parser.add_argument("--backend", choices=load_plugins(), default="chrome",
+                        help="render backend (default: chrome; see render_backends.py)")
+    args = parser.parse_args()
     
-    # Check if Chrome is available
-    chrome_path = '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome'
-    if not os.path.exists(chrome_path):
-        print("❌ Google Chrome not found at expected location")
-        print("   Please install Google Chrome or update the path in the script")
-        return 1
+    print(f"🔄 Converting HTML slides to PDF using {args.backend}...")
     
     # Define paths
     slides_dir = "aidd-exact-style-slides"
@@ -81,17 +78,38 @@ def main():
     
     print(f"📄 Found {len(html_files)} slides to convert")
     
-    # Convert each HTML to PDF
-    pdf_files = []
-    for html_file in html_files:
-        slide_name = os.path.basename(html_file).replace('.html', '')
-        pdf_file = os.path.abspath(f"{output_dir}/{slide_name}.pdf")
-        html_file_abs = os.path.abspath(html_file)
-        
-        print(f"🔄 Converting {html_file} -> {slide_name}.pdf")
+    try:
+        backend = get_backend(args.backend, fmt="pdf")
+    except RenderError as e:
+        print(f"❌ {e}")
+        if args.backend == "chrome":
+            print("   Please install Google Chrome or set CHROME_PATH")
+        return 1
+    
+    with backend:
+        if args.mode == "deck":
+            combined_pdf = os.path.abspath(f"{output_dir}/ai-development-insights-carousel.pdf")
+            start = time.perf_counter()
+            with deck_html_file(html_files) as deck_file:
+                if not create_pdf_with_chrome(backend, deck_file, combined_pdf, css_page_size=True):
+                    return 1
+            print(f"⏱️  Rendered {len(html_files)} slides as one document in {time.perf_counter() - start:.1f}s")
+            print(f"\n🎉 LinkedIn carousel PDF ready: {combined_pdf}")
+            print("   • Each slide is one 1080x1080 page; upload it with 'Add media' → 'Upload document'")
+            return 0
         
-        if create_pdf_with_chrome(f"file://{html_file_abs}", pdf_file):
-            pdf_files.append(pdf_file)
+        # Convert each HTML to PDF in one browser
+        pdf_files = []
+        start = time.perf_counter()
+        for html_file in html_files:
+            slide_name = os.path.basename(html_file).replace('.html', '')
+            pdf_file = os.path.abspath(f"{output_dir}/{slide_name}.pdf")
+            
+            print(f"🔄 Converting {html_file} -> {slide_name}.pdf")
+            
+            if create_pdf_with_chrome(backend, html_file, pdf_file):
+                pdf_files.append(pdf_file)
+        print(f"⏱️  Rendered {len(pdf_files)} slides in {time.perf_counter() - start:.1f}s")
     
     if not pdf_files:
         print("❌ No PDFs were created successfully")
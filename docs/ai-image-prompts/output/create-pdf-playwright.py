@@ -2,65 +2,69 @@
 """
 Convert HTML slides to PDF using Playwright (modern alternative)
 Creates individual PDFs and a combined PDF document for LinkedIn carousel
+
+Modes:
+    deck    (default) every slide on its own 1080x1080 page of one document,
+            printed with a single page.pdf call (see slide_deck.py)
+    slides  one PDF per slide, merged with PyPDF2 afterwards
+
+The pages are driven with Playwright's async API so several slides render
+at once; detection and browser launch options are shared with the
+playwright backend in render_backends.py (PLAYWRIGHT_CHROMIUM_PATH).
 """
 
 import os
 import sys
+import time
+import argparse
 import subprocess
 from pathlib import Path
 import asyncio
 
+from render_backends import PlaywrightBackend
+from slide_deck import deck_html_file
+from slide_images import write_atomic
+from slide_readiness import DEFAULT_DEADLINE, wait_until_ready_playwright
+
+DEFAULT_PARALLELISM = 4  # pages rendering at once in the shared browser
+
 def check_playwright():
     """Check if playwright is available and install if needed"""
-    try:
-        import playwright
+    if PlaywrightBackend.available():
         print("✅ Playwright is available")
         return True
-    except ImportError:
-        print("❌ Playwright not found, installing...")
-        try:
-            subprocess.run([sys.executable, '-m', 'pip', 'install', 'playwright'], check=True)
-            subprocess.run([sys.executable, '-m', 'playwright', 'install', 'chromium'], check=True)
-            print("✅ Playwright installed successfully")
-            return True
-        except subprocess.CalledProcessError as e:
-            print(f"❌ Failed to install Playwright: {e}")
-            return False
+    print("❌ Playwright not found, installing...")
+    try:
+        subprocess.run([sys.executable, '-m', 'pip', 'install', 'playwright'], check=True)
+        subprocess.run([sys.executable, '-m', 'playwright', 'install', 'chromium'], check=True)
+        print("✅ Playwright installed successfully")
+        return True
+    except subprocess.CalledProcessError as e:
+        print(f"❌ Failed to install Playwright: {e}")
+        return False
 
-async def convert_html_to_pdf_playwright(html_file, pdf_file):
-    """Convert HTML to PDF using Playwright"""
+async def convert_html_to_pdf_playwright(page, html_file, pdf_file, deadline=DEFAULT_DEADLINE):
+    """Convert HTML to PDF on an already open Playwright page"""
     try:
-        from playwright.async_api import async_playwright
+        # Load the HTML file
+        file_url = f"file://{os.path.abspath(html_file)}"
+        await page.goto(file_url)
+        
+        # Wait until fonts, images, network and animations have settled
+        await wait_until_ready_playwright(page, deadline, name=os.path.basename(html_file))
+        
+        # Generate PDF with specific settings for LinkedIn
+        write_atomic(pdf_file, await page.pdf(
+            format='A4',
+            print_background=True,
+            margin={
+                'top': '0px',
+                'bottom': '0px',
+                'left': '0px',
+                'right': '0px'
+            }
+        ))
         
-        async with async_playwright() as p:
-            browser = await p.chromium.launch()
-            page = await browser.new_page()
-            
-            # Set viewport for LinkedIn carousel (square format)
-            await page.set_viewport_size({"width": 1080, "height": 1080})
-            
-            # Load the HTML file
-            file_url = f"file://{os.path.abspath(html_file)}"
-            await page.goto(file_url)
-            
-            # Wait for any animations or loading
-            await page.wait_for_timeout(1000)
-            
-            # Generate PDF with specific settings for LinkedIn
-            await page.pdf(
-                path=pdf_file,
-                format='A4',
-                print_background=True,
-                margin={
-                    'top': '0px',
-                    'bottom': '0px',
-                    'left': '0px',
-                    'right': '0px'
-                }
-            )
-            
-            await browser.close()
-            
         print(f"✅ Created {pdf_file}")
         return True
         
@@ -68,6 +72,60 @@ async def convert_html_to_pdf_playwright(html_file, pdf_file):
         print(f"❌ Failed to create {pdf_file}: {e}")
         return False
 
+async def convert_slides_to_pdf_playwright(jobs, parallelism=DEFAULT_PARALLELISM, deadline=DEFAULT_DEADLINE):
+    """
+    Render (html_file, pdf_file) jobs with one Chromium and a pool of pages.
+
+    Up to `parallelism` slides render at once; each page is reused for the
+    next slide once it is free, and prints as soon as its slide is ready
+    (at most `deadline` seconds after loading). Returns the PDFs created,
+    in job order.
+    """
+    from playwright.async_api import async_playwright
+    
+    async with async_playwright() as p:
+        start = time.perf_counter()
+        browser = await p.chromium.launch(**PlaywrightBackend.launch_options())
+        print(f"🚀 Chromium started in {time.perf_counter() - start:.1f}s")
+        try:
+            # Pool of pages with the LinkedIn carousel viewport (square format)
+            pages = asyncio.Queue()
+            for _ in range(max(1, min(parallelism, len(jobs)))):
+                pages.put_nowait(await browser.new_page(viewport={"width": 1080, "height": 1080}))
+            
+            async def render(html_file, pdf_file):
+                page = await pages.get()
+                try:
+                    return await convert_html_to_pdf_playwright(page, html_file, pdf_file, deadline)
+                finally:
+                    pages.put_nowait(page)
+            
+            results = await asyncio.gather(*(render(html_file, pdf_file) for html_file, pdf_file in jobs))
+        finally:
+            await browser.close()
+    
+    return [pdf_file for (_, pdf_file), ok in zip(jobs, results) if ok]
+
+async def convert_deck_to_pdf_playwright(html_files, pdf_file, deadline=DEFAULT_DEADLINE):
+    """Print every slide into pdf_file with one page.pdf call; True on success"""
+    from playwright.async_api import async_playwright
+    
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(**PlaywrightBackend.launch_options())
+        try:
+            page = await browser.new_page(viewport={"width": 1080, "height": 1080})
+            with deck_html_file(html_files) as deck_file:
+                await page.goto(f"file://{deck_file}")
+                await wait_until_ready_playwright(page, deadline, name="deck")
+                write_atomic(pdf_file, await page.pdf(print_background=True, prefer_css_page_size=True))
+            print(f"✅ Created {pdf_file}")
+            return True
+        except Exception as e:
+            print(f"❌ Failed to create {pdf_file}: {e}")
+            return False
+        finally:
+            await browser.close()
+
 def combine_pdfs_pypdf(pdf_files, output_file):
     """Combine PDFs using PyPDF2"""
     try:
@@ -104,7 +162,7 @@ def combine_pdfs_pypdf(pdf_files, output_file):
         print(f"❌ Failed to combine PDFs: {e}")
         return False
 
-async def main():
+async def main(args):
     """Main async function to convert HTML slides to PDF"""
     print("🔄 Converting HTML slides to PDF using Playwright...")
     
@@ -113,8 +171,8 @@ async def main():
         return 1
     
     # Define paths
-    slides_dir = "aidd-exact-style-slides"
-    output_dir = "pdf-output"
+    slides_dir = args.slides_dir
+    output_dir = args.output_dir
     
     # Create output directory
     os.makedirs(output_dir, exist_ok=True)
@@ -140,14 +198,25 @@ async def main():
     
     print(f"📄 Found {len(html_files)} slides to convert")
     
-    # Convert each HTML to PDF
-    pdf_files = []
+    combined_pdf = f"{output_dir}/ai-development-insights-carousel.pdf"
+    if args.mode == "deck":
+        start = time.perf_counter()
+        if not await convert_deck_to_pdf_playwright(html_files, combined_pdf, args.deadline):
+            return 1
+        print(f"⏱️  Rendered {len(html_files)} slides as one document in {time.perf_counter() - start:.1f}s")
+        print(f"\n🎉 LinkedIn carousel PDF ready: {combined_pdf}")
+        print("   • Each slide is one 1080x1080 page; upload it as a 'Document' post")
+        return 0
+    
+    # Convert every HTML slide to PDF in one browser
+    jobs = []
     for html_file in html_files:
         slide_name = os.path.basename(html_file).replace('.html', '')
-        pdf_file = f"{output_dir}/{slide_name}.pdf"
-        
-        if await convert_html_to_pdf_playwright(html_file, pdf_file):
-            pdf_files.append(pdf_file)
+        jobs.append((html_file, f"{output_dir}/{slide_name}.pdf"))
+    
+    start = time.perf_counter()
+    pdf_files = await convert_slides_to_pdf_playwright(jobs, args.parallel, args.deadline)
+    print(f"⏱️  Rendered {len(pdf_files)} slides in {time.perf_counter() - start:.1f}s (parallelism: {args.parallel})")
     
     if not pdf_files:
         print("❌ No PDFs were created successfully")
@@ -156,7 +225,6 @@ async def main():
     print(f"\n✅ Successfully created {len(pdf_files)} individual PDFs")
     
     # Combine all PDFs into one
-    combined_pdf = f"{output_dir}/ai-development-insights-carousel.pdf"
     if combine_pdfs_pypdf(pdf_files, combined_pdf):
         print(f"\n🎉 LinkedIn carousel PDF ready: {combined_pdf}")
         print("\n💡 Upload options:")
@@ -175,7 +243,16 @@ async def main():
 
 def run_main():
     """Wrapper to run async main function"""
-    return asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Convert HTML carousel slides to PDF with Playwright")
+    parser.add_argument("--slides-dir", default="aidd-exact-style-slides", help="folder with slide-N.html files")
+    parser.add_argument("--output-dir", default="pdf-output", help="where the PDFs are written")
+    parser.add_argument("--mode", choices=("deck", "slides"), default="deck",
+                        help="deck: one document in one print call (default); slides: per-slide PDFs, then merge")
+    parser.add_argument("--parallel", type=int, default=DEFAULT_PARALLELISM,
+                        help=f"slides mode: slides rendered at once in the shared browser (default: {DEFAULT_PARALLELISM})")
+    parser.add_argument("--deadline", type=float, default=DEFAULT_DEADLINE,
+                        help=f"max seconds to wait for a slide to be ready (default: {DEFAULT_DEADLINE:g})")
+    return asyncio.run(main(parser.parse_args()))
 
 if __name__ == "__main__":
     sys.exit(run_main())
\ No newline at end of file
@@ -6,10 +6,14 @@ Generate high-quality LinkedIn carousel images from HTML
 
 import os
 import time
+import base64
 from pathlib import Path
+
+from render_backends import RenderError, get_backend
+from slide_images import SLIDE_SIZE, SlideWriter
+from slide_readiness import wait_until_ready_selenium
+
 try:
-    from selenium import webdriver
-    from selenium.webdriver.chrome.options import Options
     from selenium.webdriver.common.by import By
     from selenium.webdriver.support.ui import WebDriverWait
     from selenium.webdriver.support import expected_conditions as EC
@@ -17,68 +21,53 @@ except ImportError:
     print("❌ Selenium not installed. Install with: pip install selenium")
     exit(1)
 
+# Pixels per CSS pixel in the captures; slides are then scaled to SLIDE_SIZE
+DEVICE_SCALE = float(os.getenv("SLIDE_DEVICE_SCALE", 2))
+
 def setup_driver():
-    """Setup Chrome driver for high-quality screenshots"""
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--window-size=1200,1200")
-    chrome_options.add_argument("--force-device-scale-factor=2")  # High DPI
-    
+    """Start Chrome through the selenium render backend for high-quality screenshots; None when it cannot"""
     try:
-        driver = webdriver.Chrome(options=chrome_options)
-        return driver
-    except Exception as e:
+        # 1200x1200 window at DEVICE_SCALE (High DPI)
+        return get_backend("selenium", window_size=(1200, 1200), device_scale=DEVICE_SCALE)
+    except RenderError as e:
         print(f"❌ Chrome driver setup failed: {e}")
         print("💡 Install ChromeDriver: brew install chromedriver")
         return None
 
-def capture_slide(driver, slide_index):
+def capture_element_png(driver, element):
+    """
+    PNG bytes of element, straight from Chrome's compositor into memory.
+
+    The clip is in CSS pixels; Chrome renders it at the page's own
+    devicePixelRatio, so no scale factor has to be assumed, and
+    captureBeyondViewport means the element need not be scrolled into view.
+    Drivers without CDP fall back to Selenium's element screenshot.
+    """
+    rect = driver.execute_script(
+        "const r = arguments[0].getBoundingClientRect();"
+        "return {x: r.left + window.scrollX, y: r.top + window.scrollY,"
+        " width: r.width, height: r.height, dpr: window.devicePixelRatio};", element)
+    if not hasattr(driver, "execute_cdp_cmd"):
+        return element.screenshot_as_png, rect["dpr"]
+    clip = {name: rect[name] for name in ("x", "y", "width", "height")}
+    result = driver.execute_cdp_cmd("Page.captureScreenshot", {
+        "format": "png", "captureBeyondViewport": True, "clip": {**clip, "scale": 1}})
+    return base64.b64decode(result["data"]), rect["dpr"]
+
+def capture_slide(driver, slide_index, writer):
     """Capture a specific slide as PNG"""
     try:
         # Find the specific slide
         slide = driver.find_element(By.CSS_SELECTOR, f".slide-{slide_index + 1}")
         
-        # Scroll to slide
-        driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", slide)
-        time.sleep(1)  # Wait for scroll animation
-        
-        # Get slide position and size
-        location = slide.location
-        size = slide.size
+        # Capture just the slide, in memory
+        png_bytes, scale = capture_element_png(driver, slide)
         
-        # Take screenshot of full page
-        driver.save_screenshot(f"temp_full_{slide_index + 1}.png")
-        
-        # Crop to slide using PIL
-        from PIL import Image
-        
-        # Open full screenshot
-        full_image = Image.open(f"temp_full_{slide_index + 1}.png")
-        
-        # Calculate crop box (account for device scale factor)
-        scale_factor = 2
-        left = location['x'] * scale_factor
-        top = location['y'] * scale_factor
-        right = left + (size['width'] * scale_factor)
-        bottom = top + (size['height'] * scale_factor)
-        
-        # Crop to slide
-        slide_image = full_image.crop((left, top, right, bottom))
-        
-        # Resize to LinkedIn optimized size (1080x1080)
-        slide_image = slide_image.resize((1080, 1080), Image.Resampling.LANCZOS)
-        
-        # Save final slide
+        # Resize to LinkedIn optimized size (1080x1080) from the in-memory PNG
         output_path = f"slide-{slide_index + 1}-html.png"
-        slide_image.save(output_path, "PNG", quality=95, optimize=True)
-        
-        # Cleanup temp file
-        os.remove(f"temp_full_{slide_index + 1}.png")
+        writer.process(png_bytes, output_path, size=SLIDE_SIZE)
         
-        print(f"✅ Slide {slide_index + 1} saved: {output_path}")
+        print(f"✅ Slide {slide_index + 1} saved: {output_path} (captured at {scale:g}x)")
         return True
         
     except Exception as e:
@@ -98,9 +87,10 @@ def main():
     
     # Setup WebDriver
     print("🔧 Setting up Chrome WebDriver...")
-    driver = setup_driver()
-    if not driver:
+    backend = setup_driver()
+    if not backend:
         return
+    driver = backend.driver
     
     try:
         # Load HTML file
@@ -113,19 +103,21 @@ def main():
             EC.presence_of_element_located((By.CLASS_NAME, "carousel-slide"))
         )
         
-        # Give time for fonts and styling to load
-        time.sleep(3)
+        # Wait for fonts, images, network and animations instead of a fixed pause
+        start = time.perf_counter()
+        wait_until_ready_selenium(driver, name=html_file.name)
+        print(f"⏱️  Page ready in {time.perf_counter() - start:.1f}s")
         
         print("📸 Capturing slides...")
         
         successful_captures = 0
         total_slides = 6
+        writer = SlideWriter()  # one reusable encode buffer for every slide
         
         for i in range(total_slides):
             print(f"\n🎯 Capturing slide {i + 1}/{total_slides}...")
-            if capture_slide(driver, i):
+            if capture_slide(driver, i, writer):
                 successful_captures += 1
-            time.sleep(1)  # Brief pause between captures
         
         print("\n" + "=" * 50)
         print(f"📊 Results: {successful_captures}/{total_slides} slides captured")
@@ -145,7 +137,7 @@ def main():
         print(f"❌ Screenshot generation failed: {e}")
         
     finally:
-        driver.quit()
+        backend.close()
         print("🔧 WebDriver closed")
 
 if __name__ == "__main__":
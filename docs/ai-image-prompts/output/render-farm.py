@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Multi-process render farm for slide decks
+Renders many decks at once with a pool of workers, each keeping one warm browser
+
+The decks' pages (PNG and/or PDF per slide, plus the single-call deck PDF
+from slide_deck.py) go on one shared work queue. Every worker process
+starts a render backend once (render_backends.py, --backend or whichever
+is installed) and keeps taking the next job until the queue is empty, so
+a slow slide never holds up the others and results are printed the moment
+they finish. Deck PDFs, the longest jobs, are queued first.
+
+After every job a worker checks the RSS of its browser process tree; above
+--max-worker-mb it closes the browser and starts a fresh one. A browser
+that fails a job is restarted the same way. A worker whose backend fails
+to start MAX_START_FAILURES times in a row stops taking jobs; if every
+worker has stopped, the jobs still queued are reported as not rendered.
+
+The default number of workers is one per core, limited to what fits in
+available memory at --max-worker-mb each.
+
+Usage:
+    python render-farm.py                                   # the three style decks
+    python render-farm.py aidd-style-slides maxiality-style-slides --formats png --workers 4
+    python render-farm.py --jsonl > results.jsonl           # one JSON result per line
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import argparse
+import multiprocessing
+from pathlib import Path
+
+from render_backends import get_backend, tree_rss
+from slide_deck import deck_html_file
+
+DEFAULT_DECKS = ("aidd-style-slides", "aidd-exact-style-slides", "maxiality-style-slides")
+DEFAULT_OUTPUT_DIR = "render-farm-output"
+DEFAULT_MAX_WORKER_MB = 1024
+MAX_START_FAILURES = 3  # consecutive backend start failures before a worker gives up
+FORMATS = ("deck", "pdf", "png")
+
+def memory_available():
+    """Bytes of memory available for new processes (None when unknown)"""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+def default_workers(max_worker_mb):
+    """One worker per core, but no more than fit in available memory"""
+    workers = os.cpu_count() or 1
+    available = memory_available()
+    if available:
+        workers = min(workers, available // (max_worker_mb * 1024 * 1024))
+    return max(1, workers)
+
+def slide_files(deck_dir):
+    return sorted(Path(deck_dir).glob("slide-*.html"), key=lambda path: int(path.stem.split("-")[-1]))
+
+def plan_jobs(decks, formats, output_dir):
+    """(job id, format, html files, output path) for every deck; deck PDFs first"""
+    jobs = []
+    for fmt in FORMATS:
+        if fmt not in formats:
+            continue
+        for deck in decks:
+            html_files = slide_files(deck)
+            deck_out = Path(output_dir) / Path(deck).name
+            if fmt == "deck":
+                jobs.append((fmt, [str(path) for path in html_files], str(deck_out) + ".pdf"))
+            else:
+                jobs.extend((fmt, [str(path)], str(deck_out / f"{path.stem}.{fmt}")) for path in html_files)
+    return [(job_id, *job) for job_id, job in enumerate(jobs)]
+
+def render_job(backend, fmt, html_files, output_path):
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    if fmt == "deck":
+        with deck_html_file(html_files) as deck_file:
+            backend.render_pdf(deck_file, output_path, css_page_size=True)
+    elif fmt == "pdf":
+        backend.render_pdf(html_files[0], output_path)
+    else:
+        backend.render_png(html_files[0], output_path)
+
+def worker(worker_id, backend_name, max_worker_bytes, jobs, results):
+    """Worker process: keep one browser warm and render jobs until the None sentinel"""
+    backend = None
+    restarts = start_failures = 0
+    for job_id, fmt, html_files, output_path in iter(jobs.get, None):
+        start = time.perf_counter()
+        error = None
+        try:
+            if backend is None:
+                try:
+                    backend = get_backend(backend_name, fmt="pdf" if fmt == "deck" else fmt, log=lambda message: None)
+                except Exception:
+                    start_failures += 1
+                    raise
+                start_failures = 0
+            render_job(backend, fmt, html_files, output_path)
+        except Exception as e:
+            error = str(e).strip() or type(e).__name__
+        rss = tree_rss(os.getpid())
+        restarted = backend is not None and (error is not None or rss > max_worker_bytes)
+        if restarted:
+            # A failed or bloated browser is replaced before the next job
+            backend.close()
+            backend = None
+            restarts += 1
+        results.put({"job": job_id, "worker": worker_id, "format": fmt, "output": output_path, "error": error,
+                     "seconds": time.perf_counter() - start, "rss_mb": rss / 1024 / 1024,
+                     "restarted": restarted, "restarts": restarts})
+        if start_failures >= MAX_START_FAILURES:
+            # Leave the queue to workers whose browser does start
+            break
+    if backend is not None:
+        backend.close()
+
+def run_farm(jobs, workers, backend_name=None, max_worker_mb=DEFAULT_MAX_WORKER_MB):
+    """Render jobs on `workers` processes; yields each result as soon as it arrives"""
+    context = multiprocessing.get_context("spawn")  # workers start without the parent's state
+    job_queue, result_queue = context.Queue(), context.Queue()
+    for job in jobs:
+        job_queue.put(job)
+    for _ in range(workers):
+        job_queue.put(None)
+    processes = [context.Process(target=worker, args=(worker_id, backend_name, max_worker_mb * 1024 * 1024,
+                                                      job_queue, result_queue), daemon=True)
+                 for worker_id in range(workers)]
+    for process in processes:
+        process.start()
+    try:
+        pending = {job[0]: job for job in jobs}
+        while pending:
+            try:
+                result = result_queue.get(timeout=1)
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes):
+                    break
+                continue
+            pending.pop(result["job"], None)
+            yield result
+        # Every worker stopped (its backend would not start) with jobs still queued
+        for job_id, fmt, html_files, output_path in pending.values():
+            yield {"job": job_id, "worker": None, "format": fmt, "output": output_path,
+                   "error": "not rendered: every worker stopped", "seconds": 0.0, "rss_mb": 0.0,
+                   "restarted": False, "restarts": 0}
+    finally:
+        for process in processes:
+            process.join(timeout=30)
+            if process.is_alive():
+                process.terminate()
+
+def main():
+    parser = argparse.ArgumentParser(description="Render many slide decks in parallel with warm browsers")
+    parser.add_argument("decks", nargs="*", help=f"folders with slide-N.html files (default: {', '.join(DEFAULT_DECKS)})")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS),
+                        help="deck: one PDF per deck; pdf/png: one file per slide (default: all)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: cores, limited by memory)")
+    parser.add_argument("--backend", help="render backend (default: the first one installed)")
+    parser.add_argument("--max-worker-mb", type=int, default=DEFAULT_MAX_WORKER_MB,
+                        help=f"restart a worker's browser above this RSS (default: {DEFAULT_MAX_WORKER_MB})")
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR, help=f"default: {DEFAULT_OUTPUT_DIR}")
+    parser.add_argument("--jsonl", action="store_true", help="print one JSON object per result instead of text")
+    args = parser.parse_args()
+
+    decks = args.decks or [deck for deck in DEFAULT_DECKS if os.path.isdir(deck)]
+    missing = [deck for deck in decks if not slide_files(deck)]
+    if not decks or missing:
+        print(f"❌ No slide-N.html files in: {', '.join(missing) or 'any default deck'}")
+        return 1
+    jobs = plan_jobs(decks, args.formats, args.output_dir)
+    workers = max(1, min(args.workers or default_workers(args.max_worker_mb), len(jobs)))
+    log = (lambda message: None) if args.jsonl else print
+
+    log(f"🏭 {len(jobs)} jobs from {len(decks)} decks on {workers} workers "
+        f"(browser restarted above {args.max_worker_mb} MB)")
+    start = time.perf_counter()
+    done, failed, restarts, per_worker = 0, 0, 0, {}
+    for result in run_farm(jobs, workers, args.backend, args.max_worker_mb):
+        done += 1
+        failed += result["error"] is not None
+        restarts += result["restarted"]
+        if result["worker"] is not None:
+            per_worker[result["worker"]] = per_worker.get(result["worker"], 0) + 1
+        if args.jsonl:
+            print(json.dumps(result), flush=True)
+            continue
+        error = " / ".join(line.strip() for line in (result["error"] or "").splitlines() if line.strip())
+        status = f"❌ {error}" if result["error"] else "✅"
+        note = " ♻️  browser restarted" if result["restarted"] else ""
+        worker_label = "-" if result["worker"] is None else result["worker"]
+        print(f"[{done:>{len(str(len(jobs)))}}/{len(jobs)}] w{worker_label} {status} {result['output']} "
+              f"({result['seconds']:.1f}s, {result['rss_mb']:.0f} MB){note}", flush=True)
+
+    elapsed = time.perf_counter() - start
+    log(f"\n📊 {done - failed}/{len(jobs)} rendered in {elapsed:.1f}s ({done / elapsed:.2f} jobs/s), "
+        f"{restarts} browser restarts")
+    log("   Jobs per worker: " + ", ".join(f"w{worker_id}={count}" for worker_id, count in sorted(per_worker.items())))
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
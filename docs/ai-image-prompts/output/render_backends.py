@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Pluggable render backends for slide HTML
+One interface for every way this folder turns slide HTML into PNGs and PDFs
+
+    chrome       Chrome/Chromium driven over the DevTools pipe (chrome_cdp.py)
+    playwright   Playwright's Chromium (pip install playwright)
+    selenium     Chrome through Selenium and chromedriver
+    wkhtmltopdf  wkhtmltopdf / wkhtmltoimage (QtWebKit)
+    html2image   html2image's Chrome command-line screenshots (PNG only)
+
+Every backend has the same methods:
+
+    render_png(html_file, png_path, size=(1080, 1080))
+    render_pdf(html_file, pdf_path, css_page_size=False)
+    render_batch([(html_file, output_path), ...])   # .png/.pdf by suffix
+
+and waits for the page to be ready (slide_readiness.py) where its engine
+allows. get_backend() picks the first backend, in the order above, that is
+installed and actually starts, so the same script runs on a Mac with Chrome
+or a Linux box with only Playwright or wkhtmltopdf. More backends can be
+added with @register_backend, from this file or from modules named in
+RENDER_BACKEND_PLUGINS (comma-separated, imported on first use; scripts
+that list backends as CLI choices call load_plugins() first).
+
+    with get_backend() as backend:
+        backend.render_pdf("aidd-exact-style-slides/slide-1.html", "slide-1.pdf")
+
+create-pdf-chrome.py, create-pdf-carousel.py, generate-html-screenshots.py
+and simple-html-to-image.py render (or get their browser) through these
+backends; create-pdf-playwright.py keeps an async page pool but shares the
+playwright backend's launch options. Outputs are written to a temp file and
+renamed over the target.
+"""
+
+import os
+import base64
+import shutil
+import tempfile
+import importlib
+import importlib.util
+import subprocess
+from pathlib import Path
+
+from chrome_cdp import ChromePipe, find_chrome
+from slide_deck import DECK_PAGE_MM
+from slide_images import SLIDE_SIZE, write_atomic
+from slide_readiness import (DEFAULT_DEADLINE, WKHTMLTOPDF_READY_JS, WKHTMLTOPDF_STATUS, wait_until_ready_cdp,
+                             wait_until_ready_playwright_sync, wait_until_ready_selenium)
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+class RenderError(RuntimeError):
+    """A backend is missing, failed to start or failed to render"""
+
+BACKENDS = {}  # name → backend class, in order of preference
+
+def register_backend(cls):
+    """Class decorator adding a backend to BACKENDS"""
+    BACKENDS[cls.name] = cls
+    return cls
+
+def _file_url(html_file):
+    html_file = str(html_file)
+    return html_file if "://" in html_file else Path(html_file).resolve().as_uri()
+
+class RenderBackend:
+    """Base class: subclasses set name/formats and implement launch, shutdown and the renders they support"""
+
+    name = None
+    formats = ("png", "pdf")
+    started = False
+
+    def __init__(self, deadline=DEFAULT_DEADLINE, log=print):
+        self.deadline = deadline
+        self.log = log
+
+    @classmethod
+    def available(cls):
+        """True when what the backend needs appears to be installed (start() may still fail)"""
+        raise NotImplementedError
+
+    def start(self):
+        """Launch the backend's browser (once); returns self"""
+        if not self.started:
+            self.launch()
+            self.started = True
+        return self
+
+    def close(self):
+        if self.started:
+            self.started = False
+            self.shutdown()
+
+    def launch(self):
+        pass
+
+    def shutdown(self):
+        pass
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def render_png(self, html_file, png_path, size=SLIDE_SIZE):
+        raise RenderError(f"{self.name} does not render PNGs")
+
+    def render_pdf(self, html_file, pdf_path, css_page_size=False):
+        raise RenderError(f"{self.name} does not render PDFs")
+
+    def render_batch(self, jobs):
+        """Render (html_file, output_path) jobs in order; returns [(output_path, error or None)]"""
+        results = []
+        for html_file, output_path in jobs:
+            render = self.render_pdf if str(output_path).lower().endswith(".pdf") else self.render_png
+            try:
+                render(html_file, output_path)
+                results.append((output_path, None))
+            except Exception as e:
+                results.append((output_path, str(e)))
+        return results
+
+@register_backend
+class ChromeBackend(RenderBackend):
+    """Chrome over --remote-debugging-pipe: no Python dependencies, one browser for every render"""
+
+    name = "chrome"
+
+    @classmethod
+    def available(cls):
+        return find_chrome() is not None
+
+    def launch(self):
+        self.chrome = ChromePipe(find_chrome()).launch()
+        try:
+            self.session_id = self.chrome.new_page(*SLIDE_SIZE)
+        except Exception:
+            self.chrome.close()
+            raise
+
+    def shutdown(self):
+        self.chrome.close()
+
+    def _load(self, html_file, size):
+        self.chrome.send("Emulation.setDeviceMetricsOverride",
+                         {"width": size[0], "height": size[1], "deviceScaleFactor": 1, "mobile": False},
+                         session_id=self.session_id)
+        self.chrome.navigate(self.session_id, _file_url(html_file), timeout=self.deadline + 20)
+        wait_until_ready_cdp(self.chrome, self.session_id, self.deadline, name=Path(html_file).name, log=self.log)
+
+    def render_png(self, html_file, png_path, size=SLIDE_SIZE):
+        self._load(html_file, size)
+        return write_atomic(png_path, self.chrome.screenshot(self.session_id))
+
+    def render_pdf(self, html_file, pdf_path, css_page_size=False):
+        self._load(html_file, SLIDE_SIZE)
+        return write_atomic(pdf_path, self.chrome.print_to_pdf(self.session_id, preferCSSPageSize=css_page_size))
+
+@register_backend
+class PlaywrightBackend(RenderBackend):
+    """Playwright's bundled Chromium (PLAYWRIGHT_CHROMIUM_PATH overrides the executable)"""
+
+    name = "playwright"
+
+    @classmethod
+    def available(cls):
+        return importlib.util.find_spec("playwright") is not None
+
+    @staticmethod
+    def launch_options():
+        """chromium.launch() keyword arguments, shared with the async scripts"""
+        return {"executable_path": os.getenv("PLAYWRIGHT_CHROMIUM_PATH") or None}
+
+    def launch(self):
+        from playwright.sync_api import sync_playwright
+        self._playwright = sync_playwright().start()
+        try:
+            self.browser = self._playwright.chromium.launch(**self.launch_options())
+            self.page = self.browser.new_page(viewport={"width": SLIDE_SIZE[0], "height": SLIDE_SIZE[1]})
+        except Exception:
+            self._playwright.stop()
+            raise
+
+    def shutdown(self):
+        self.browser.close()
+        self._playwright.stop()
+
+    def _load(self, html_file, size):
+        self.page.set_viewport_size({"width": size[0], "height": size[1]})
+        self.page.goto(_file_url(html_file))
+        wait_until_ready_playwright_sync(self.page, self.deadline, name=Path(html_file).name, log=self.log)
+
+    def render_png(self, html_file, png_path, size=SLIDE_SIZE):
+        self._load(html_file, size)
+        return write_atomic(png_path, self.page.screenshot())
+
+    def render_pdf(self, html_file, pdf_path, css_page_size=False):
+        self._load(html_file, SLIDE_SIZE)
+        return write_atomic(pdf_path, self.page.pdf(
+            print_background=True, prefer_css_page_size=css_page_size,
+            margin={"top": "0px", "bottom": "0px", "left": "0px", "right": "0px"}))
+
+@register_backend
+class SeleniumBackend(RenderBackend):
+    """
+    Chrome through Selenium; renders with the same DevTools commands as the
+    chrome backend. Scripts that drive the page themselves use .driver, with
+    window_size and device_scale set up front.
+    """
+
+    name = "selenium"
+
+    def __init__(self, window_size=SLIDE_SIZE, device_scale=None, **kwargs):
+        super().__init__(**kwargs)
+        self.window_size = window_size
+        self.device_scale = device_scale
+
+    @classmethod
+    def available(cls):
+        return importlib.util.find_spec("selenium") is not None and \
+            (shutil.which("chromedriver") is not None or find_chrome() is not None)
+
+    def launch(self):
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        options = Options()
+        for argument in ("--headless=new", "--no-sandbox", "--disable-dev-shm-usage", "--disable-gpu",
+                         f"--window-size={self.window_size[0]},{self.window_size[1]}"):
+            options.add_argument(argument)
+        if self.device_scale:
+            options.add_argument(f"--force-device-scale-factor={self.device_scale:g}")
+        if find_chrome():
+            options.binary_location = find_chrome()
+        self.driver = webdriver.Chrome(options=options)
+
+    def shutdown(self):
+        self.driver.quit()
+
+    def _load(self, html_file, size):
+        self.driver.execute_cdp_cmd("Emulation.setDeviceMetricsOverride",
+                                    {"width": size[0], "height": size[1], "deviceScaleFactor": 1, "mobile": False})
+        self.driver.get(_file_url(html_file))
+        wait_until_ready_selenium(self.driver, self.deadline, name=Path(html_file).name, log=self.log)
+
+    def render_png(self, html_file, png_path, size=SLIDE_SIZE):
+        self._load(html_file, size)
+        return write_atomic(png_path, base64.b64decode(
+            self.driver.execute_cdp_cmd("Page.captureScreenshot", {"format": "png"})["data"]))
+
+    def render_pdf(self, html_file, pdf_path, css_page_size=False):
+        self._load(html_file, SLIDE_SIZE)
+        result = self.driver.execute_cdp_cmd("Page.printToPDF", {
+            "printBackground": True, "preferCSSPageSize": css_page_size,
+            "marginTop": 0, "marginBottom": 0, "marginLeft": 0, "marginRight": 0})
+        return write_atomic(pdf_path, base64.b64decode(result["data"]))
+
+@register_backend
+class WkhtmltopdfBackend(RenderBackend):
+    """wkhtmltopdf for PDFs and wkhtmltoimage for PNGs; one process per render"""
+
+    name = "wkhtmltopdf"
+
+    @classmethod
+    def available(cls):
+        return shutil.which("wkhtmltopdf") is not None or shutil.which("wkhtmltoimage") is not None
+
+    @property
+    def formats(self):
+        return tuple(fmt for fmt, tool in (("png", "wkhtmltoimage"), ("pdf", "wkhtmltopdf")) if shutil.which(tool))
+
+    def _run(self, tool, options, html_file, output_path):
+        if not shutil.which(tool):
+            raise RenderError(f"{tool} is not installed")
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        # Render beside the output, then rename over it
+        tmp_path = output_path.with_name(f".{output_path.stem}.{os.getpid()}.tmp{output_path.suffix}")
+        command = [tool, *options, "--enable-local-file-access", "--run-script", WKHTMLTOPDF_READY_JS,
+                   "--window-status", WKHTMLTOPDF_STATUS, str(html_file), str(tmp_path)]
+        try:
+            subprocess.run(command, capture_output=True, text=True, check=True, timeout=self.deadline + 20)
+            os.replace(tmp_path, output_path)
+        except subprocess.TimeoutExpired:
+            raise RenderError(f"{html_file} was not ready within {self.deadline:g}s")
+        except subprocess.CalledProcessError as e:
+            raise RenderError(e.stderr.strip() or f"{tool} failed")
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+        return output_path
+
+    def render_png(self, html_file, png_path, size=SLIDE_SIZE):
+        return self._run("wkhtmltoimage", ["--format", "png", "--width", str(size[0]), "--height", str(size[1])],
+                         html_file, png_path)
+
+    def render_pdf(self, html_file, pdf_path, css_page_size=False):
+        page = ["--page-width", DECK_PAGE_MM[0], "--page-height", DECK_PAGE_MM[1]] if css_page_size else []
+        return self._run("wkhtmltopdf", [*page, "--margin-top", "0", "--margin-bottom", "0", "--margin-left", "0",
+                                         "--margin-right", "0", "--disable-smart-shrinking"], html_file, pdf_path)
+
+@register_backend
+class Html2ImageBackend(RenderBackend):
+    """html2image: a Chrome command-line screenshot per render, with no readiness signal"""
+
+    name = "html2image"
+    formats = ("png",)
+
+    @classmethod
+    def available(cls):
+        return importlib.util.find_spec("html2image") is not None and find_chrome() is not None
+
+    def launch(self):
+        from html2image import Html2Image
+        self._output_dir = tempfile.mkdtemp(prefix="html2image-")
+        flags = ["--hide-scrollbars", "--no-sandbox", "--disable-gpu"]
+        self.hti = Html2Image(browser_executable=find_chrome(), output_path=self._output_dir, custom_flags=flags)
+
+    def shutdown(self):
+        shutil.rmtree(self._output_dir, ignore_errors=True)
+
+    def render_png(self, html_file, png_path, size=SLIDE_SIZE):
+        name = Path(png_path).name
+        self.hti.screenshot(url=_file_url(html_file), save_as=name, size=size)
+        rendered = Path(self._output_dir) / name
+        try:
+            return write_atomic(png_path, rendered.read_bytes())
+        finally:
+            rendered.unlink()
+
+def tree_rss(root_pid):
+    """Combined RSS in bytes of root_pid and all its descendants (0 where /proc is unavailable)"""
+    children = {}
+    for entry in os.scandir("/proc") if os.path.isdir("/proc") else []:
+        if not entry.name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry.name}/stat", "rb") as f:
+                ppid = int(f.read().rsplit(b")", 1)[1].split()[1])  # field 4; the name may hold spaces
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(entry.name))
+    total, pending = 0, [root_pid]
+    while pending:
+        pid = pending.pop()
+        pending.extend(children.get(pid, ()))
+        try:
+            with open(f"/proc/{pid}/statm", "rb") as f:
+                total += int(f.read().split()[1]) * PAGE_SIZE
+        except (OSError, ValueError, IndexError):
+            pass
+    return total
+
+def load_plugins():
+    """Import the RENDER_BACKEND_PLUGINS modules; returns every registered backend name"""
+    for module in filter(None, os.getenv("RENDER_BACKEND_PLUGINS", "").split(",")):
+        importlib.import_module(module.strip())
+    return list(BACKENDS)
+
+def available_backends():
+    """Names of the registered backends whose requirements are installed, in order of preference"""
+    load_plugins()
+    return [name for name, cls in BACKENDS.items() if cls.available()]
+
+def get_backend(name=None, fmt=None, **kwargs):
+    """
+    A started backend: `name`, or the first available one that renders
+    `fmt` ("png"/"pdf") and starts. Raises RenderError when there is none.
+    """
+    load_plugins()
+    if name:
+        if name not in BACKENDS:
+            raise RenderError(f"unknown backend {name!r} (known: {', '.join(BACKENDS)})")
+        candidates = [name]
+    else:
+        candidates = available_backends()
+    failures = []
+    for candidate in candidates:
+        backend = BACKENDS[candidate](**kwargs)
+        if fmt and fmt not in backend.formats:
+            failures.append(f"{candidate}: no {fmt} output")
+            continue
+        try:
+            return backend.start()
+        except Exception as e:
+            failures.append(f"{candidate}: {e}")
+    raise RenderError("no render backend could start" + ("".join(f"\n   {f}" for f in failures) or
+                                                          " (install Chrome, Playwright or wkhtmltopdf)"))
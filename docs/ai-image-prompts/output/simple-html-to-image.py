@@ -2,21 +2,120 @@
 """
 Simple HTML to Image Converter using html2image
 Alternative to Selenium for generating carousel slides
-"""
 
-try:
-    from html2image import Html2Image
-except ImportError:
-    print("❌ html2image not installed")
-    print("Install with: pip install html2image")
-    print("Also install ChromeDriver: brew install chromedriver")
-    exit(1)
+Two capture modes:
+
+    session    (default) load the carousel once in one headless Chrome and
+               switch the visible slide with a script between captures;
+               the slides are whatever .carousel-slide elements the page has,
+               each clipped to its own box and scaled to 1080x1080
+    per-slide  html2image renders a rewritten copy of the whole document
+               for each of the six slides
 
+Both find Chrome the same way as every other renderer here (the chrome and
+html2image backends in render_backends.py; CHROME_PATH overrides).
+
+Usage:
+    python simple-html-to-image.py
+    python simple-html-to-image.py --mode per-slide
+"""
+
+import json
+import time
+import argparse
+import tempfile
 from pathlib import Path
 import os
 
+from chrome_cdp import CDPError
+from render_backends import RenderError, get_backend
+from slide_images import SLIDE_SIZE, write_atomic
+from slide_readiness import wait_until_ready_cdp
+
+# CSS to show only the .active slide
+SLIDE_CSS = """
+    <style>
+        body { background: #1a1a1a; }
+        .carousel-slide { margin: 20px auto; }
+        .carousel-slide:not(.active) { display: none; }
+    </style>
+    """
+
+SHOW_SLIDE_JS = """
+(index => {
+    const slides = document.querySelectorAll('.carousel-slide');
+    slides.forEach((slide, i) => slide.classList.toggle('active', i === index));
+    window.scrollTo(0, 0);
+    return slides.length;
+})(%d)
+"""
+
+# Page-coordinate box of the visible slide (the injected margin and the page background stay out)
+SLIDE_RECT_JS = """
+(() => {
+    const r = document.querySelector('.carousel-slide.active').getBoundingClientRect();
+    return {x: r.left + window.scrollX, y: r.top + window.scrollY, width: r.width, height: r.height};
+})()
+"""
+
 def generate_carousel_images():
-    """Generate LinkedIn carousel images from HTML"""
+    """Generate LinkedIn carousel images from HTML in one browser session"""
+    print("🎨 HTML to Image Carousel Generator")
+    print("=" * 50)
+    
+    # Check if HTML file exists
+    html_file = Path("linkedin-carousel-html.html")
+    if not html_file.exists():
+        print("❌ HTML file not found: linkedin-carousel-html.html")
+        return False
+    
+    try:
+        backend = get_backend("chrome")
+    except RenderError as e:
+        print(f"❌ {e}")
+        return False
+    
+    successful_captures = 0
+    start = time.perf_counter()
+    with backend:
+        # One LinkedIn-sized (1080x1080) tab, driven directly over the DevTools pipe
+        chrome, session_id = backend.chrome, backend.session_id
+        chrome.navigate(session_id, html_file.absolute().as_uri())
+        chrome.evaluate(session_id, f"document.head.insertAdjacentHTML('afterbegin', {json.dumps(SLIDE_CSS.strip())})")
+        wait_until_ready_cdp(chrome, session_id, name=html_file.name)
+        
+        # Slide count comes from the page itself
+        total_slides = chrome.evaluate(session_id, SHOW_SLIDE_JS % -1)
+        print(f"📸 Generating {total_slides} carousel slides (page loaded in {time.perf_counter() - start:.1f}s)...")
+        
+        for index in range(total_slides):
+            slide_num = index + 1
+            try:
+                print(f"🎯 Generating slide {slide_num}/{total_slides}...")
+                chrome.evaluate(session_id, SHOW_SLIDE_JS % index)
+                wait_until_ready_cdp(chrome, session_id, deadline=5, name=f"slide {slide_num}")
+                rect = chrome.evaluate(session_id, SLIDE_RECT_JS)
+                clip = {**rect, "scale": SLIDE_SIZE[0] / rect["width"]}
+                write_atomic(f"slide-{slide_num}-html.png", chrome.screenshot(session_id, clip=clip))
+                successful_captures += 1
+                print(f"✅ Slide {slide_num} generated successfully")
+            except (CDPError, OSError) as e:
+                print(f"❌ Failed to generate slide {slide_num}: {e}")
+    
+    print("\n" + "=" * 50)
+    print(f"📊 Results: {successful_captures}/{total_slides} slides generated in {time.perf_counter() - start:.1f}s")
+    
+    if total_slides and successful_captures == total_slides:
+        print("🎉 Complete LinkedIn carousel ready!")
+        print("📱 Format: 1080x1080px (LinkedIn optimized)")
+        print("🎨 Retro brand design with pixel-art aesthetic")
+    else:
+        print("⚠️  Some slides failed. Try manual screenshot approach below.")
+    
+    return bool(total_slides) and successful_captures == total_slides
+
+def generate_carousel_images_per_slide():
+    """Generate LinkedIn carousel images from HTML, one html2image render per slide"""
     print("🎨 HTML to Image Carousel Generator")
     print("=" * 50)
     
@@ -26,12 +125,13 @@ def generate_carousel_images():
         print("❌ HTML file not found: linkedin-carousel-html.html")
         return False
     
-    # Initialize html2image
-    hti = Html2Image(
-        size=(1080, 1080),  # LinkedIn optimal size
-        output_path="./",
-        browser_executable="/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"  # macOS Chrome path
-    )
+    # html2image with whichever Chrome find_chrome() locates
+    try:
+        backend = get_backend("html2image")
+    except RenderError as e:
+        print(f"❌ {e}")
+        print("Install with: pip install html2image")
+        return False
     
     # Read HTML content
     with open(html_file, 'r', encoding='utf-8') as f:
@@ -39,15 +139,6 @@ def generate_carousel_images():
     
     print("📸 Generating carousel slides...")
     
-    # Add custom CSS to show only one slide at a time
-    slide_css = """
-    <style>
-        body { background: #1a1a1a; }
-        .carousel-slide { margin: 20px auto; }
-        .carousel-slide:not(.active) { display: none; }
-    </style>
-    """
-    
     successful_captures = 0
     
     for slide_num in range(1, 7):
@@ -61,14 +152,16 @@ def generate_carousel_images():
             )
             
             # Add CSS to show only active slide
-            slide_html = slide_html.replace('<head>', f'<head>{slide_css}')
+            slide_html = slide_html.replace('<head>', f'<head>{SLIDE_CSS}')
             
-            # Generate image
-            hti.screenshot(
-                html_str=slide_html,
-                save_as=f"slide-{slide_num}-html.png",
-                size=(1080, 1080)
-            )
+            # Generate image from a copy beside the original, so relative URLs still resolve
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", suffix=".html", prefix=".slide-",
+                                             dir=html_file.parent, delete=False) as f:
+                f.write(slide_html)
+            try:
+                backend.render_png(f.name, f"slide-{slide_num}-html.png", size=SLIDE_SIZE)
+            finally:
+                os.remove(f.name)
             
             successful_captures += 1
             print(f"✅ Slide {slide_num} generated successfully")
@@ -76,6 +169,7 @@ def generate_carousel_images():
         except Exception as e:
             print(f"❌ Failed to generate slide {slide_num}: {e}")
     
+    backend.close()
     print("\n" + "=" * 50)
     print(f"📊 Results: {successful_captures}/6 slides generated")
     
@@ -90,10 +184,17 @@ def generate_carousel_images():
 
 def main():
     """Main function with fallback instructions"""
+    parser = argparse.ArgumentParser(description="Render the LinkedIn carousel HTML to slide PNGs")
+    parser.add_argument("--mode", choices=("session", "per-slide"), default="session",
+                        help="session: load the page once (default); per-slide: one html2image render per slide")
+    args = parser.parse_args()
     success = False
     
     try:
-        success = generate_carousel_images()
+        if args.mode == "session":
+            success = generate_carousel_images()
+        else:
+            success = generate_carousel_images_per_slide()
     except Exception as e:
         print(f"❌ Automated generation failed: {e}")
     
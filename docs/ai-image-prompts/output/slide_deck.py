@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Deck assembly for single-call carousel PDFs
+Puts every slide-N.html of a deck into one document, one 1080x1080 page per slide
+
+Each slide styles its own <body>, so the slides cannot simply be pasted
+together. Every slide's body becomes <section class="deck-page deck-page-N">
+and its stylesheet is scoped to that section:
+
+    body, html, :root   → .deck-page-N
+    *                   → .deck-page-N, .deck-page-N *
+    .title h1           → .deck-page-N .title h1
+    @keyframes pulse    → @keyframes deck-N-pulse (and the animations using it)
+
+Font <link>s and @imports are hoisted into the deck's <head> once, so a
+PDF printed from the deck embeds each font once instead of once per slide.
+Pages break with page-break-after and the page size comes from
+@page { size: 1080px 1080px }, so one print call produces the whole
+carousel with no merge step.
+
+Usage:
+    with deck_html_file(sorted(Path("aidd-exact-style-slides").glob("slide-*.html"))) as deck:
+        ...print deck (a file:// path) with preferCSSPageSize...
+"""
+
+import os
+import re
+import tempfile
+from contextlib import contextmanager
+from html import escape
+from pathlib import Path
+
+DECK_PAGE_SIZE = (1080, 1080)
+# wkhtmltopdf ignores @page sizes: 1080 CSS px at 96 dpi
+DECK_PAGE_MM = tuple(f"{pixels / 96 * 25.4:g}mm" for pixels in DECK_PAGE_SIZE)
+
+DECK_CSS = f"""
+@page {{ size: {DECK_PAGE_SIZE[0]}px {DECK_PAGE_SIZE[1]}px; margin: 0; }}
+html, body {{ margin: 0; padding: 0; }}
+.deck-page {{
+    width: {DECK_PAGE_SIZE[0]}px;
+    height: {DECK_PAGE_SIZE[1]}px;
+    position: relative;
+    overflow: hidden;
+    page-break-after: always;
+    break-after: page;
+}}
+.deck-page:last-child {{ page-break-after: auto; break-after: auto; }}
+"""
+
+_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_STYLE = re.compile(r"<style[^>]*>(.*?)</style>", re.S | re.I)
+_LINK = re.compile(r"<link\b[^>]*>", re.I)
+_BODY = re.compile(r"<body([^>]*)>(.*)</body>", re.S | re.I)
+_ROOT = re.compile(r"^(?::root|html)?\s*(?:body\b)?")
+
+def _blocks(css):
+    """Split a stylesheet into (prelude, body) pairs; body is None for ;-terminated at-rules"""
+    position, depth, start, body_start = 0, 0, 0, 0
+    while position < len(css):
+        char = css[position]
+        if char in "'\"":
+            position = css.find(char, position + 1)  # strings can hold ; { }
+            if position < 0:
+                return
+        elif char == "(" and not depth:
+            position = css.find(")", position)  # url(...) unquoted
+            if position < 0:
+                return
+        elif char == "{":
+            depth += 1
+            if depth == 1:
+                prelude, body_start = css[start:position].strip(), position + 1
+        elif char == "}" and depth:
+            depth -= 1
+            if not depth:
+                yield prelude, css[body_start:position]
+                start = position + 1
+        elif char == ";" and not depth:
+            if css[start:position].strip():
+                yield css[start:position].strip(), None
+            start = position + 1
+        position += 1
+
+def _scope_selector(selector, scope):
+    selector = selector.strip()
+    if selector == "*":
+        return f"{scope}, {scope} *"
+    if selector.startswith("*"):
+        return f"{scope} {selector}"
+    root = _ROOT.match(selector).group(0)
+    if root.strip():
+        return scope + selector[len(root):]
+    return f"{scope} {selector}"
+
+def scope_css(css, scope, prefix, keyframes=None):
+    """
+    Rewrite a slide stylesheet so it only applies inside `scope`.
+
+    Keyframe names get `prefix` so slides with different animations of the
+    same name keep their own. Returns (scoped css, hoisted @import/@font-face rules).
+    """
+    css = _COMMENT.sub("", css)
+    if keyframes is None:
+        keyframes = set(re.findall(r"@(?:-webkit-)?keyframes\s+([\w-]+)", css))
+    rename = re.compile(r"\b(" + "|".join(map(re.escape, sorted(keyframes))) + r")\b") if keyframes else None
+
+    def rename_animations(body):
+        if not rename:
+            return body
+        return re.sub(r"(animation(?:-name)?\s*:)([^;}]*)",
+                      lambda m: m.group(1) + rename.sub(lambda n: prefix + n.group(1), m.group(2)), body)
+
+    scoped, hoisted = [], []
+    for prelude, body in _blocks(css):
+        keyword = prelude.split(None, 1)[0].lower() if prelude.startswith("@") else ""
+        if body is None or keyword == "@font-face":
+            hoisted.append(prelude + ";" if body is None else f"{prelude} {{{body}}}")
+        elif keyword.endswith("keyframes"):
+            name = prelude.split(None, 1)[1].strip()
+            scoped.append(f"{keyword} {prefix + name if name in keyframes else name} {{{body}}}")
+        elif keyword in ("@media", "@supports"):
+            inner, inner_hoisted = scope_css(body, scope, prefix, keyframes)
+            scoped.append(f"{prelude} {{\n{inner}\n}}")
+            hoisted.extend(inner_hoisted)
+        elif keyword:
+            scoped.append(f"{prelude} {{{body}}}")
+        else:
+            selectors = ", ".join(_scope_selector(selector, scope) for selector in prelude.split(","))
+            scoped.append(f"{selectors} {{{rename_animations(body)}}}")
+    return "\n".join(scoped), hoisted
+
+def build_deck_html(html_files, title="Carousel"):
+    """One HTML document with every slide of html_files as its own page"""
+    html_files = [Path(path).resolve() for path in html_files]
+    head, styles, pages = [], [], []
+    for number, path in enumerate(html_files, 1):
+        html = path.read_text(encoding="utf-8")
+        head_html = html.split("</head>", 1)[0]
+        for link in _LINK.findall(head_html):
+            if link not in head and "stylesheet" in link:
+                head.append(link)
+        scope, prefix = f".deck-page-{number}", f"deck-{number}-"
+        for css in _STYLE.findall(head_html):
+            scoped, hoisted = scope_css(css, scope, prefix)
+            head.extend(rule for rule in hoisted if rule not in head)
+            styles.append(scoped)
+        body = _BODY.search(html)
+        attributes, content = (body.group(1), body.group(2)) if body else ("", "")
+        style = re.search(r'\sstyle="[^"]*"', attributes)  # inline body styles move to the page
+        pages.append(f'<section class="deck-page deck-page-{number}"{style.group(0) if style else ""}>'
+                     f'{content}</section>')
+
+    base = html_files[0].parent.as_uri() + "/" if html_files else ""
+    links = [rule for rule in head if rule.startswith("<")]
+    rules = [rule for rule in head if not rule.startswith("<")]
+    return "\n".join([
+        "<!DOCTYPE html>",
+        "<html>",
+        "<head>",
+        '<meta charset="UTF-8">',
+        f"<title>{escape(title)}</title>",
+        f'<base href="{base}">',
+        *links,
+        "<style>",
+        *rules,  # @import must come first in the stylesheet
+        DECK_CSS,
+        *styles,
+        "</style>",
+        "</head>",
+        "<body>",
+        *pages,
+        "</body>",
+        "</html>",
+    ])
+
+@contextmanager
+def deck_html_file(html_files, title="Carousel"):
+    """Write the deck for html_files to a temporary .html file; yields its path"""
+    fd, path = tempfile.mkstemp(prefix="deck-", suffix=".html")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(build_deck_html(html_files, title))
+        yield path
+    finally:
+        os.remove(path)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Image helpers for turning browser screenshots into slide PNGs
+Crops and scales in one pass and reuses the encode buffer across slides
+
+A 1200x1200 window at 2x is a 2400x2400 RGBA screenshot (23 MB decoded).
+The naive open → crop → LANCZOS resize holds the full frame, the crop and
+the resized copy at once. Instead:
+
+    - crop and resize happen in one pass (resize with box=), reducing by an
+      integer factor first (reducing_gap) and filtering the rest with LANCZOS
+    - encoded output goes through one reusable buffer per SlideWriter
+    - a JPEG source is opened with draft() so libjpeg decodes at 1/2, 1/4
+      or 1/8 scale; the capture scripts here take PNG screenshots, so this
+      only applies to JPEG files passed in directly
+
+Peak memory is per slide either way (see bench-slide-memory.py); for PNG
+screenshots the one-pass resize saves the intermediate crop.
+"""
+
+import io
+import os
+import math
+import tempfile
+import threading
+from pathlib import Path
+
+from PIL import Image
+
+SLIDE_SIZE = (1080, 1080)
+
+def _open(source):
+    """Image.open for a path, bytes or file object"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    return Image.open(source)
+
+def open_region(source, box=None, size=SLIDE_SIZE):
+    """
+    Open source decoding as little as possible to produce box at size.
+
+    Returns (image, box) with box translated to the decoded image's
+    coordinates (JPEG draft mode decodes at a reduced scale).
+    """
+    image = _open(source)
+    box = tuple(box or (0, 0, image.width, image.height))
+    if image.format == "JPEG":
+        full_width = image.width
+        scale_x = (box[2] - box[0]) / size[0]
+        scale_y = (box[3] - box[1]) / size[1]
+        image.draft("RGB", (math.ceil(image.width / scale_x), math.ceil(image.height / scale_y)))
+        factor = full_width / image.width
+        box = tuple(coordinate / factor for coordinate in box)
+    return image, box
+
+def render_slide(source, box=None, size=SLIDE_SIZE):
+    """Crop box out of source and scale it to size in one pass; returns an RGB(A) image"""
+    image, box = open_region(source, box, size)
+    with image:
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+        return image.resize(size, Image.LANCZOS, box=box, reducing_gap=2.0)
+
+_umask = None
+_umask_lock = threading.Lock()
+
+def _current_umask():
+    """
+    The process umask, read on first use. os.umask can only be read by
+    setting it, so it is briefly 0o022 (never 0) while it is read.
+    """
+    global _umask
+    with _umask_lock:
+        if _umask is None:
+            _umask = os.umask(0o022)
+            os.umask(_umask)
+        return _umask
+
+def write_atomic(path, data):
+    """Write data to a temp file beside path, then rename it over path; returns path"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            os.fchmod(f.fileno(), 0o666 & ~_current_umask())  # mkstemp's 0600 → what open() would give
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+class SlideWriter:
+    """
+    Encodes slides through one reusable in-memory buffer.
+
+    One writer per capture loop (or worker) keeps encoding from allocating
+    a fresh multi-megabyte buffer for every slide.
+    """
+
+    def __init__(self, optimize=True):
+        self.optimize = optimize
+        self._buffer = io.BytesIO()
+
+    def save(self, image, output_path):
+        """Write image to output_path atomically; returns the number of bytes written"""
+        # Overwrite from the start without truncating: BytesIO would give the memory back
+        self._buffer.seek(0)
+        image.save(self._buffer, "PNG", optimize=self.optimize)
+        data = self._buffer.getbuffer()[:self._buffer.tell()]
+        try:
+            write_atomic(output_path, data)
+        finally:
+            data.release()
+        return Path(output_path).stat().st_size
+
+    def process(self, source, output_path, box=None, size=SLIDE_SIZE):
+        """Screenshot (path, bytes or file) → cropped, resized slide PNG at output_path"""
+        slide = render_slide(source, box, size)
+        try:
+            return self.save(slide, output_path)
+        finally:
+            slide.close()
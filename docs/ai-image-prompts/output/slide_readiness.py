@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Readiness checks for rendering slide HTML
+Waits until a page is actually ready instead of sleeping for a fixed time
+
+A slide counts as ready when, in order:
+
+    1. the load event has fired
+    2. document.fonts.ready has resolved (web fonts swapped in)
+    3. every <img> has decoded
+    4. the network is quiet: no new resource entries for NETWORK_QUIET_MS
+    5. running animations with a finite end have finished
+    6. window.__slideReady is truthy, if the page defines it (a slide that
+       builds itself with script sets it when done)
+
+READY_JS runs those steps inside the page and resolves with "ready", or
+with "timeout" once the deadline passes, so a broken page still renders.
+Every backend uses the same script through its own entry point.
+"""
+
+import time
+
+DEFAULT_DEADLINE = 10.0    # seconds
+NETWORK_QUIET_MS = 250
+
+READY_JS = """
+async (deadlineMs, quietMs) => {
+  const start = performance.now();
+  const sleep = ms => new Promise(resolve => setTimeout(resolve, ms));
+  const ready = (async () => {
+    if (document.readyState !== 'complete') {
+      await new Promise(resolve => window.addEventListener('load', resolve, {once: true}));
+    }
+    if (document.fonts) await document.fonts.ready;
+    await Promise.all(Array.from(document.images).map(img => img.decode().catch(() => null)));
+    let seen = -1;
+    while (seen !== performance.getEntriesByType('resource').length) {
+      seen = performance.getEntriesByType('resource').length;
+      await sleep(quietMs);
+    }
+    if (document.getAnimations) {
+      const finite = document.getAnimations().filter(a =>
+        a.playState === 'running' && Number.isFinite(a.effect && a.effect.getComputedTiming().endTime));
+      await Promise.all(finite.map(a => a.finished.catch(() => null)));
+    }
+    while ('__slideReady' in window && !window.__slideReady) await sleep(25);
+    return 'ready';
+  })();
+  const timeout = sleep(Math.max(0, deadlineMs - (performance.now() - start))).then(() => 'timeout');
+  return Promise.race([ready, timeout]);
+}
+"""
+
+# wkhtmltopdf's QtWebKit has no fonts/animations API or async functions:
+# it only gets the load-time image check and the __slideReady flag, and
+# reports through window.status (see --window-status)
+WKHTMLTOPDF_READY_JS = (
+    "(function poll() {"
+    " var images = Array.prototype.every.call(document.images, function (img) { return img.complete; });"
+    " if (images && (!('__slideReady' in window) || window.__slideReady)) { window.status = 'slide-ready'; }"
+    " else { setTimeout(poll, 25); }"
+    "})();"
+)
+WKHTMLTOPDF_STATUS = "slide-ready"
+
+def ready_call(deadline=DEFAULT_DEADLINE):
+    """Expression that runs READY_JS with a deadline in seconds (for evaluate-style APIs)"""
+    return f"({READY_JS})({deadline * 1000:.0f}, {NETWORK_QUIET_MS})"
+
+def _report(name, status, start, log):
+    if status != "ready":
+        log(f"⚠️  {name}: not ready after {time.perf_counter() - start:.1f}s - rendering anyway")
+    return status == "ready"
+
+async def wait_until_ready_playwright(page, deadline=DEFAULT_DEADLINE, name="page", log=print):
+    """Wait for network idle and READY_JS on a Playwright page; True when ready before the deadline"""
+    start = time.perf_counter()
+    try:
+        await page.wait_for_load_state("networkidle", timeout=deadline * 1000)
+    except Exception:
+        pass  # READY_JS below reports the timeout
+    remaining = max(0.0, deadline - (time.perf_counter() - start))
+    status = await page.evaluate(ready_call(remaining))
+    return _report(name, status, start, log)
+
+def wait_until_ready_playwright_sync(page, deadline=DEFAULT_DEADLINE, name="page", log=print):
+    """wait_until_ready_playwright for Playwright's sync API"""
+    start = time.perf_counter()
+    try:
+        page.wait_for_load_state("networkidle", timeout=deadline * 1000)
+    except Exception:
+        pass  # READY_JS below reports the timeout
+    remaining = max(0.0, deadline - (time.perf_counter() - start))
+    status = page.evaluate(ready_call(remaining))
+    return _report(name, status, start, log)
+
+def wait_until_ready_selenium(driver, deadline=DEFAULT_DEADLINE, name="page", log=print):
+    """Run READY_JS through Selenium's async script support; True when ready before the deadline"""
+    start = time.perf_counter()
+    driver.set_script_timeout(deadline + 5)
+    status = driver.execute_async_script(
+        f"const done = arguments[arguments.length - 1];"
+        f"({READY_JS})(arguments[0], arguments[1]).then(done, () => done('error'));",
+        deadline * 1000, NETWORK_QUIET_MS)
+    return _report(name, status, start, log)
+
+def wait_until_ready_cdp(chrome, session_id, deadline=DEFAULT_DEADLINE, name="page", log=print):
+    """Run READY_JS over a chrome_cdp.ChromePipe session; True when ready before the deadline"""
+    start = time.perf_counter()
+    status = chrome.evaluate(session_id, ready_call(deadline), timeout=deadline + 5)
+    return _report(name, status, start, log)
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Integrity manifest for generated PNGs and PDFs
+Records what every generated file should contain and catches truncated or bogus ones
+
+asset-manifest.json (committed, in ai-image-prompts/) holds, for each PNG and
+PDF under ../output and docs/assets/linkedin-images:
+
+    sha256, size          the expected bytes
+    width, height         PNG dimensions from the IHDR chunk
+    pages                 PDF page count
+    prompt_sha256         hash of the prompt it was generated from, when known
+
+Files are hashed in a thread pool straight from mmap (hashlib releases the
+GIL on large buffers), and checked structurally: a PNG must start with the
+PNG signature and end with an IEND chunk, a PDF must start with %PDF- and
+end with %%EOF. That is what catches an error page saved as an image, like
+the 796-byte XML "AuthenticationFailed" response in slide-6-framework.png.
+
+verify only re-hashes files whose size or mtime changed since it last saw
+them (local state in .integrity-state.json next to this script, override
+with INTEGRITY_STATE_PATH); --full re-hashes everything.
+
+Usage:
+    python asset_manifest.py verify            # exit code 1 when anything is wrong
+    python asset_manifest.py verify --full
+    python asset_manifest.py update            # record the current files
+    python asset_manifest.py update ../output/foo-linkedin.png
+"""
+
+import os
+import re
+import sys
+import json
+import mmap
+import time
+import struct
+import hashlib
+import argparse
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from prompt_index import get_index
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+DOCS_DIR = SCRIPT_DIR.parents[1]
+DEFAULT_DIRS = (SCRIPT_DIR.parent / "output", DOCS_DIR / "assets" / "linkedin-images")
+DEFAULT_MANIFEST_PATH = SCRIPT_DIR.parent / "asset-manifest.json"
+DEFAULT_STATE_PATH = SCRIPT_DIR / ".integrity-state.json"
+DEFAULT_WORKERS = min(8, 2 * (os.cpu_count() or 1))
+SUFFIXES = (".png", ".pdf")
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+PNG_TRAILER = b"\x00\x00\x00\x00IEND\xaeB`\x82"
+PDF_PAGE = re.compile(rb"/Type\s*/Page(?![a-zA-Z])")
+NAME_SUFFIXES = ("-quantized", "-linkedin", "-v2")
+
+def manifest_key(path):
+    """Manifest key: path relative to docs/ (portable between clones)"""
+    path = Path(path).resolve()
+    try:
+        return path.relative_to(DOCS_DIR).as_posix()
+    except ValueError:
+        return str(path)
+
+@dataclass
+class FileCheck:
+    """Hash and structure of one file as found on disk"""
+    path: str
+    size: int = 0
+    mtime_ns: int = 0
+    sha256: str = ""
+    width: Optional[int] = None
+    height: Optional[int] = None
+    pages: Optional[int] = None
+    problem: str = ""
+
+def _describe_garbage(head):
+    head = head.lstrip(b"\xef\xbb\xbf \r\n\t")
+    if head.startswith(b"<"):
+        return "an XML/HTML document (a saved error response?)"
+    if head.startswith(b"{"):
+        return "a JSON document (a saved API response?)"
+    return f"unrecognised data ({head[:8]!r})"
+
+def check_file(path):
+    """Hash path via mmap and check that it is a complete PNG/PDF"""
+    path = Path(path)
+    stat = path.stat()
+    check = FileCheck(str(path), stat.st_size, stat.st_mtime_ns)
+    if stat.st_size == 0:
+        check.sha256 = hashlib.sha256(b"").hexdigest()
+        check.problem = "empty file"
+        return check
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        check.sha256 = hashlib.sha256(data).hexdigest()
+        if path.suffix.lower() == ".png":
+            if data[:8] != PNG_SIGNATURE:
+                check.problem = f"not a PNG: {_describe_garbage(data[:64])}"
+            elif data[12:16] != b"IHDR":
+                check.problem = "PNG without an IHDR chunk"
+            else:
+                check.width, check.height = struct.unpack(">II", data[16:24])
+                if data[-12:] != PNG_TRAILER:
+                    check.problem = "truncated PNG (no IEND chunk at the end)"
+        elif path.suffix.lower() == ".pdf":
+            if data[:5] != b"%PDF-":
+                check.problem = f"not a PDF: {_describe_garbage(data[:64])}"
+            else:
+                check.pages = len(PDF_PAGE.findall(data))
+                if b"%%EOF" not in data[-1024:]:
+                    check.problem = "truncated PDF (no %%EOF marker)"
+    return check
+
+def find_prompt_hash(path):
+    """sha256 of the prompt an image was generated from, looked up by file name"""
+    name = Path(path).stem
+    index = get_index()
+    while True:
+        entry = index.peek(name)
+        if entry and entry.prompt:
+            return entry.prompt_hash
+        stripped = next((name[:-len(suffix)] for suffix in NAME_SUFFIXES if name.endswith(suffix)), None)
+        if not stripped:
+            return None
+        name = stripped
+
+def collect_files(sources):
+    """PNG and PDF files under the given files/directories"""
+    files = []
+    for source in sources:
+        source = Path(source)
+        candidates = sorted(source.rglob("*")) if source.is_dir() else [source]
+        files.extend(path for path in candidates if path.suffix.lower() in SUFFIXES and path.is_file())
+    return files
+
+@dataclass
+class VerifyReport:
+    """Outcome of AssetManifest.verify()"""
+    checked: int = 0
+    hashed: int = 0
+    problems: Dict[str, str] = field(default_factory=dict)
+    untracked: List[str] = field(default_factory=list)
+    missing: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self):
+        return not self.problems and not self.missing
+
+class AssetManifest:
+    """Committed manifest of expected file contents plus local verify state"""
+
+    def __init__(self, path=None, state_path=None, workers=DEFAULT_WORKERS):
+        self.path = Path(path or DEFAULT_MANIFEST_PATH)
+        self.state_path = Path(state_path or os.getenv("INTEGRITY_STATE_PATH") or DEFAULT_STATE_PATH)
+        self.workers = workers
+        self._lock = threading.Lock()
+        self.entries = self._load(self.path)
+        self.state = self._load(self.state_path)
+
+    @staticmethod
+    def _load(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _dump(data, path, indent):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=indent, sort_keys=True)
+                f.write("\n")
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def save(self):
+        with self._lock:
+            self._dump(self.entries, self.path, indent=2)
+            self._dump(self.state, self.state_path, indent=None)
+
+    def _cached(self, key, stat):
+        """The last check of key if the file has not changed since, else None"""
+        cached = self.state.get(key)
+        if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+            return FileCheck(**cached)
+        return None
+
+    def check(self, paths, full=False):
+        """FileCheck for every path, hashing (in parallel) only new or changed files"""
+        checks, todo = {}, []
+        for path in paths:
+            path = Path(path).resolve()
+            cached = None if full else self._cached(manifest_key(path), path.stat())
+            if cached:
+                checks[path] = cached
+            else:
+                todo.append(path)
+        if todo:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                for path, check in zip(todo, pool.map(check_file, todo)):
+                    checks[path] = check
+            with self._lock:
+                for path in todo:
+                    self.state[manifest_key(path)] = vars(checks[path])
+        return [checks[Path(path).resolve()] for path in paths], len(todo)
+
+    def update(self, paths=None, prompt_hash=None, log=print):
+        """
+        Record the current content of paths (default: every generated file).
+
+        Broken files are reported and not recorded, so the entry of a file
+        that used to be good keeps describing what it should contain.
+        Scanning the default tree also drops entries of deleted files.
+        Returns the checks of the broken files.
+        """
+        scan_all = paths is None
+        paths = collect_files([d for d in DEFAULT_DIRS if d.exists()]) if scan_all else \
+            [Path(path) for path in paths if Path(path).suffix.lower() in SUFFIXES and Path(path).exists()]
+        checks, _ = self.check(paths)
+        broken = []
+        with self._lock:
+            for check in checks:
+                if check.problem:
+                    broken.append(check)
+                    log(f"❌ {manifest_key(check.path)}: {check.problem} - not recorded")
+                    continue
+                entry = {"sha256": check.sha256, "size": check.size}
+                for name in ("width", "height", "pages"):
+                    if getattr(check, name) is not None:
+                        entry[name] = getattr(check, name)
+                entry["prompt_sha256"] = prompt_hash or find_prompt_hash(check.path)
+                self.entries[manifest_key(check.path)] = entry
+            if scan_all:
+                for key in [key for key in self.entries if not (DOCS_DIR / key).exists()]:
+                    del self.entries[key]
+        self.save()
+        return broken
+
+    def verify(self, full=False):
+        """Compare every generated file with its manifest entry"""
+        report = VerifyReport()
+        paths = collect_files([d for d in DEFAULT_DIRS if d.exists()])
+        checks, report.hashed = self.check(paths, full=full)
+        report.checked = len(checks)
+        for check in checks:
+            key = manifest_key(check.path)
+            entry = self.entries.get(key)
+            if check.problem:
+                report.problems[key] = check.problem
+            elif entry is None:
+                report.untracked.append(key)
+            elif check.size != entry["size"]:
+                report.problems[key] = f"{check.size} bytes, manifest says {entry['size']}"
+            elif check.sha256 != entry["sha256"]:
+                report.problems[key] = "content differs from the manifest (run update if it was regenerated)"
+        seen = {manifest_key(path) for path in paths}
+        report.missing = sorted(key for key in self.entries if key not in seen)
+        with self._lock:
+            self._dump(self.state, self.state_path, indent=None)
+        return report
+
+_shared_manifest = None
+_shared_lock = threading.Lock()
+
+def get_manifest(**kwargs):
+    """Return the process-wide manifest, creating it on first use"""
+    global _shared_manifest
+    with _shared_lock:
+        if _shared_manifest is None:
+            _shared_manifest = AssetManifest(**kwargs)
+        return _shared_manifest
+
+def main():
+    parser = argparse.ArgumentParser(description="Record and verify the integrity of generated PNGs/PDFs")
+    parser.add_argument("command", choices=("verify", "update"))
+    parser.add_argument("paths", nargs="*", help="update: files to record (default: every generated file)")
+    parser.add_argument("--full", action="store_true", help="verify: re-hash every file, not just changed ones")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"hashing threads (default: {DEFAULT_WORKERS})")
+    args = parser.parse_args()
+
+    manifest = get_manifest(workers=args.workers)
+    start = time.perf_counter()
+    if args.command == "update":
+        broken = manifest.update(args.paths or None)
+        print(f"📋 {len(manifest.entries)} files in {manifest.path.name} ({time.perf_counter() - start:.2f}s)")
+        sys.exit(1 if broken else 0)
+
+    report = manifest.verify(full=args.full)
+    for key, problem in sorted(report.problems.items()):
+        print(f"❌ {key}: {problem}")
+    for key in report.missing:
+        print(f"❓ {key}: missing")
+    for key in report.untracked:
+        print(f"➕ {key}: not in the manifest (run update)")
+    print(f"🔐 {report.checked} files checked, {report.hashed} re-hashed in {time.perf_counter() - start:.2f}s")
+    print("✅ All files match the manifest" if report.ok else
+          f"⚠️  {len(report.problems)} broken or changed, {len(report.missing)} missing")
+    sys.exit(0 if report.ok else 1)
+
+if __name__ == "__main__":
+    main()
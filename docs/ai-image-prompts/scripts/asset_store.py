@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Content-addressed store for generated images
+Keeps each distinct image on disk once, however many paths it is published to
+
+.asset-store/refs.json next to this script (override with ASSET_STORE_DIR)
+maps every output/asset path to the sha256 of the image it should hold.
+Identical images are deduplicated on ingest:
+
+- Where the filesystem can reflink (Btrfs, XFS, APFS), the image is also
+  cloned to .asset-store/blobs/<sha[:2]>/<sha256> and every path holding it
+  is a copy-on-write clone of that blob.
+- Elsewhere (ext4) nothing is copied into the store. A duplicate under
+  ai-image-prompts/, which the site does not publish, is replaced by a
+  relative symlink to the published copy, so output/ keeps no second copy
+  on disk or in git. Published paths stay regular files.
+
+Regular paths never share an inode with a blob or with each other, so
+rewriting one in place (PIL's Image.save, cp onto an existing file) only
+changes that path; gc notices it no longer matches. A symlinked output/ path
+is the published image itself: replace it (as image_generator,
+image_optimizer and the slide writers do) rather than writing into it.
+Blobs that earlier versions of the store copied or hardlinked are dropped
+on the next ingest. checkout and revert need a
+source for the old bytes: the blob, or another path that still holds them.
+Without reflinks a replaced image that no other path holds cannot be
+reverted by the store (git still has it).
+
+Usage:
+    python asset_store.py ingest               # store docs/assets and output images
+    python asset_store.py status
+    python asset_store.py checkout             # restore deleted paths
+    python asset_store.py gc [--dry-run]       # prune blobs and refs nothing holds
+"""
+
+import os
+import sys
+import json
+import fcntl
+import shutil
+import hashlib
+import argparse
+import tempfile
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+DOCS_DIR = SCRIPT_DIR.parents[1]
+DEFAULT_STORE_DIR = SCRIPT_DIR / ".asset-store"
+WORK_DIR = SCRIPT_DIR.parent  # ai-image-prompts/, excluded from the Jekyll site
+DEFAULT_DIRS = (DOCS_DIR / "assets", WORK_DIR / "output")  # published copies first: they are the ones kept
+IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg", ".webp", ".avif")
+FICLONE = 0x40049409  # Linux ioctl: make the destination share the source's extents copy-on-write
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _key(path):
+    """Absolute path with its directories resolved; a symlinked file stays itself"""
+    path = Path(path)
+    return path.parent.resolve() / path.name
+
+def _linkable(path):
+    """Only unpublished paths may be symlinks (the site build does not follow them)"""
+    return WORK_DIR in Path(path).parents
+
+def _symlink(source, destination):
+    """Atomically replace destination with a relative symlink to source"""
+    destination = Path(destination)
+    tmp_path = destination.parent / f".{destination.name}.{os.getpid()}.link"
+    os.symlink(os.path.relpath(source, destination.parent), tmp_path)
+    try:
+        os.replace(tmp_path, destination)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+def _same_file(a, b):
+    try:
+        return os.path.samefile(a, b)
+    except OSError:
+        return False
+
+def _clone(source, tmp_path):
+    """Reflink source into the empty file tmp_path; False when the filesystem cannot"""
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        with open(source, "rb") as src, open(tmp_path, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return True
+    except OSError:
+        return False
+
+def _clone_or_copy(source, destination, copy=True):
+    """
+    Atomically replace destination with a copy-on-write clone of source.
+
+    When the filesystem cannot clone, source is copied, or with copy=False
+    destination is left alone. Returns True when a clone was made.
+    """
+    destination = Path(destination)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=destination.parent, prefix=f".{destination.name}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        cloned = _clone(source, tmp_path)
+        if not cloned and not copy:
+            os.remove(tmp_path)
+            return False
+        if not cloned:
+            shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, destination)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return cloned
+
+@dataclass
+class StoreStatus:
+    """Tracked paths, the distinct images behind them and what the store itself takes on disk"""
+    paths: int = 0
+    distinct: int = 0
+    linked: int = 0
+    blobs: int = 0
+    logical_bytes: int = 0
+    stored_bytes: int = 0
+    missing: int = 0
+
+class AssetStore:
+    """sha256-addressed blobs plus a thread-safe path → sha256 manifest"""
+
+    def __init__(self, root=None):
+        self.root = Path(root or os.getenv("ASSET_STORE_DIR") or DEFAULT_STORE_DIR)
+        self.blobs_dir = self.root / "blobs"
+        self.refs_path = self.root / "refs.json"
+        self._lock = threading.Lock()
+        try:
+            with open(self.refs_path, "r", encoding="utf-8") as f:
+                self.refs = json.load(f)
+        except (OSError, ValueError):
+            self.refs = {}
+
+    def _save(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".refs.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self.refs, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.refs_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def blob_path(self, sha):
+        return self.blobs_dir / sha[:2] / sha
+
+    def _holder(self, sha, exclude=None):
+        """A tracked regular file (not a symlink) that still holds sha, or None"""
+        for path, path_sha in self.refs.items():
+            path = Path(path)
+            if path_sha == sha and path != exclude and not path.is_symlink() and self._is_current(path, sha):
+                return path
+        return None
+
+    def _publish(self, source, path, copy=True):
+        """
+        Give path source's bytes: a reflink, else (for an unpublished path and
+        a source outside the store) a symlink, else a copy unless copy=False.
+        """
+        if _clone_or_copy(source, path, copy=False):
+            return
+        if _linkable(path) and self.blobs_dir not in Path(source).parents:
+            _symlink(source, path)
+        elif copy:
+            _clone_or_copy(source, path)
+
+    def ingest(self, path):
+        """
+        Record path's content in the store and return its sha256.
+
+        A new image is cloned into the store when the filesystem can reflink
+        and is otherwise only recorded. A path whose bytes are already held
+        is deduplicated against that copy (see the module docstring).
+        """
+        path = _key(path)
+        sha = file_sha256(path)
+        blob = self.blob_path(sha)
+        with self._lock:
+            if blob.exists() and not _clone_or_copy(blob, path, copy=False):
+                # A plain copy or a hardlink left by an older store: the paths hold these bytes
+                blob.unlink()
+            if not blob.exists():
+                holder = self._holder(sha, exclude=path)
+                if holder is None:
+                    # A blob only when it costs no space
+                    if not _clone_or_copy(path, blob, copy=False) and not any(blob.parent.iterdir()):
+                        blob.parent.rmdir()
+                elif path.is_symlink() and _same_file(path, holder):
+                    pass
+                elif _linkable(holder) and not _linkable(path):
+                    self._publish(path, holder, copy=False)  # the published copy is the one kept
+                else:
+                    self._publish(holder, path, copy=False)
+            if self.refs.get(str(path)) != sha:
+                self.refs[str(path)] = sha
+                self._save()
+        return sha
+
+    def ingest_many(self, paths):
+        """Ingest every existing file in paths; returns {path: sha256}"""
+        return {str(path): self.ingest(path) for path in paths if Path(path).is_file()}
+
+    def lookup(self, path):
+        """Blob or other path holding path's recorded content, or None"""
+        path = _key(path)
+        sha = self.refs.get(str(path))
+        if not sha:
+            return None
+        if self.blob_path(sha).exists():
+            return self.blob_path(sha)
+        return self._holder(sha, exclude=path)
+
+    def revert(self, path):
+        """Put back the stored content of a path that was replaced; True when there was one"""
+        path = _key(path)
+        source = self.lookup(path)
+        if source is None or self._is_current(path, self.refs[str(path)]):
+            return False
+        self._publish(source, path)
+        return True
+
+    def checkout(self, paths=None):
+        """Recreate missing paths (or dangling symlinks); returns the restored paths"""
+        restored = []
+        for path in paths or list(self.refs):
+            path = _key(path)
+            if path.exists():
+                continue
+            source = self.lookup(path)
+            if source is not None:
+                self._publish(source, path)
+                restored.append(path)
+        return restored
+
+    def _is_current(self, path, sha):
+        """True when path still holds the content recorded for it"""
+        return Path(path).exists() and file_sha256(path) == sha
+
+    def gc(self, dry_run=False):
+        """
+        Drop refs to paths that were deleted or replaced, then delete the
+        blobs no ref points at. Returns (removed blobs, bytes freed).
+        """
+        with self._lock:
+            stale = [path for path, sha in self.refs.items() if not self._is_current(Path(path), sha)]
+            live = {sha for path, sha in self.refs.items() if path not in stale}
+            removed, freed = 0, 0
+            for blob in sorted(self.blobs_dir.glob("*/*")) if self.blobs_dir.exists() else []:
+                if blob.name in live or blob.name.startswith("."):
+                    continue
+                removed += 1
+                freed += blob.stat().st_size
+                if not dry_run:
+                    blob.unlink()
+            if not dry_run:
+                for path in stale:
+                    del self.refs[path]
+                if stale:
+                    self._save()
+                for shard in self.blobs_dir.glob("*") if self.blobs_dir.exists() else []:
+                    if shard.is_dir() and not any(shard.iterdir()):
+                        shard.rmdir()
+        return removed, freed
+
+    def status(self):
+        status = StoreStatus(paths=len(self.refs), distinct=len(set(self.refs.values())))
+        for path in self.refs:
+            path = Path(path)
+            if path.exists():
+                status.logical_bytes += path.stat().st_size
+                status.linked += path.is_symlink()
+            else:
+                status.missing += 1
+        for blob in self.blobs_dir.glob("*/*") if self.blobs_dir.exists() else []:
+            status.blobs += 1
+            status.stored_bytes += blob.stat().st_size
+        return status
+
+def collect_images(sources):
+    """Image files under the given files/directories (recursively)"""
+    images = []
+    for source in sources:
+        source = Path(source)
+        candidates = sorted(source.rglob("*")) if source.is_dir() else [source]
+        images.extend(path for path in candidates if path.is_file() and path.suffix.lower() in IMAGE_SUFFIXES)
+    return images
+
+_shared_store = None
+_shared_lock = threading.Lock()
+
+def get_store(**kwargs):
+    """Return the process-wide store, creating it on first use"""
+    global _shared_store
+    with _shared_lock:
+        if _shared_store is None:
+            _shared_store = AssetStore(**kwargs)
+        return _shared_store
+
+def main():
+    parser = argparse.ArgumentParser(description="Deduplicate generated images into a content-addressed store")
+    parser.add_argument("command", choices=("ingest", "status", "checkout", "gc"))
+    parser.add_argument("paths", nargs="*", help="files or directories to ingest (default: docs/assets)")
+    parser.add_argument("--dry-run", action="store_true", help="gc: only report what would be deleted")
+    args = parser.parse_args()
+
+    store = get_store()
+    if args.command == "ingest":
+        images = collect_images(args.paths or [path for path in DEFAULT_DIRS if path.exists()])
+        shas = store.ingest_many(images)
+        print(f"📥 Ingested {len(shas)} images: {len(set(shas.values()))} distinct")
+    elif args.command == "checkout":
+        restored = store.checkout()
+        for path in restored:
+            print(f"♻️  {Path(path).relative_to(DOCS_DIR) if DOCS_DIR in Path(path).parents else path}")
+        print(f"✅ Restored {len(restored)} paths")
+    elif args.command == "gc":
+        removed, freed = store.gc(dry_run=args.dry_run)
+        verb = "Would remove" if args.dry_run else "Removed"
+        print(f"🧹 {verb} {removed} unreferenced blobs ({freed / 1024 / 1024:.1f} MB)")
+
+    status = store.status()
+    print(f"🗄️  {status.paths} paths → {status.distinct} distinct images ({status.linked} symlinked), "
+          f"{status.logical_bytes / 1024 / 1024:.1f} MB of images")
+    print(f"   Store: {status.blobs} reflinked blobs, {status.stored_bytes / 1024 / 1024:.1f} MB apparent size")
+    if status.missing:
+        print(f"⚠️  {status.missing} paths are missing - run 'checkout' to restore them")
+
+if __name__ == "__main__":
+    main()
@@ -56,12 +56,10 @@ if [ "$COLOR_VALUE" = "#3B82F6" ] && [ "$COLOR_THEME" != "electric-blue" ]; then
 fi
 
 # Paths
-DOCS_DIR="/Users/victorsaly/Documents/StormDev/ConquerTheWorldGame/docs"
+DOCS_DIR="$(cd "$(dirname "$0")/../.." && pwd)"
 BLOG_POST_PATH="$DOCS_DIR/_posts"
 PROMPT_DIR="$DOCS_DIR/ai-image-prompts/blog-post-prompts"
 SCRIPTS_DIR="$DOCS_DIR/ai-image-prompts/scripts"
-OUTPUT_DIR="$DOCS_DIR/ai-image-prompts/output"
-ASSETS_DIR="$DOCS_DIR/assets/linkedin-images"
 
 # Find the blog post file
 BLOG_POST_FILE=""
@@ -95,134 +93,29 @@ echo "  📌 Title: $TITLE"
 echo "  📝 Excerpt: $EXCERPT"
 echo "  🏷️  Tags: $TAGS"
 
-# Step 2: Generate AI prompt
+# Steps 2-5: prompt → image → optimized asset → front matter, rebuilding only what is stale
 echo ""
-echo "🤖 Step 2: Generating AI image prompt..."
-
-PROMPT_FILE="$PROMPT_DIR/$BLOG_POST_BASENAME.md"
-
-cat > "$PROMPT_FILE" << EOF
-# 🎨 $TITLE - LinkedIn Image Prompt
-
-## 📝 Azure OpenAI DALL-E 3 Optimized Prompt
-
-Create a professional LinkedIn article image with a modern, vibrant educational technology design.
-
-VISUAL STYLE REQUIREMENTS:
-- Modern professional design with vibrant colors and gradients
-- Primary color scheme: $COLOR_THEME $COLOR_VALUE with complementary colors
-- Clean, readable typography for any text elements
-- Professional LinkedIn article header format (1792x1024px)
-- Modern gradient backgrounds and sophisticated color combinations
-- High contrast for excellent readability
-
-CONSISTENT ELEMENTS TO INCLUDE:
-- Modern cloud infrastructure symbols (servers, databases, deployment pipelines)
-- DevOps and deployment indicators (blue/green environments, arrows, switches)
-- Educational technology elements (digital classrooms, learning interfaces, student devices)
-- Professional development symbols (code, APIs, monitoring dashboards)
-- Network and connectivity patterns (flowing data, seamless connections)
-
-MOOD & ATMOSPHERE:
-- Professional and modern technology aesthetic
-- Innovation-focused with vibrant energy
-- Educational and inspiring with dynamic visuals
-- Modern technology with sophisticated design elements
-- Collaborative and cutting-edge technology showcase
-
-TEXT PLACEMENT:
-- Leave space for article title overlay (top third of image)
-- Ensure text readability against background
-- Consider LinkedIn mobile and desktop viewing
-
-BRAND CONSISTENCY:
-- World Leaders Game project branding
-- AI-first development methodology visual representation
-- Educational gaming for children theme
-- Father-son development partnership narrative
-
-SPECIFIC CONTEXT FOR THIS IMAGE:
-$EXCERPT
-
-ARTICLE FOCUS:
-$TITLE - Focus on the main themes and technical concepts discussed in this educational technology blog post.
-
-KEY VISUAL METAPHORS:
-- Educational technology innovation and development
-- AI-assisted learning and development workflows
-- Child-friendly educational gaming environments
-- Professional development with educational impact
-- Technical excellence in service of education
-
-TECHNICAL ELEMENTS TO HIGHLIGHT:
-- Educational technology symbols and interfaces
-- AI development workflow indicators
-- Child-safe educational platform elements
-- Professional development tools and processes
-- Modern educational technology stack
-
-TARGET AUDIENCE: Educational Technology Directors, Developers, Teachers, AI Enthusiasts
-
-COLOR SCHEME: Vibrant $COLOR_THEME $COLOR_VALUE with modern gradients and complementary colors
-EOF
-
-echo "  ✅ Prompt generated: $PROMPT_FILE"
-
-# Step 3: Generate the image
-echo ""
-echo "🎨 Step 3: Generating LinkedIn image with OpenAI DALL-E 3..."
-
-cd "$SCRIPTS_DIR"
-./generate.sh "$BLOG_POST_BASENAME"
-
-if [ $? -ne 0 ]; then
-    echo "❌ Image generation failed"
-    exit 1
+echo "🔨 Steps 2-5: Building prompt, image, asset and front matter..."
+
+# Prefer the project virtualenv, then whatever python3 is on PATH (override with PYTHON=...)
+if [ -z "$PYTHON" ]; then
+    if [ -x "$DOCS_DIR/../.venv/bin/python" ]; then
+        PYTHON="$DOCS_DIR/../.venv/bin/python"
+    else
+        PYTHON="python3"
+    fi
 fi
 
-# Step 4: Move image to assets directory
-echo ""
-echo "📁 Step 4: Moving image to assets directory..."
-
-SOURCE_IMAGE="$OUTPUT_DIR/$BLOG_POST_BASENAME-linkedin.png"
-TARGET_IMAGE="$ASSETS_DIR/$BLOG_POST_BASENAME-linkedin.png"
-
-if [ -f "$SOURCE_IMAGE" ]; then
-    mv "$SOURCE_IMAGE" "$TARGET_IMAGE"
-    echo "  ✅ Image moved to: $TARGET_IMAGE"
-else
-    echo "❌ Source image not found: $SOURCE_IMAGE"
+if ! "$PYTHON" "$SCRIPTS_DIR/build-blog-images.py" "$BLOG_POST_BASENAME" --color "$COLOR_THEME"; then
+    echo "❌ Image build failed"
     exit 1
 fi
 
-# Step 5: Update blog post with image reference
-echo ""
-echo "📝 Step 5: Updating blog post with image reference..."
-
-# Create a temporary file for the updated content
-TEMP_FILE=$(mktemp)
-
-# Check if image field already exists
-if grep -q "^image:" "$BLOG_POST_FILE"; then
-    echo "  🔄 Updating existing image field..."
-    # Replace existing image field
-    sed "s|^image:.*|image:|" "$BLOG_POST_FILE" > "$TEMP_FILE"
-    sed -i '' "/^image:$/a\\
-  path: /assets/linkedin-images/$BLOG_POST_BASENAME-linkedin.png\\
-  alt: \"Professional LinkedIn image - $TITLE\"" "$TEMP_FILE"
-else
-    echo "  ➕ Adding new image field..."
-    # Add image field after excerpt
-    sed "/^excerpt:/a\\
-image:\\
-  path: /assets/linkedin-images/$BLOG_POST_BASENAME-linkedin.png\\
-  alt: \"Professional LinkedIn image - $TITLE\"" "$BLOG_POST_FILE" > "$TEMP_FILE"
-fi
-
-# Replace the original file
-mv "$TEMP_FILE" "$BLOG_POST_FILE"
-
-echo "  ✅ Blog post updated with image reference"
+# The build may reuse an image the post already referenced
+IMAGE_PATH=$(grep -A1 "^image:" "$BLOG_POST_FILE" | grep "path:" | sed 's/.*path: *//' | tr -d '"')
+TARGET_IMAGE="$DOCS_DIR$IMAGE_PATH"
+PROMPT_FILE="$PROMPT_DIR/$(basename "$IMAGE_PATH" -linkedin.png).md"
+[ -f "$PROMPT_FILE" ] || PROMPT_FILE="$PROMPT_DIR/$BLOG_POST_BASENAME.md"
 
 # Step 6: Summary
 echo ""
@@ -230,9 +123,9 @@ echo "🎉 SUCCESS! LinkedIn image generation complete!"
 echo "=============================================="
 echo "📄 Blog post: $BLOG_POST_BASENAME"
 echo "🎨 Color theme: $COLOR_THEME ($COLOR_VALUE)"
-echo "🖼️  Image: /assets/linkedin-images/$BLOG_POST_BASENAME-linkedin.png"
+echo "🖼️  Image: $IMAGE_PATH"
 echo "📝 Prompt: $PROMPT_FILE"
-echo "💰 Cost: ~$0.08"
+echo '💰 Cost: ~$0.08 per regenerated image (unchanged posts cost nothing)'
 echo ""
 echo "📊 Ready for:"
 echo "  - LinkedIn sharing"
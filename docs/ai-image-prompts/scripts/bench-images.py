@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Offline throughput/latency benchmark for the image generation pipeline
+Drives the real generation and download code against mock_image_api.py
+
+Scenarios:
+    generate   the generate-image.py --batch path (image_generator.run_batch)
+    carousel   regenerate-and-download-carousel.py's generate_all_slides()
+    download   the shared downloader fetching freshly generated blob URLs
+
+Each scenario reports p50/p95/p99 latency, images/minute and bytes/second.
+Pass several --concurrency values to sweep them, --cache with --rounds 2 to
+measure warm-cache runs, and --json to keep results for comparison.
+
+    python bench-images.py --count 24 --concurrency 1 3 6 --latency 1.5
+    python bench-images.py --scenario download --bandwidth 4 --rate-limit-rate 0.1
+
+A mock server is started in-process unless --base-url points at a running one.
+No request ever goes to the real API.
+"""
+
+import io
+import os
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import importlib.util
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List
+
+from downloads import DownloadJob, download_all
+from http_client import get_client, read_body
+from image_cache import ImageCache
+from image_generator import PROMPTS_DIR, BatchItem, api_url, load_prompt, run_batch
+from mock_image_api import MockImageAPI, add_config_arguments, config_from_args
+from prompt_index import DEFAULT_INDEX_PATH
+from rate_limiter import configure_limiter, retry_after_seconds
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+DOCS_DIR = SCRIPT_DIR.parents[1]
+SCENARIOS = ("generate", "carousel", "download")
+DEFAULT_COUNT = 12
+BENCH_RPM = 6000  # keep the client-side limiter out of the way unless --rpm says otherwise
+
+@dataclass
+class ScenarioResult:
+    """Measurements from one scenario run"""
+    scenario: str
+    concurrency: int
+    round: int
+    images: int
+    failed: int
+    wall: float
+    bytes: int
+    latencies: List[float] = field(default_factory=list)
+    server: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def images_per_minute(self):
+        return self.images / self.wall * 60 if self.wall else 0.0
+
+    @property
+    def bytes_per_second(self):
+        return self.bytes / self.wall if self.wall else 0.0
+
+    def percentile(self, pct):
+        return percentile(self.latencies, pct)
+
+    def summary(self):
+        data = asdict(self)
+        data.update({"p50": self.percentile(50), "p95": self.percentile(95), "p99": self.percentile(99),
+                     "images_per_minute": self.images_per_minute, "bytes_per_second": self.bytes_per_second})
+        return data
+
+def percentile(values, pct):
+    """Nearest-rank percentile (0.0 for an empty list)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+def load_script(filename, module_name):
+    """Import a hyphenated script from docs/ as a module"""
+    spec = importlib.util.spec_from_file_location(module_name, DOCS_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+@contextlib.contextmanager
+def quiet(enabled=True):
+    """Swallow the per-image progress output the pipeline prints"""
+    if not enabled:
+        yield
+        return
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+def prompt_files(count):
+    """count prompt files, cycling through the available ones"""
+    available = sorted(path for path in PROMPTS_DIR.glob("*.md"))
+    return [available[i % len(available)] for i in range(count)]
+
+def run_generate(args, concurrency, cache, work_dir):
+    items = [BatchItem(f"{path.stem}-{i}", path, work_dir / f"{i:03d}-{path.stem}.png", args.size)
+             for i, path in enumerate(prompt_files(args.count))]
+    with quiet(not args.verbose):
+        results = asyncio.run(run_batch(items, concurrency, cache, response_format=args.response_format,
+                                        max_retries=args.max_retries))
+    ok = [result for result in results if result.success]
+    return ([result.elapsed for result in ok], len(results) - len(ok),
+            sum(result.generation.size_bytes for result in ok))
+
+def run_carousel(args, concurrency, cache, work_dir):
+    carousel = load_script("regenerate-and-download-carousel.py", "regenerate_and_download_carousel")
+    carousel.OUTPUT_DIR = work_dir
+    # Not every hardcoded slide name has a prompt file; bench the ones that do
+    carousel.slides = [slide for slide in carousel.slides if (carousel.PROMPTS_DIR / f"{slide}.md").exists()] \
+        or sorted(path.stem for path in carousel.PROMPTS_DIR.glob("linkedin-carousel-slide-*.md"))
+    with quiet(not args.verbose):
+        results = asyncio.run(carousel.generate_all_slides(concurrency, cache,
+                                                           response_format=args.response_format))
+    ok = [(slide, elapsed) for slide, success, elapsed in results if success]
+    size = sum((work_dir / f"{slide}.png").stat().st_size for slide, _ in ok)
+    return [elapsed for _, elapsed in ok], len(results) - len(ok), size
+
+def request_urls(args, count):
+    """Ask the API for count url-mode images without downloading them"""
+    client = get_client()
+    headers = {"Authorization": f"Bearer {os.environ['OPENAI_API_KEY']}"}
+
+    def request(path):
+        payload = {"prompt": load_prompt(path), "size": args.size, "n": 1}
+        for _ in range(args.max_retries + 1):
+            response = client.post(api_url(), headers=headers, json=payload)
+            if response.status_code == 200:
+                return response.json()["data"][0]["url"]
+            read_body(response)
+            time.sleep(retry_after_seconds(response.headers) or 0.5)
+        return None
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        return [url for url in pool.map(request, prompt_files(count)) if url]
+
+def run_download(args, concurrency, cache, work_dir):
+    """Generate url-mode links first (not timed), then time downloading them in parallel"""
+    urls = request_urls(args, args.count)
+    jobs = [DownloadJob(f"download-{i}", url, work_dir / f"download-{i:03d}.png") for i, url in enumerate(urls)]
+
+    start = time.perf_counter()
+    outcomes = download_all(jobs, workers=concurrency, retries=args.max_retries)
+    wall = time.perf_counter() - start
+    ok = [outcome.result for outcome in outcomes if outcome.success]
+    return [download.elapsed for download in ok], args.count - len(ok), sum(d.bytes for d in ok), wall
+
+RUNNERS = {"generate": run_generate, "carousel": run_carousel, "download": run_download}
+
+def run_scenario(api_stats, args, scenario, concurrency, round_number, cache):
+    configure_limiter(requests_per_minute=args.rpm, burst=concurrency)
+    before = api_stats()
+    with tempfile.TemporaryDirectory(prefix=f"bench-{scenario}-") as work_dir:
+        start = time.perf_counter()
+        measured = RUNNERS[scenario](args, concurrency, cache, Path(work_dir))
+        wall = measured[3] if len(measured) > 3 else time.perf_counter() - start
+    latencies, failed, size = measured[:3]
+    after = api_stats()
+    server = {key: value - before.get(key, 0) for key, value in after.items() if value - before.get(key, 0)}
+    return ScenarioResult(scenario, concurrency, round_number, len(latencies), failed, wall, size,
+                          latencies, server)
+
+def print_results(results):
+    print("\n" + "=" * 104)
+    print(f"{'Scenario':<10} {'Conc':>4} {'Rnd':>3} {'OK':>4} {'Fail':>4} {'p50':>7} {'p95':>7} {'p99':>7} "
+          f"{'Wall':>7} {'img/min':>8} {'MB/s':>7} {'API':>4} {'429':>4} {'5xx':>4}")
+    print("-" * 104)
+    for result in results:
+        server = result.server
+        print(f"{result.scenario:<10} {result.concurrency:>4} {result.round:>3} {result.images:>4} "
+              f"{result.failed:>4} {result.percentile(50):>6.2f}s {result.percentile(95):>6.2f}s "
+              f"{result.percentile(99):>6.2f}s {result.wall:>6.1f}s {result.images_per_minute:>8.1f} "
+              f"{result.bytes_per_second / 1024 / 1024:>7.2f} {server.get('generations', 0):>4} "
+              f"{server.get('status_429', 0):>4} {server.get('status_500', 0):>4}")
+    print("=" * 104)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark image generation and downloads against a mock API")
+    parser.add_argument("--scenario", nargs="+", choices=SCENARIOS, default=list(SCENARIOS),
+                        help="scenarios to run (default: all)")
+    parser.add_argument("--count", type=int, default=DEFAULT_COUNT,
+                        help=f"images per generate/download run (default: {DEFAULT_COUNT}; carousel is fixed)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[3],
+                        help="worker counts to sweep (default: 3)")
+    parser.add_argument("--rounds", type=int, default=1, help="repeat each run (use with --cache for warm runs)")
+    parser.add_argument("--cache", action="store_true", help="use a fresh image cache shared across rounds")
+    parser.add_argument("--size", default="1792x1024", help="requested image size (default: 1792x1024)")
+    parser.add_argument("--response-format", choices=("url", "b64_json"), default="url",
+                        help="generation response format (default: url)")
+    parser.add_argument("--rpm", type=float, default=BENCH_RPM,
+                        help=f"client rate limiter requests/minute (default: {BENCH_RPM})")
+    parser.add_argument("--max-retries", type=int, default=5, help="retries on 429/5xx (default: 5)")
+    parser.add_argument("--base-url", help="use an already running mock server (its OPENAI_BASE_URL)")
+    parser.add_argument("--json", help="write results to this JSON file")
+    parser.add_argument("--verbose", action="store_true", help="show the pipeline's own progress output")
+    add_config_arguments(parser)
+    return parser.parse_args(argv)
+
+def _read_state(path):
+    """Contents of a state file, None when it does not exist"""
+    try:
+        return Path(path).read_bytes()
+    except FileNotFoundError:
+        return None
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    api = None
+    if args.base_url:
+        base_url = args.base_url.rstrip("/")
+        def api_stats():
+            return get_client().get(base_url[:-len("/v1")] + "/stats").json()
+    else:
+        api = MockImageAPI(config_from_args(args)).start()
+        base_url = api.base_url
+        api_stats = api.snapshot
+
+    # Never let a benchmark reach the real API or touch the real URL ledger and
+    # prompt index (mock images must not count as generated from real prompts)
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ["OPENAI_API_KEY"] = "mock-key"
+    state_dir = tempfile.TemporaryDirectory(prefix="bench-state-")
+    os.environ["URL_LEDGER_PATH"] = str(Path(state_dir.name) / "url-ledger.json")
+    os.environ["PROMPT_INDEX_PATH"] = str(Path(state_dir.name) / "prompt-index.json")
+    index_before = _read_state(DEFAULT_INDEX_PATH)
+
+    print("🏁 Image pipeline benchmark")
+    print(f"🔗 API: {base_url}")
+    print(f"🧪 Scenarios: {', '.join(args.scenario)} | concurrency {args.concurrency} | "
+          f"{args.rounds} round(s) | cache {'on' if args.cache else 'off'}")
+
+    results = []
+    try:
+        for scenario in args.scenario:
+            for concurrency in args.concurrency:
+                with tempfile.TemporaryDirectory(prefix="bench-cache-") as cache_dir:
+                    cache = ImageCache(cache_dir) if args.cache else None
+                    for round_number in range(1, args.rounds + 1):
+                        result = run_scenario(api_stats, args, scenario, concurrency, round_number, cache)
+                        results.append(result)
+                        print(f"   {scenario} x{concurrency} round {round_number}: {result.images} ok, "
+                              f"{result.failed} failed in {result.wall:.1f}s")
+    finally:
+        if api:
+            api.stop()
+        state_dir.cleanup()
+        if _read_state(DEFAULT_INDEX_PATH) != index_before:
+            raise RuntimeError(f"the benchmark modified the real prompt index {DEFAULT_INDEX_PATH}")
+
+    print_results(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump([result.summary() for result in results], f, indent=2)
+        print(f"💾 Results written to {args.json}")
+
+    if any(result.failed for result in results):
+        print("⚠️  Some images failed - raise --max-retries or lower the injected error rates")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""
+Incremental LinkedIn image pipeline for blog posts
+post → prompt → image → optimized asset → front matter, rebuilding only what is stale
+
+Each post contributes five nodes to a build graph (see build_graph.py):
+
+    post          title/excerpt/tags from the post's front matter (source)
+    prompt        blog-post-prompts/<name>.md; hand-written prompts are sources,
+                  missing ones are generated from the post like
+                  auto-generate-blog-image.sh used to do
+    image         raw generation in ../output/ (intermediate)
+    asset         optimized PNG in docs/assets/linkedin-images/, plus WebP and
+                  quantized variants (see image_optimizer.py)
+    front matter  the post's image: block pointing at the asset
+
+Newly built assets also get their responsive derivatives and _data/images.yml
+entry (see responsive_images.py). Raw images and assets are recorded in the
+content-addressed store (see asset_store.py), which can restore or revert
+them, and in asset-manifest.json (see asset_manifest.py).
+
+Images, assets and front matter that already exist are adopted on the first
+run, so re-running across every post makes no API calls unless a prompt
+(or the post it was generated from) actually changed.
+
+Usage:
+    python build-blog-images.py                         # every post in docs/_posts
+    python build-blog-images.py retro-pixel --color teal
+    python build-blog-images.py --jobs 4 --dry-run
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+import tempfile
+import threading
+from functools import partial
+from pathlib import Path
+
+from asset_manifest import get_manifest
+from asset_store import get_store
+from build_graph import BuildGraph, Node, hash_text
+from image_cache import ImageCache
+from image_generator import (DEFAULT_RESPONSE_FORMAT, DEFAULT_SIZE, MODEL, OUTPUT_DIR, PROMPTS_DIR, QUALITY,
+                             RESPONSE_FORMATS, generate_image, load_prompt)
+from image_hashes import describe_match, find_near_duplicates, get_phash_index
+from image_optimizer import ImageOptimizer, variant_path
+from prompt_index import get_index
+from rate_limiter import configure_limiter
+from responsive_images import update_manifest
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+DOCS_DIR = SCRIPT_DIR.parents[1]
+POSTS_DIR = DOCS_DIR / "_posts"
+ASSETS_DIR = DOCS_DIR / "assets" / "linkedin-images"
+STATE_PATH = SCRIPT_DIR / ".build-state.json"
+DEFAULT_JOBS = 3
+
+COLOR_THEMES = {
+    "electric-blue": "#3B82F6",
+    "royal-purple": "#8B5CF6",
+    "educational-green": "#10B981",
+    "warm-orange": "#F59E0B",
+    "pink": "#EC4899",
+    "ocean-blue": "#0EA5E9",
+    "gold": "#F59E0B",
+    "teal": "#14B8A6",
+}
+DEFAULT_COLOR = "electric-blue"
+
+PROMPT_TEMPLATE = """# 🎨 {title} - LinkedIn Image Prompt
+
+## 📝 Azure OpenAI DALL-E 3 Optimized Prompt
+
+Create a professional LinkedIn article image with a modern, vibrant educational technology design.
+
+VISUAL STYLE REQUIREMENTS:
+- Modern professional design with vibrant colors and gradients
+- Primary color scheme: {color} {color_value} with complementary colors
+- Clean, readable typography for any text elements
+- Professional LinkedIn article header format (1792x1024px)
+- Modern gradient backgrounds and sophisticated color combinations
+- High contrast for excellent readability
+
+CONSISTENT ELEMENTS TO INCLUDE:
+- Modern cloud infrastructure symbols (servers, databases, deployment pipelines)
+- DevOps and deployment indicators (blue/green environments, arrows, switches)
+- Educational technology elements (digital classrooms, learning interfaces, student devices)
+- Professional development symbols (code, APIs, monitoring dashboards)
+- Network and connectivity patterns (flowing data, seamless connections)
+
+MOOD & ATMOSPHERE:
+- Professional and modern technology aesthetic
+- Innovation-focused with vibrant energy
+- Educational and inspiring with dynamic visuals
+- Modern technology with sophisticated design elements
+- Collaborative and cutting-edge technology showcase
+
+TEXT PLACEMENT:
+- Leave space for article title overlay (top third of image)
+- Ensure text readability against background
+- Consider LinkedIn mobile and desktop viewing
+
+BRAND CONSISTENCY:
+- World Leaders Game project branding
+- AI-first development methodology visual representation
+- Educational gaming for children theme
+- Father-son development partnership narrative
+
+SPECIFIC CONTEXT FOR THIS IMAGE:
+{excerpt}
+
+ARTICLE FOCUS:
+{title} - Focus on the main themes and technical concepts discussed in this educational technology blog post.
+
+KEY VISUAL METAPHORS:
+- Educational technology innovation and development
+- AI-assisted learning and development workflows
+- Child-friendly educational gaming environments
+- Professional development with educational impact
+- Technical excellence in service of education
+
+TECHNICAL ELEMENTS TO HIGHLIGHT:
+- Educational technology symbols and interfaces
+- AI development workflow indicators
+- Child-safe educational platform elements
+- Professional development tools and processes
+- Modern educational technology stack
+
+TARGET AUDIENCE: Educational Technology Directors, Developers, Teachers, AI Enthusiasts
+
+COLOR SCHEME: Vibrant {color} {color_value} with modern gradients and complementary colors
+"""
+
+# ---------------------------------------------------------------------------
+# Front matter
+# ---------------------------------------------------------------------------
+
+def _split_front_matter(text):
+    """Return (front_matter_lines, body) or (None, text) when the post has none"""
+    lines = text.split('\n')
+    if not lines or lines[0].strip() != '---':
+        return None, text
+    for i in range(1, len(lines)):
+        if lines[i].strip() == '---':
+            return lines[1:i], '\n'.join(lines[i:])
+    return None, text
+
+def _unquote(value):
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+        return value[1:-1]
+    return value
+
+def _block(lines, key):
+    """The value of a top-level key plus its indented continuation lines, or None"""
+    for i, line in enumerate(lines):
+        if line.startswith(f"{key}:"):
+            block = [line[len(key) + 1:]]
+            for line in lines[i + 1:]:
+                if line and not line[0].isspace():
+                    break
+                block.append(line)
+            return block
+    return None
+
+def read_front_matter(post_path):
+    """Parse the fields the image pipeline uses: title, excerpt, tags and image path"""
+    lines, _ = _split_front_matter(Path(post_path).read_text(encoding='utf-8'))
+    lines = lines or []
+
+    def scalar(key):
+        block = _block(lines, key)
+        return _unquote(block[0]) if block else ""
+
+    tags = []
+    tag_block = _block(lines, "tags")
+    if tag_block:
+        joined = '\n'.join(tag_block)
+        tags = re.findall(r'"([^"]*)"', joined) or \
+            [_unquote(line.strip()[1:]) for line in tag_block if line.strip().startswith('-')]
+
+    image = ""
+    image_block = _block(lines, "image")
+    if image_block:
+        image = _unquote(image_block[0])
+        for line in image_block[1:]:
+            if line.strip().startswith("path:"):
+                image = _unquote(line.strip()[len("path:"):])
+
+    return {"title": scalar("title"), "excerpt": scalar("excerpt"), "tags": tags, "image": image}
+
+def set_front_matter_image(post_path, image_path, alt):
+    """Point the post's image: block at image_path (replacing any existing block)"""
+    post_path = Path(post_path)
+    lines, body = _split_front_matter(post_path.read_text(encoding='utf-8'))
+    if lines is None:
+        raise ValueError(f"{post_path.name} has no front matter")
+
+    kept = []
+    skipping = False
+    for line in lines:
+        if line.startswith("image:"):
+            skipping = True
+            continue
+        if skipping and line and line[0].isspace():
+            continue
+        skipping = False
+        kept.append(line)
+
+    image_block = ["image:", f"  path: {image_path}", f'  alt: "{alt}"']
+    insert_at = len(kept)
+    for i, line in enumerate(kept):
+        if line.startswith("excerpt:"):
+            insert_at = i + 1
+            while insert_at < len(kept) and kept[insert_at][:1].isspace():
+                insert_at += 1
+            break
+    kept[insert_at:insert_at] = image_block
+
+    text = '\n'.join(['---'] + kept) + '\n' + body
+    fd, tmp_path = tempfile.mkstemp(dir=post_path.parent, prefix=f".{post_path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, post_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+# ---------------------------------------------------------------------------
+# Build steps
+# ---------------------------------------------------------------------------
+
+class Pipeline:
+    """Builds the per-post nodes and performs their build steps"""
+
+    def __init__(self, graph, cache=None, refresh=False, response_format=DEFAULT_RESPONSE_FORMAT,
+                 size=DEFAULT_SIZE, optimizer=None, store=None):
+        self.graph = graph
+        self.optimizer = optimizer or ImageOptimizer()
+        self.store = store or get_store()
+        self.cache = cache
+        self.refresh = refresh
+        self.response_format = response_format
+        self.size = size
+        self.api_calls = 0
+        self.saved_bytes = 0
+        self._lock = threading.Lock()
+
+    def post_nodes(self, post_path, color=None):
+        """Create the node chain for one post and return its front matter goal"""
+        basename = post_path.stem
+        front_matter = read_front_matter(post_path)
+
+        meta = self.graph.meta.setdefault(basename, {})
+        if color:
+            meta["color"] = color
+        color = meta.get("color", DEFAULT_COLOR)
+
+        if front_matter["image"]:
+            asset_path = DOCS_DIR / front_matter["image"].lstrip("/")
+            name = asset_path.stem[:-len("-linkedin")] if asset_path.stem.endswith("-linkedin") else asset_path.stem
+        else:
+            asset_path = ASSETS_DIR / f"{basename}-linkedin.png"
+            name = basename
+        prompt_path = PROMPTS_DIR / f"{name}.md"
+        if not prompt_path.exists() and (PROMPTS_DIR / f"{basename}.md").exists():
+            prompt_path = PROMPTS_DIR / f"{basename}.md"
+        public_path = "/" + asset_path.relative_to(DOCS_DIR).as_posix()
+
+        post = Node(f"post:{basename}", content_hash=lambda: hash_text(
+            front_matter["title"], front_matter["excerpt"], front_matter["tags"]))
+
+        prompt_name = f"prompt:{prompt_path.name}"
+        # Only prompts this pipeline wrote (and nobody edited since) are regenerated
+        if not prompt_path.exists() or self.graph.output_unchanged(prompt_name, prompt_path):
+            prompt = Node(prompt_name, deps=[post], output=prompt_path, build=self.write_prompt, adopt=False,
+                          params={"template": hash_text(PROMPT_TEMPLATE), "color": color,
+                                  "color_value": COLOR_THEMES.get(color, COLOR_THEMES[DEFAULT_COLOR]),
+                                  "title": front_matter["title"], "excerpt": front_matter["excerpt"]})
+        else:
+            # Hand-written (or hand-edited) prompt: its text is the source of truth
+            prompt = Node(prompt_name, content_hash=lambda: get_index().get(prompt_path).prompt_hash)
+        prompt.output = prompt_path
+
+        image = Node(f"image:{name}", deps=[prompt], output=OUTPUT_DIR / f"{name}-linkedin.png",
+                     build=partial(self.generate, prompt_path=prompt_path), intermediate=True,
+                     params={"model": MODEL, "size": self.size, "quality": QUALITY})
+        asset = Node(f"asset:{public_path}", deps=[image], output=asset_path, build=self.optimize)
+        alt = f"Professional LinkedIn image - {front_matter['title']}"
+        return Node(f"front-matter:{basename}", deps=[asset],
+                    build=partial(self.update_front_matter, post_path=post_path, alt=alt),
+                    exists=lambda: read_front_matter(post_path)["image"] == public_path,
+                    params={"image": public_path})
+
+    def write_prompt(self, node):
+        """Generate the prompt markdown from the post's front matter"""
+        text = PROMPT_TEMPLATE.format(**node.params)
+        node.output.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=node.output.parent, prefix=f".{node.output.name}.", suffix=".tmp")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, node.output)
+        print(f"📝 Prompt written: {node.output.name}")
+
+    def generate(self, node, prompt_path):
+        """Generate the raw image for the node's prompt"""
+        prompt_text = load_prompt(prompt_path)
+        if not prompt_text:
+            raise RuntimeError(f"no prompt found in {prompt_path.name}")
+
+        def log(message):
+            print(f"[{node.output.stem}] {message}", flush=True)
+
+        result = generate_image(prompt_text, node.output, size=node.params["size"],
+                                response_format=self.response_format, cache=self.cache,
+                                refresh=self.refresh, log=log)
+        if not result.from_cache and result.attempts:
+            with self._lock:
+                self.api_calls += 1
+        if not result:
+            raise RuntimeError(result.error or "generation failed")
+        get_index().mark_generated(prompt_path, prompt_text)
+        self.store.ingest(node.output)
+        found, fresh = find_near_duplicates([node.output], log=log)
+        for path, matches in found.items():
+            log(f"⚠️  Near-duplicate: {describe_match(path, matches[0])}")
+        for path, hashes in fresh.items():
+            get_phash_index().add(path, hashes)
+
+    def optimize(self, node):
+        """Write the optimized asset (and its web variants) from the raw image"""
+        result = self.optimizer.optimize_to(node.deps[0].output, node.output)
+        if result.error:
+            raise RuntimeError(f"optimization failed: {result.error}")
+        # An asset the optimizer could not shrink is byte-identical to the raw image: store it once
+        outputs = [variant_path(node.output, fmt) for fmt in result.outputs]
+        self.store.ingest_many(outputs)
+        get_manifest().update([node.deps[0].output] + outputs, log=print)
+        with self._lock:
+            self.saved_bytes += result.saved_bytes
+        print(f"🗜️  Asset written: {result.describe()}")
+
+    def update_front_matter(self, node, post_path, alt):
+        """Point the post at its asset"""
+        set_front_matter_image(post_path, node.params["image"], alt)
+        print(f"📝 Front matter updated: {post_path.name} → {node.params['image']}")
+
+def find_posts(patterns):
+    """
+    Posts whose filename contains any of the patterns (all posts when none
+    given). Files without front matter cannot reference an image and are
+    left out.
+    """
+    posts = []
+    for post in sorted(POSTS_DIR.glob("*.md")):
+        if patterns and not any(pattern in post.stem for pattern in patterns):
+            continue
+        if _split_front_matter(post.read_text(encoding='utf-8'))[0] is None:
+            print(f"⏭️  Skipping {post.name} (no front matter)")
+            continue
+        posts.append(post)
+    return posts
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Incrementally build LinkedIn images for blog posts",
+        epilog="Example: python build-blog-images.py retro-pixel --color educational-green"
+    )
+    parser.add_argument("posts", nargs="*", help="post filename fragments (default: every post)")
+    parser.add_argument("--color", choices=sorted(COLOR_THEMES),
+                        help=f"color theme for generated prompts (remembered per post, default: {DEFAULT_COLOR})")
+    parser.add_argument("-j", "--jobs", type=int, default=DEFAULT_JOBS,
+                        help=f"nodes built in parallel (default: {DEFAULT_JOBS})")
+    parser.add_argument("-n", "--dry-run", action="store_true", help="show what would be built")
+    parser.add_argument("--force", action="store_true", help="rebuild every node, ignoring saved state")
+    parser.add_argument("--response-format", choices=RESPONSE_FORMATS, default=DEFAULT_RESPONSE_FORMAT,
+                        help="url or b64_json (see generate-image.py)")
+    parser.add_argument("--no-cache", action="store_true", help="do not use the prompt → image cache")
+    parser.add_argument("--refresh", action="store_true", help="ignore cached images but store new ones")
+    args = parser.parse_args()
+
+    posts = find_posts(args.posts)
+    if not posts:
+        print(f"❌ No blog posts match: {' '.join(args.posts)}")
+        sys.exit(1)
+
+    graph = BuildGraph(STATE_PATH)
+    pipeline = Pipeline(graph, cache=None if args.no_cache else ImageCache(), refresh=args.refresh,
+                        response_format=args.response_format)
+    goals = [pipeline.post_nodes(post, args.color) for post in posts]
+    configure_limiter(burst=args.jobs)
+
+    print(f"🔨 Building images for {len(posts)} posts (jobs: {args.jobs})")
+    start = time.perf_counter()
+    try:
+        report = graph.run(goals, jobs=args.jobs, force=args.force, dry_run=args.dry_run)
+    finally:
+        pipeline.optimizer.close()
+    if not args.dry_run:
+        graph.save()
+        # Keep the srcset ladder in _data/images.yml in step with new assets
+        built_assets = [DOCS_DIR / name[len("asset:/"):] for name in report.built if name.startswith("asset:")]
+        if built_assets:
+            update_manifest(built_assets)
+
+    print("\n" + "=" * 60)
+    if args.dry_run:
+        print(f"🔍 {len(report.planned)} nodes would be built, {report.up_to_date} up to date, "
+              f"{len(report.adopted)} existing outputs would be adopted")
+    else:
+        print(f"✅ Built {len(report.built)} nodes, {report.up_to_date} up to date, "
+              f"{len(report.adopted)} existing outputs adopted")
+        print(f"🌐 API calls: {pipeline.api_calls} (~${pipeline.api_calls * 0.08:.2f})")
+        if pipeline.saved_bytes:
+            print(f"🗜️  Optimization saved {pipeline.saved_bytes // 1024} KB")
+        for name, error in report.failed.items():
+            print(f"❌ {name}: {error}")
+        if report.skipped:
+            print(f"⏭️  {len(report.skipped)} nodes skipped because a dependency failed")
+        print(f"⏱️  {time.perf_counter() - start:.1f}s")
+    print("=" * 60)
+
+    if not report.ok:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Make-style incremental build engine with content hashes
+Rebuilds only stale nodes and runs independent nodes in parallel
+
+Every node has a key: source nodes hash their content, derived nodes hash
+their parameters together with the keys of their dependencies. A derived
+node is up to date when the key recorded at its last build matches and its
+output is still the file that build produced. Because keys are transitive,
+planning walks down from the goals and stops at the first up-to-date node,
+so intermediate outputs (e.g. a raw image whose optimized copy is current)
+are never rebuilt just because they were cleaned up.
+
+Existing outputs seen for the first time are adopted as up to date, which
+lets the engine take over a tree that was built by hand without redoing it.
+State (node keys and output fingerprints) lives in a JSON file.
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+def hash_text(*parts):
+    """sha256 over a sequence of strings (or JSON-serialisable values)"""
+    digest = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, str):
+            part = json.dumps(part, sort_keys=True, ensure_ascii=False)
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+def hash_file(path):
+    """sha256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+@dataclass(eq=False)
+class Node:
+    """
+    One step in the build graph.
+
+    Source nodes have content_hash and no build. Derived nodes have build,
+    which must (re)create output. exists overrides the default "output file
+    exists and is unchanged" check for nodes whose output is not a whole
+    file (e.g. a front matter field). A missing intermediate output does not
+    stop its dependents from being adopted.
+    """
+    name: str
+    deps: List["Node"] = field(default_factory=list)
+    build: Optional[Callable[["Node"], None]] = None
+    output: Optional[Path] = None
+    params: Dict = field(default_factory=dict)
+    content_hash: Optional[Callable[[], str]] = None
+    exists: Optional[Callable[[], bool]] = None
+    adopt: bool = True
+    intermediate: bool = False
+
+    @property
+    def is_source(self):
+        return self.build is None
+
+@dataclass
+class BuildReport:
+    """What a build run did"""
+    built: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+    skipped: List[str] = field(default_factory=list)
+    adopted: List[str] = field(default_factory=list)
+    planned: List[str] = field(default_factory=list)
+    up_to_date: int = 0
+
+    @property
+    def ok(self):
+        return not self.failed and not self.skipped
+
+class BuildGraph:
+    """Plans and runs builds for a set of nodes, persisting keys in state_path"""
+
+    def __init__(self, state_path):
+        self.state_path = Path(state_path)
+        self._lock = threading.Lock()
+        self._keys = {}
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        self.state = state.get("nodes", {})
+        # Free-form settings remembered between runs (e.g. per-post options)
+        self.meta = state.get("meta", {})
+
+    def save(self):
+        with self._lock:
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.state_path.parent, prefix=f".{self.state_path.name}.",
+                                            suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump({"nodes": self.state, "meta": self.meta}, f, indent=1, sort_keys=True)
+                os.replace(tmp_path, self.state_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+    def key(self, node):
+        """Content key of node (memoised for the lifetime of the graph)"""
+        if node.name not in self._keys:
+            if node.is_source:
+                self._keys[node.name] = node.content_hash()
+            else:
+                self._keys[node.name] = hash_text(node.name, node.params, [self.key(dep) for dep in node.deps])
+        return self._keys[node.name]
+
+    def _fingerprint(self, path, previous=None):
+        """[size, mtime_ns, sha256] of path, reusing previous sha when size/mtime match"""
+        stat = path.stat()
+        if previous and previous[0] == stat.st_size and previous[1] == stat.st_mtime_ns:
+            return previous
+        return [stat.st_size, stat.st_mtime_ns, hash_file(path)]
+
+    def _present(self, node, record):
+        """Does the node's output exist as last built (or at all, with record=None)?"""
+        if node.exists is not None:
+            return node.exists()
+        if node.output is None or not node.output.exists():
+            return False
+        if record is None or not record.get("output"):
+            return True
+        return self._fingerprint(node.output, record["output"])[2] == record["output"][2]
+
+    def output_unchanged(self, name, path):
+        """True when path is still exactly the output recorded for node name"""
+        record = self.state.get(name)
+        if not record or not record.get("output") or not Path(path).exists():
+            return False
+        return self._fingerprint(Path(path), record["output"])[2] == record["output"][2]
+
+    def _record(self, node):
+        record = {"key": self.key(node)}
+        if node.exists is None and node.output is not None and node.output.exists():
+            record["output"] = self._fingerprint(node.output)
+        with self._lock:
+            self.state[node.name] = record
+
+    def plan(self, goals, force=False, report=None, write=True):
+        """
+        Return the derived nodes that must be built for goals, dependencies first.
+
+        Up-to-date nodes stop the walk. With force=True every derived node
+        reachable from the goals is rebuilt. write=False plans without
+        recording adopted outputs (for dry runs).
+        """
+        report = report or BuildReport()
+        order = []
+        visited = set()
+        satisfied = {}
+
+        def is_satisfied(node):
+            """Up to date (or adoptable) without building anything"""
+            if node.is_source or force:
+                return node.is_source
+            if node.name in satisfied:
+                return satisfied[node.name]
+            record = self.state.get(node.name)
+            result = False
+            if record and record.get("key") == self.key(node) and self._present(node, record):
+                report.up_to_date += 1
+                result = True
+            elif record is None and node.adopt and self._present(node, None) and \
+                    all(dep.intermediate or is_satisfied(dep) for dep in node.deps):
+                if write:
+                    self._record(node)
+                report.adopted.append(node.name)
+                result = True
+            satisfied[node.name] = result
+            return result
+
+        def visit(node):
+            if node.name in visited or is_satisfied(node):
+                return
+            visited.add(node.name)
+            for dep in node.deps:
+                visit(dep)
+            order.append(node)
+
+        for goal in goals:
+            visit(goal)
+        report.planned = [node.name for node in order]
+        if write and report.adopted:
+            self.save()
+        return order
+
+    def run(self, goals, jobs=1, force=False, dry_run=False, log=print):
+        """Build every stale node needed by goals with up to jobs nodes in parallel"""
+        report = BuildReport()
+        order = self.plan(goals, force=force, report=report, write=not dry_run)
+        if dry_run:
+            for node in order:
+                log(f"  would build {node.name}")
+            return report
+
+        pending = {node.name: node for node in order}
+        waiting_on = {node.name: {dep.name for dep in node.deps if dep.name in pending} for node in order}
+        dependents = {}
+        for name, deps in waiting_on.items():
+            for dep in deps:
+                dependents.setdefault(dep, []).append(name)
+
+        def build(node):
+            node.build(node)
+            self._record(node)
+            self.save()
+
+        def cancel(name):
+            for child in dependents.get(name, []):
+                if child in pending:
+                    del pending[child]
+                    report.skipped.append(child)
+                    cancel(child)
+
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+            running = {}
+            while pending or running:
+                for name in [n for n in pending if not waiting_on[n] and n not in running.values()]:
+                    running[pool.submit(build, pending[name])] = name
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    del pending[name]
+                    error = future.exception()
+                    if error is not None:
+                        report.failed[name] = str(error)
+                        log(f"❌ {name}: {error}")
+                        cancel(name)
+                        continue
+                    report.built.append(name)
+                    for child in dependents.get(name, []):
+                        waiting_on[child].discard(name)
+
+        return report
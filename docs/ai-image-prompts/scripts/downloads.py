@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Streaming, resumable, atomic file downloads for generated images
+
+Bytes stream in fixed-size chunks into a ".part" file next to the target, so
+memory use does not depend on image size. A dropped connection (or a crashed
+run) resumes from the bytes already on disk with an HTTP Range request. The
+result is checked against Content-Length and, when the server provides one,
+an MD5 header (Azure blob storage sends Content-MD5 / x-ms-blob-content-md5)
+or a caller-supplied sha256 before being renamed into place.
+
+download_all() fetches many files at once from a bounded thread pool that
+shares one keep-alive client, with a per-file deadline and retry budget.
+"""
+
+import os
+import re
+import time
+import base64
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import requests
+
+from http_client import get_client, iter_chunks, read_body
+
+DEFAULT_MAX_RESUMES = 3
+DEFAULT_WORKERS = 6
+DEFAULT_RETRIES = 2
+# Signed blob links answer these when expired or revoked - retrying cannot help
+PERMANENT_STATUS = {401, 403, 404, 410}
+_CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+|\*)")
+
+class DownloadError(Exception):
+    """A download failed or produced a file that did not verify"""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+@dataclass
+class DownloadResult:
+    """Summary of a completed download"""
+    path: Path
+    bytes: int
+    elapsed: float
+    resumes: int
+    sha256: str
+
+def _transient_errors():
+    """Exceptions that mean the connection dropped and a resume is worth trying"""
+    errors = [requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError,
+              requests.exceptions.Timeout]
+    try:
+        import httpx
+        errors.append(httpx.TransportError)
+    except ImportError:
+        pass
+    return tuple(errors)
+
+def part_path_for(output_path):
+    """Location of the in-progress file for output_path"""
+    output_path = Path(output_path)
+    return output_path.with_name(f".{output_path.name}.part")
+
+def _hash_existing(path, hashers):
+    """Feed bytes already on disk into the running hashes (for resumed downloads)"""
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            for hasher in hashers:
+                hasher.update(block)
+
+def _expected_total(response, offset):
+    """Total file size promised by the server, or None when it did not say"""
+    if response.status_code == 206:
+        match = _CONTENT_RANGE.match(response.headers.get("Content-Range", ""))
+        if match and match.group(3) != "*":
+            return int(match.group(3))
+        return None
+    length = response.headers.get("Content-Length")
+    return int(length) if length is not None else None
+
+def _expected_md5(response):
+    """Whole-file MD5 advertised by the server (base64 encoded), if any"""
+    if response.status_code == 200 and response.headers.get("Content-MD5"):
+        return response.headers["Content-MD5"]
+    return response.headers.get("x-ms-blob-content-md5")
+
+def download_file(url, output_path, client=None, verify=True, timeout=None,
+                  max_resumes=DEFAULT_MAX_RESUMES, expected_sha256=None, deadline=None):
+    """
+    Download url to output_path without ever exposing a partial file.
+
+    Returns a DownloadResult; raises DownloadError on HTTP errors, when the
+    resume budget is exhausted, when size/checksum verification fails, or
+    once time.monotonic() passes deadline (the partial file is kept so a
+    later call resumes it).
+    """
+    client = client or get_client()
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    part_path = part_path_for(output_path)
+    transient = _transient_errors()
+
+    start = time.perf_counter()
+    resumes = 0
+
+    while True:
+        offset = part_path.stat().st_size if part_path.exists() else 0
+        # identity encoding keeps Content-Length and byte ranges in raw file bytes
+        headers = {"Accept-Encoding": "identity"}
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+        sha256 = hashlib.sha256()
+        md5 = hashlib.md5()
+
+        try:
+            with client.stream("GET", url, headers=headers, verify=verify, timeout=timeout) as response:
+                if response.status_code == 416 and offset:
+                    read_body(response)
+                    if response.headers.get("Content-Range") != f"bytes */{offset}":
+                        # Our partial file is no longer valid for this resource - start over
+                        part_path.unlink()
+                        continue
+                    # A previous run fetched every byte but never renamed the file
+                    _hash_existing(part_path, (sha256, md5))
+                    expected_total, expected_md5 = offset, None
+                else:
+                    if response.status_code not in (200, 206):
+                        read_body(response)
+                        raise DownloadError(f"HTTP {response.status_code}", response.status_code)
+
+                    if response.status_code == 200:
+                        offset = 0  # fresh download, or the server ignored our Range header
+                    else:
+                        match = _CONTENT_RANGE.match(response.headers.get("Content-Range", ""))
+                        if not match or int(match.group(1)) != offset:
+                            part_path.unlink()
+                            continue
+                        _hash_existing(part_path, (sha256, md5))
+
+                    expected_total = _expected_total(response, offset)
+                    expected_md5 = _expected_md5(response)
+
+                    with open(part_path, "ab" if offset else "wb") as f:
+                        for chunk in iter_chunks(response):
+                            f.write(chunk)
+                            sha256.update(chunk)
+                            md5.update(chunk)
+                            if deadline is not None and time.monotonic() > deadline:
+                                raise DownloadError("deadline exceeded")
+
+        except transient as e:
+            if resumes >= max_resumes:
+                raise DownloadError(f"connection lost after {resumes} resumes: {e}") from e
+            resumes += 1
+            time.sleep(min(2 ** resumes, 10) * 0.25)
+            continue
+
+        size = part_path.stat().st_size
+        if expected_total is not None and size != expected_total:
+            if size < expected_total and resumes < max_resumes:
+                resumes += 1  # body ended early without an exception - resume
+                continue
+            part_path.unlink()
+            raise DownloadError(f"size mismatch: got {size} bytes, expected {expected_total}")
+
+        if expected_md5 and base64.b64encode(md5.digest()).decode() != expected_md5:
+            part_path.unlink()
+            raise DownloadError("MD5 checksum mismatch")
+
+        digest = sha256.hexdigest()
+        if expected_sha256 and digest != expected_sha256.lower():
+            part_path.unlink()
+            raise DownloadError("sha256 checksum mismatch")
+
+        os.replace(part_path, output_path)
+        return DownloadResult(output_path, size, time.perf_counter() - start, resumes, digest)
+
+def download_bytes(url, client=None, verify=True, timeout=None):
+    """
+    Fetch url into memory (for callers that want image bytes, not a file).
+
+    Raises DownloadError on HTTP errors or a body shorter than Content-Length.
+    """
+    client = client or get_client()
+    with client.stream("GET", url, headers={"Accept-Encoding": "identity"},
+                       verify=verify, timeout=timeout) as response:
+        if response.status_code != 200:
+            read_body(response)
+            raise DownloadError(f"HTTP {response.status_code}", response.status_code)
+        expected_total = _expected_total(response, 0)
+        data = b"".join(iter_chunks(response))
+
+    if expected_total is not None and len(data) != expected_total:
+        raise DownloadError(f"size mismatch: got {len(data)} bytes, expected {expected_total}")
+    return data
+
+@dataclass
+class DownloadJob:
+    """One file for download_all()"""
+    name: str
+    url: str
+    output_path: Path
+    expected_sha256: Optional[str] = None
+    deadline: Optional[float] = None  # seconds; overrides download_all()'s deadline
+
+@dataclass
+class JobOutcome:
+    """What happened to a DownloadJob"""
+    job: DownloadJob
+    result: Optional[DownloadResult]
+    error: str
+    attempts: int
+    elapsed: float
+
+    @property
+    def success(self):
+        return self.result is not None
+
+    @property
+    def throughput(self):
+        """Bytes/second of the successful attempt"""
+        if not self.result or not self.result.elapsed:
+            return 0.0
+        return self.result.bytes / self.result.elapsed
+
+def _download_job(job, client, verify, timeout, deadline, retries):
+    """Download one job, retrying transient failures within its time budget"""
+    start = time.monotonic()
+    if job.deadline is not None:
+        deadline = job.deadline
+    cutoff = start + deadline if deadline is not None else None
+    error = ""
+    for attempt in range(1, retries + 2):
+        try:
+            result = download_file(job.url, job.output_path, client=client, verify=verify, timeout=timeout,
+                                   expected_sha256=job.expected_sha256, deadline=cutoff)
+            return JobOutcome(job, result, "", attempt, time.monotonic() - start)
+        except DownloadError as e:
+            error = str(e)
+            if e.status_code in PERMANENT_STATUS:
+                break
+        except requests.exceptions.RequestException as e:
+            error = f"network error: {e}"
+        backoff = min(0.5 * 2 ** (attempt - 1), 5)
+        if attempt > retries or (cutoff is not None and time.monotonic() + backoff >= cutoff):
+            break
+        time.sleep(backoff)
+    return JobOutcome(job, None, error, attempt, time.monotonic() - start)
+
+def download_all(jobs, workers=DEFAULT_WORKERS, client=None, verify=True, timeout=None, deadline=None,
+                 retries=DEFAULT_RETRIES, on_done=None):
+    """
+    Download jobs in parallel over one shared connection pool.
+
+    Up to workers files are in flight at once. Each job gets retries extra
+    attempts for transient errors and at most deadline seconds in total;
+    expired or missing links (401/403/404/410) fail immediately. on_done is
+    called with each JobOutcome as it finishes. Returns outcomes in job order.
+    """
+    client = client or get_client()
+    jobs = list(jobs)
+    outcomes = [None] * len(jobs)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(_download_job, job, client, verify, timeout, deadline, retries): i
+                   for i, job in enumerate(jobs)}
+        for future in as_completed(futures):
+            outcome = outcomes[futures[future]] = future.result()
+            if on_done:
+                on_done(outcome)
+    return outcomes
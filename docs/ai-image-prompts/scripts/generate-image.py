@@ -2,163 +2,283 @@
 """
 OpenAI Direct API Image Generator for LinkedIn Posts
 Alternative to Azure OpenAI when regional restrictions apply
+
+Single prompt:  python generate-image.py <blog-post-name> [output-path]
+Batch mode:     python generate-image.py --batch "../blog-post-prompts/week-*.md" --concurrency 4
+
+This is the command-line front end; other scripts should import
+image_generator and call generate_image() directly.
 """
 
 import os
-import requests
-import json
-from datetime import datetime
+import sys
+import time
+import asyncio
+import argparse
 from pathlib import Path
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+from asset_manifest import get_manifest
+from asset_store import get_store
+from http_client import configure_client
+from image_cache import ImageCache
+from image_hashes import DEFAULT_THRESHOLD, describe_match, find_near_duplicates, get_phash_index
+from image_generator import (DEFAULT_CONCURRENCY, DEFAULT_RESPONSE_FORMAT, DEFAULT_SIZE, OUTPUT_DIR, PROMPTS_DIR,
+                             RESPONSE_FORMATS, changed_batch_items, collect_batch_items, generate_image,
+                             load_prompt, run_batch)
+from image_optimizer import ImageOptimizer
+from prompt_index import get_index
+from rate_limiter import DEFAULT_MAX_RETRIES, DEFAULT_RPM, configure_limiter, get_limiter
+
+def print_batch_report(results, wall_time):
+    """Print a per-item summary table for a batch run"""
+    print("\n" + "=" * 70)
+    print(f"{'Item':<40} {'Status':<8} {'Time':>8} {'Size':>10}")
+    print("-" * 70)
+    for result in results:
+        status = "✅ ok" if result.success else "❌ fail"
+        size = f"{result.file_size_kb} KB" if result.success else "-"
+        print(f"{result.item.name[:40]:<40} {status:<8} {result.elapsed:>7.1f}s {size:>10}")
+        if result.error:
+            print(f"    ↳ {result.error}")
+    print("-" * 70)
+
+    successful = sum(1 for r in results if r.success)
+    serial_time = sum(r.elapsed for r in results)
+    print(f"📊 {successful}/{len(results)} images generated")
+    print(f"⏱️  Wall time: {wall_time:.1f}s (sum of item latencies: {serial_time:.1f}s)")
+    print(f"💰 Estimated cost: ~${successful * 0.08:.2f}")
+    limiter = get_limiter()
+    if limiter.throttled:
+        print(f"🚦 Throttled {limiter.throttled}x, settled at {limiter.requests_per_minute:.1f} requests/min")
+    print("=" * 70)
+
+def main_batch(args):
+    """Run batch generation from parsed CLI arguments"""
+    items = collect_batch_items(args.batch, args.output_dir, args.size) if args.batch else None
+    if args.changed_only:
+        items = changed_batch_items(args.output_dir, args.size, items)
+        if not items:
+            print("✅ No new or changed prompts - nothing to generate")
+            return
+    if not items:
+        print("❌ No prompt files found for batch run")
+        sys.exit(1)
+
+    configure_http(args, min_pool_size=args.concurrency)
+    print(f"🚀 Batch generating {len(items)} images (concurrency: {args.concurrency})")
+    start = time.perf_counter()
+    configure_limiter(requests_per_minute=args.rpm, burst=args.concurrency)
+    results = asyncio.run(run_batch(items, args.concurrency, make_cache(args), args.refresh,
+                                    args.response_format, args.max_retries))
+    print_batch_report(results, time.perf_counter() - start)
+    kept = screen_near_duplicates(args, [r.item.output_path for r in results if r.success])
+    mark_generated(kept, [(r.item.output_path, r.item.prompt_file, r.prompt_text) for r in results if r.success])
+    optimize_outputs(args, kept)
 
-def generate_image_openai_direct(prompt_text, output_path="linkedin_image.png"):
+    if not all(r.success for r in results):
+        sys.exit(1)
+
+def screen_near_duplicates(args, paths):
     """
-    Generate image using OpenAI Direct API (not Azure)
+    Compare new images with the other indexed ones and return the paths to keep.
+
+    --near-duplicates flag only warns; skip discards the new image (putting
+    back the version it replaced, when the asset store has it).
     """
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        print("❌ Error: OPENAI_API_KEY not found in .env file")
-        print("💡 Get your API key from: https://platform.openai.com/api-keys")
-        return False
-    
-    print(f"🎨 Generating LinkedIn image using OpenAI Direct API...")
-    print(f"📐 Size: 1792x1024 (LinkedIn optimized)")
-    print(f"💰 Cost: ~$0.08")
-    
-    # OpenAI Direct API endpoint
-    url = "https://api.openai.com/v1/images/generations"
-    
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
-    
-    payload = {
-        "model": "dall-e-3",
-        "prompt": prompt_text,
-        "size": "1792x1024",  # LinkedIn landscape format
-        "quality": "standard",  # or "hd" for higher quality (+cost)
-        "n": 1
-    }
-    
-    try:
-        print("🔄 Sending request to OpenAI...")
-        response = requests.post(url, headers=headers, json=payload, timeout=60)
-        
-        if response.status_code == 200:
-            result = response.json()
-            image_url = result["data"][0]["url"]
-            
-            print("✅ Image generated successfully!")
-            print(f"🔗 Image URL: {image_url}")
-            
-            # Download the image
-            print("💾 Downloading image...")
-            image_response = requests.get(image_url)
-            
-            if image_response.status_code == 200:
-                # Create output directory if it doesn't exist
-                output_path = Path(output_path)
-                output_path.parent.mkdir(parents=True, exist_ok=True)
-                
-                # Save the image
-                with open(output_path, "wb") as f:
-                    f.write(image_response.content)
-                
-                print(f"✅ Image saved: {output_path}")
-                print(f"📊 File size: {len(image_response.content) // 1024} KB")
-                return True
+    if args.near_duplicates == "off" or not paths:
+        return paths
+    index = get_phash_index()
+    found, fresh = find_near_duplicates(paths, index, args.duplicate_threshold)
+    kept = []
+    for path in paths:
+        path = Path(path).resolve()
+        matches = found.get(path)
+        if matches:
+            print(f"⚠️  Near-duplicate: {describe_match(path, matches[0])}")
+        if matches and args.near_duplicates == "skip":
+            if get_store().revert(path):
+                print(f"⏭️  Kept the previous {path.name}")
             else:
-                print(f"❌ Failed to download image: {image_response.status_code}")
-                return False
-        else:
-            print(f"❌ API Error: {response.status_code}")
-            print(f"📝 Response: {response.text}")
-            return False
-            
-    except requests.exceptions.Timeout:
-        print("❌ Request timed out. Please try again.")
-        return False
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Network error: {e}")
-        return False
-    except Exception as e:
-        print(f"❌ Unexpected error: {e}")
-        return False
+                path.unlink(missing_ok=True)
+                index.forget(path)
+                print(f"⏭️  Discarded {path.name} - reuse {matches[0].name}")
+            continue
+        if path in fresh:
+            index.add(path, fresh[path])
+        kept.append(path)
+    return kept
+
+def mark_generated(kept, generated):
+    """
+    Record the prompts of the images that were kept as generated.
+
+    generated holds (output path, prompt file, prompt text); a prompt whose
+    image screen_near_duplicates discarded stays changed for --changed-only.
+    """
+    kept = {Path(path).resolve() for path in kept}
+    for output_path, prompt_file, prompt_text in generated:
+        if Path(output_path).resolve() in kept:
+            get_index().mark_generated(prompt_file, prompt_text)
+
+def optimize_outputs(args, paths):
+    """Run the optimization stage over new images (unless --no-optimize), then store and record them"""
+    if not paths:
+        return
+    outputs = [Path(path) for path in paths]
+    if not args.no_optimize:
+        print(f"🗜️  Optimizing {len(paths)} image(s)...")
+        with ImageOptimizer() as optimizer:
+            results = optimizer.optimize(paths)
+        saved = sum(result.saved_bytes for result in results)
+        print(f"💾 Optimization saved {saved // 1024} KB (WebP/quantized variants written alongside)")
+        # Only files written for these images; stale variants of older ones stay out
+        outputs = list(dict.fromkeys(outputs + [path for result in results for path in result.paths]))
+    get_store().ingest_many(outputs)
+    get_manifest().update(outputs, log=print)
+
+def configure_http(args, min_pool_size=1):
+    """Set up the shared keep-alive client from CLI flags"""
+    configure_client(pool_size=max(args.pool_size, min_pool_size), http2=args.http2 or None)
+
+def make_cache(args):
+    """Build the image cache requested on the command line (None with --no-cache)"""
+    if args.no_cache:
+        return None
+    return ImageCache(args.cache_dir, args.cache_max_mb, args.cache_max_age_days)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Generate LinkedIn images from prompt files with the OpenAI Direct API",
+        epilog="Example: python generate-image.py voice-memo-to-production"
+    )
+    parser.add_argument("blog_post", nargs="?", help="prompt name in ../blog-post-prompts/")
+    parser.add_argument("output_path", nargs="?", help="output image path")
+    parser.add_argument("--prompt-file", help="explicit prompt markdown file")
+    parser.add_argument("--output", help="output image path (same as the positional output path)")
+    parser.add_argument("--size", default=DEFAULT_SIZE, help=f"image size (default: {DEFAULT_SIZE})")
+    parser.add_argument("--response-format", choices=RESPONSE_FORMATS, default=DEFAULT_RESPONSE_FORMAT,
+                        help="url (download a temporary link) or b64_json (image inline, one request)")
+    parser.add_argument("--b64", dest="response_format", action="store_const", const="b64_json",
+                        help="shorthand for --response-format b64_json")
+    parser.add_argument("--batch", nargs="+", metavar="SOURCE",
+                        help="prompt directory, glob pattern, or manifest (.json/.txt); repeatable")
+    parser.add_argument("--changed-only", action="store_true",
+                        help="batch only prompts that are new or changed since the prompt index last saw them "
+                             "(all of blog-post-prompts/ and linkedin-carousel/ when --batch is omitted)")
+    parser.add_argument("--output-dir", default=str(OUTPUT_DIR),
+                        help="directory for batch output images (default: ../output)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"maximum generations in flight during a batch (default: {DEFAULT_CONCURRENCY})")
+    cache_group = parser.add_argument_group("cache")
+    cache_group.add_argument("--no-cache", action="store_true",
+                             help="always call the API and do not store the result")
+    cache_group.add_argument("--refresh", action="store_true",
+                             help="ignore cached images but store the freshly generated ones")
+    cache_group.add_argument("--cache-dir", help="cache directory (default: scripts/.image-cache)")
+    cache_group.add_argument("--cache-max-mb", type=float, help="cache size limit in MB (default: 500)")
+    cache_group.add_argument("--cache-max-age-days", type=float,
+                             help="evict entries unused for this many days (default: 30)")
+
+    parser.add_argument("--no-optimize", action="store_true",
+                        help="skip the optimization stage (lossless PNG + WebP/quantized variants)")
+    parser.add_argument("--near-duplicates", choices=("flag", "skip", "off"), default="flag",
+                        help="what to do with a new image that looks like an existing one (default: flag)")
+    parser.add_argument("--duplicate-threshold", type=int, default=DEFAULT_THRESHOLD,
+                        help=f"perceptual hash distance in bits that counts as a near-duplicate "
+                             f"(default: {DEFAULT_THRESHOLD})")
+
+    network_group = parser.add_argument_group("network")
+    network_group.add_argument("--http2", action="store_true",
+                               help="use HTTP/2 when httpx[http2] is installed")
+    network_group.add_argument("--rpm", type=float, default=float(os.getenv("IMAGE_RPM", DEFAULT_RPM)),
+                               help="starting requests/minute; adapts to the quota the API reports "
+                                    f"(default: {DEFAULT_RPM})")
+    network_group.add_argument("--max-retries", type=int, default=DEFAULT_MAX_RETRIES,
+                               help=f"retries on 429/5xx responses (default: {DEFAULT_MAX_RETRIES})")
+    network_group.add_argument("--pool-size", type=int, default=int(os.getenv("HTTP_POOL_SIZE", 10)),
+                               help="keep-alive connections per host (default: 10)")
+    return parser.parse_args(argv)
 
 def main():
     """Main function to generate image from command line arguments"""
-    import sys
-    
-    if len(sys.argv) < 2:
-        print("Usage: python generate_image_openai.py <blog-post-name> [output-path]")
-        print("Example: python generate_image_openai.py voice-memo-to-production")
+    args = parse_args()
+
+    if args.batch or args.changed_only:
+        main_batch(args)
+        return
+
+    if not args.blog_post and not args.prompt_file:
+        print("Usage: python generate-image.py <blog-post-name> [output-path]")
+        print("Example: python generate-image.py voice-memo-to-production")
         sys.exit(1)
-    
-    blog_post = sys.argv[1]
-    output_path = sys.argv[2] if len(sys.argv) > 2 else f"../output/{blog_post}-linkedin.png"
-    
-    # Load the prompt for the specified blog post
-    prompt_file = f"../blog-post-prompts/{blog_post}.md"
-    
-    if not os.path.exists(prompt_file):
+
+    if args.prompt_file:
+        prompt_file = Path(args.prompt_file)
+        blog_post = prompt_file.stem
+    else:
+        blog_post = args.blog_post
+        prompt_file = PROMPTS_DIR / f"{blog_post}.md"
+        if not prompt_file.exists():
+            # Fall back to any indexed prompt with that name (e.g. linkedin-carousel slides)
+            entry = get_index().find(blog_post)
+            if entry:
+                prompt_file = entry.file_path
+
+    output_path = args.output or args.output_path or str(OUTPUT_DIR / f"{blog_post}-linkedin.png")
+
+    if not prompt_file.exists():
         print(f"❌ Prompt file not found: {prompt_file}")
         print("Available prompts:")
-        prompt_dir = Path("../blog-post-prompts/")
-        if prompt_dir.exists():
-            for f in prompt_dir.glob("*.md"):
-                print(f"  - {f.stem}")
+        get_index().refresh()
+        for entry in get_index().entries():
+            if entry.prompt:
+                print(f"  - {entry.name}")
         sys.exit(1)
-    
+
+    configure_http(args)
     print(f"📖 Loading prompt from: {prompt_file}")
-    
+
     # Read and extract the prompt from the markdown file
     try:
-        with open(prompt_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-            
-        # Extract the prompt section (between ## 📝 Azure OpenAI DALL-E 3 Optimized Prompt and next ##)
-        lines = content.split('\n')
-        prompt_lines = []
-        in_prompt_section = False
-        
-        for line in lines:
-            if '## 📝 Azure OpenAI DALL-E 3 Optimized Prompt' in line:
-                in_prompt_section = True
-                continue
-            elif line.startswith('## ') and in_prompt_section:
-                break
-            elif in_prompt_section and line.strip():
-                prompt_lines.append(line)
-        
-        prompt_text = '\n'.join(prompt_lines).strip()
-        
-        if not prompt_text:
-            print("❌ Could not extract prompt from file")
-            sys.exit(1)
-            
-        print(f"✅ Prompt loaded ({len(prompt_text)} characters)")
-        print(f"🎯 Blog post: {blog_post}")
-        print(f"📁 Output: {output_path}")
-        
-        # Generate the image
-        success = generate_image_openai_direct(prompt_text, output_path)
-        
-        if success:
-            print(f"\n🎉 LinkedIn image generated successfully!")
-            print(f"📄 Blog post: {blog_post}")
-            print(f"🖼️  Image: {output_path}")
-            print(f"💡 Ready to upload to LinkedIn!")
-        else:
-            print(f"\n❌ Failed to generate image")
-            sys.exit(1)
-            
-    except Exception as e:
+        prompt_text = load_prompt(prompt_file)
+    except (OSError, ValueError) as e:
         print(f"❌ Error reading prompt file: {e}")
         sys.exit(1)
 
+    if not prompt_text:
+        print("❌ Could not extract prompt from file")
+        sys.exit(1)
+
+    print(f"✅ Prompt loaded ({len(prompt_text)} characters)")
+    print(f"🎯 Blog post: {blog_post}")
+    print(f"📁 Output: {output_path}")
+
+    # Generate the image
+    result = generate_image(prompt_text, output_path, size=args.size, response_format=args.response_format,
+                            cache=make_cache(args), refresh=args.refresh,
+                            limiter=configure_limiter(requests_per_minute=args.rpm),
+                            max_retries=args.max_retries)
+    if not result:
+        print(f"\n❌ Failed to generate image")
+        sys.exit(1)
+
+    # The image is saved; screening, optimizing and storing it report their own failures
+    try:
+        kept = screen_near_duplicates(args, [output_path])
+        mark_generated(kept, [(output_path, prompt_file, prompt_text)])
+        optimize_outputs(args, kept)
+    except Exception as e:
+        print(f"\n⚠️  Image saved to {output_path}, but post-processing failed: {e}")
+        sys.exit(1)
+
+    if not kept:
+        return
+    print(f"\n🎉 LinkedIn image generated successfully!")
+    print(f"📄 Blog post: {blog_post}")
+    print(f"🖼️  Image: {output_path}")
+    print(f"⏱️  {result.timings['total']:.1f}s total "
+          f"(request {result.timings['request']:.1f}s, download {result.timings['download']:.1f}s)")
+    print(f"💡 Ready to upload to LinkedIn!")
+
 if __name__ == "__main__":
     main()
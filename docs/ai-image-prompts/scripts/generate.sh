@@ -5,6 +5,19 @@
 
 set -e
 
+# Run from the scripts directory so the relative prompt/output paths resolve
+CALLER_DIR="$PWD"
+cd "$(dirname "$0")"
+
+# Prefer the project virtualenv, then whatever python3 is on PATH (override with PYTHON=...)
+if [ -z "$PYTHON" ]; then
+    if [ -x "../../../.venv/bin/python" ]; then
+        PYTHON="../../../.venv/bin/python"
+    else
+        PYTHON="python3"
+    fi
+fi
+
 echo "🎨 OpenAI Direct API - LinkedIn Image Generator"
 echo "=============================================="
 
@@ -14,12 +27,17 @@ if [ $# -eq 0 ]; then
     echo "Usage: ./generate-openai.sh <blog-post-name> [output-path]"
     echo ""
     echo "Available blog posts:"
-    ls -1 ../blog-post-prompts/*.md 2>/dev/null | sed 's|.*/||; s|\.md$||' | sed 's/^/  - /'
+    "$PYTHON" prompt_index.py --names | sed 's/^/  - /'
     exit 1
 fi
 
 BLOG_POST=$1
 OUTPUT_PATH=${2:-"../output/${BLOG_POST}-linkedin.png"}
+# An explicit output path is relative to where the script was called from
+case "${2:-/}" in
+    /*) ;;
+    *) OUTPUT_PATH="$CALLER_DIR/$2" ;;
+esac
 
 # Check if prompt file exists
 PROMPT_FILE="../blog-post-prompts/${BLOG_POST}.md"
@@ -27,7 +45,7 @@ if [ ! -f "$PROMPT_FILE" ]; then
     echo "❌ Error: Prompt file not found: $PROMPT_FILE"
     echo ""
     echo "Available blog posts:"
-    ls -1 ../blog-post-prompts/*.md 2>/dev/null | sed 's|.*/||; s|\.md$||' | sed 's/^/  - /'
+    "$PYTHON" prompt_index.py --names | sed 's/^/  - /'
     exit 1
 fi
 
@@ -60,7 +78,7 @@ echo "💰 Estimated cost: ~$0.08"
 echo ""
 
 # Run the Python script
-/Users/victorsaly/Documents/StormDev/ConquerTheWorldGame/.venv/bin/python generate-image.py "$BLOG_POST" "$OUTPUT_PATH"
+"$PYTHON" generate-image.py "$BLOG_POST" "$OUTPUT_PATH"
 
 if [ $? -eq 0 ]; then
     echo ""
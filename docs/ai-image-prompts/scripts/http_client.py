@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Shared keep-alive HTTP client for the image generation scripts
+One connection pool per host, reused by every generation and download call
+
+The default backend is a requests.Session with a dedicated HTTPAdapter per host.
+Setting http2=True (or HTTP2=1) switches to httpx with HTTP/2 when httpx[http2]
+is installed, falling back to requests otherwise.
+
+Environment overrides:
+    HTTP_POOL_SIZE         connections kept per host (default: 10)
+    HTTP_CONNECT_TIMEOUT   seconds to establish a connection (default: 10)
+    HTTP_READ_TIMEOUT      seconds to wait for response data (default: 60)
+    HTTP2                  1 to prefer HTTP/2
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_CONNECT_TIMEOUT = 10
+DEFAULT_READ_TIMEOUT = 60
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+def _env_flag(name):
+    return os.getenv(name, "").lower() in ("1", "true", "yes")
+
+def http2_available():
+    """True when httpx with the h2 extra is importable"""
+    try:
+        import httpx  # noqa: F401
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+class PooledHttpClient:
+    """
+    Thread-safe HTTP client with keep-alive pools sized per host.
+
+    host_pool_sizes maps a hostname to its pool size; other hosts use
+    pool_size. timeout is a (connect, read) tuple applied when a call does
+    not pass its own.
+    """
+
+    def __init__(self, pool_size=None, timeout=None, host_pool_sizes=None, http2=None):
+        self.pool_size = pool_size or int(os.getenv("HTTP_POOL_SIZE", DEFAULT_POOL_SIZE))
+        self.timeout = timeout or (
+            float(os.getenv("HTTP_CONNECT_TIMEOUT", DEFAULT_CONNECT_TIMEOUT)),
+            float(os.getenv("HTTP_READ_TIMEOUT", DEFAULT_READ_TIMEOUT)),
+        )
+        self.host_pool_sizes = dict(host_pool_sizes or {})
+
+        wants_http2 = _env_flag("HTTP2") if http2 is None else http2
+        self.http2 = wants_http2 and http2_available()
+        if wants_http2 and not self.http2:
+            print("⚠️  HTTP/2 requested but httpx[http2] is not installed - using HTTP/1.1 keep-alive")
+
+        self._lock = threading.Lock()
+        self._session = requests.Session()
+        self._mounted_hosts = set()
+        self._httpx_clients = {}
+
+    def _pool_size_for(self, host):
+        return self.host_pool_sizes.get(host, self.pool_size)
+
+    def _mount_host(self, url):
+        """Give each host its own adapter so pools are sized and reused per host"""
+        parts = urlsplit(url)
+        prefix = f"{parts.scheme}://{parts.netloc}"
+        if prefix in self._mounted_hosts:
+            return
+        with self._lock:
+            if prefix in self._mounted_hosts:
+                return
+            size = self._pool_size_for(parts.hostname)
+            self._session.mount(prefix, HTTPAdapter(pool_connections=1, pool_maxsize=size))
+            self._mounted_hosts.add(prefix)
+
+    def _httpx_client(self, url, verify):
+        import httpx
+
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc, verify)
+        with self._lock:
+            client = self._httpx_clients.get(key)
+            if client is None:
+                size = self._pool_size_for(parts.hostname)
+                connect, read = self.timeout
+                client = httpx.Client(
+                    http2=True,
+                    verify=verify,
+                    timeout=httpx.Timeout(read, connect=connect),
+                    limits=httpx.Limits(max_connections=size, max_keepalive_connections=size),
+                )
+                self._httpx_clients[key] = client
+            return client
+
+    def request(self, method, url, timeout=None, verify=True, **kwargs):
+        """
+        Send a request over the pooled connection for url's host.
+
+        Returns a requests.Response, or an httpx.Response in HTTP/2 mode; both
+        expose status_code, headers, content, text and json().
+        """
+        timeout = timeout or self.timeout
+
+        if self.http2:
+            client = self._httpx_client(url, verify)
+            if isinstance(timeout, tuple):
+                import httpx
+                timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+            return client.request(method, url, timeout=timeout, **kwargs)
+
+        self._mount_host(url)
+        return self._session.request(method, url, timeout=timeout, verify=verify, **kwargs)
+
+    @contextmanager
+    def stream(self, method, url, timeout=None, verify=True, **kwargs):
+        """
+        Send a request and yield the response before its body is read.
+
+        Read the body with iter_chunks(); the connection returns to the pool
+        when the block exits.
+        """
+        timeout = timeout or self.timeout
+
+        if self.http2:
+            import httpx
+            client = self._httpx_client(url, verify)
+            if isinstance(timeout, tuple):
+                timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+            with client.stream(method, url, timeout=timeout, **kwargs) as response:
+                yield response
+            return
+
+        self._mount_host(url)
+        response = self._session.request(method, url, timeout=timeout, verify=verify, stream=True, **kwargs)
+        try:
+            yield response
+        finally:
+            response.close()
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        """Close every pooled connection"""
+        with self._lock:
+            self._session.close()
+            for client in self._httpx_clients.values():
+                client.close()
+            self._httpx_clients.clear()
+            self._mounted_hosts.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def iter_chunks(response, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Iterate a streamed response body for either backend"""
+    if hasattr(response, "iter_bytes"):
+        return response.iter_bytes(chunk_size)
+    return response.iter_content(chunk_size)
+
+def read_body(response):
+    """Fully read a streamed response (e.g. an error body) and return its text"""
+    if hasattr(response, "iter_bytes"):
+        response.read()
+    return response.text
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+def get_client(**kwargs):
+    """
+    Return the process-wide client, creating it on first use.
+
+    Keyword arguments only apply to that first call; later calls share the
+    same pools so each host is connected to once per process.
+    """
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = PooledHttpClient(**kwargs)
+        return _shared_client
+
+def configure_client(**kwargs):
+    """Replace the process-wide client (e.g. from CLI flags) before first use"""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is not None:
+            _shared_client.close()
+        _shared_client = PooledHttpClient(**kwargs)
+        return _shared_client
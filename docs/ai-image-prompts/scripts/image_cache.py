@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Content-addressed prompt → image cache
+Avoids paying for (and waiting on) a DALL-E call when the prompt has not changed
+
+Entries are stored as <sha256>.png with a <sha256>.json metadata sidecar.
+File modification time doubles as the last-access time, so the cache needs no
+shared index and is safe to use from concurrent processes.
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+from pathlib import Path
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent / ".image-cache"
+DEFAULT_MAX_MB = 500
+DEFAULT_MAX_AGE_DAYS = 30
+
+def _atomic_copy(source, destination):
+    """Copy a file so readers never observe a partially written destination"""
+    destination = Path(destination)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=destination.parent, prefix=f".{destination.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp_file, open(source, "rb") as src_file:
+            shutil.copyfileobj(src_file, tmp_file)
+        os.replace(tmp_path, destination)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+class ImageCache:
+    """
+    LRU cache of generated images keyed by a hash of the generation request.
+
+    Limits default to 500 MB / 30 days since last use and can be overridden
+    with the IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_MB and IMAGE_CACHE_MAX_AGE_DAYS
+    environment variables.
+    """
+
+    def __init__(self, cache_dir=None, max_mb=None, max_age_days=None):
+        self.cache_dir = Path(cache_dir or os.getenv("IMAGE_CACHE_DIR") or DEFAULT_CACHE_DIR)
+        max_mb = max_mb if max_mb is not None else float(os.getenv("IMAGE_CACHE_MAX_MB", DEFAULT_MAX_MB))
+        max_age_days = max_age_days if max_age_days is not None else \
+            float(os.getenv("IMAGE_CACHE_MAX_AGE_DAYS", DEFAULT_MAX_AGE_DAYS))
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.max_age_seconds = max_age_days * 24 * 3600
+
+    @staticmethod
+    def make_key(prompt_text, model, size, quality, n=1):
+        """Hash everything that influences the generated image"""
+        request = json.dumps(
+            {"prompt": prompt_text, "model": model, "size": size, "quality": quality, "n": n},
+            sort_keys=True, ensure_ascii=False
+        )
+        return hashlib.sha256(request.encode("utf-8")).hexdigest()
+
+    def _image_path(self, key):
+        return self.cache_dir / f"{key}.png"
+
+    def _meta_path(self, key):
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key):
+        """Return the cached image path for key (and mark it as used), or None"""
+        image_path = self._image_path(key)
+        try:
+            age = time.time() - image_path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+        if age > self.max_age_seconds:
+            self._remove(key)
+            return None
+
+        os.utime(image_path)  # LRU bookkeeping: mtime == last access
+        return image_path
+
+    def restore(self, key, output_path):
+        """Copy a cached image to output_path. Returns True on a cache hit."""
+        image_path = self.get(key)
+        if image_path is None:
+            return False
+        try:
+            _atomic_copy(image_path, output_path)
+        except FileNotFoundError:
+            return False  # evicted by another process between get() and copy
+        return True
+
+    def read(self, key):
+        """Return the cached image bytes for key, or None"""
+        image_path = self.get(key)
+        if image_path is None:
+            return None
+        try:
+            return image_path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def put(self, key, image_path, metadata=None):
+        """Store a generated image under key and enforce the cache limits"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # Sidecar first: the PNG is the commit marker that makes an entry visible
+        meta = dict(metadata or {})
+        meta["cached_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+        fd, tmp_meta = tempfile.mkstemp(dir=self.cache_dir, prefix=f".{key}.", suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_meta, self._meta_path(key))
+        _atomic_copy(image_path, self._image_path(key))
+
+        self.evict()
+        return self._image_path(key)
+
+    def put_bytes(self, key, data, metadata=None):
+        """Store in-memory image bytes under key"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=f".{key}.", suffix=".src")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            return self.put(key, tmp_path, metadata)
+        finally:
+            os.remove(tmp_path)
+
+    def _remove(self, key):
+        for path in (self._image_path(key), self._meta_path(key)):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def entries(self):
+        """List (key, size_bytes, last_access) for every cached image"""
+        entries = []
+        if not self.cache_dir.exists():
+            return entries
+        for image_path in self.cache_dir.glob("*.png"):
+            try:
+                stat = image_path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((image_path.stem, stat.st_size, stat.st_mtime))
+        return entries
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones until under the size limit"""
+        now = time.time()
+        removed = 0
+        live = []
+
+        for key, size, last_access in self.entries():
+            if now - last_access > self.max_age_seconds:
+                self._remove(key)
+                removed += 1
+            else:
+                live.append((last_access, key, size))
+
+        total = sum(size for _, _, size in live)
+        for _, key, size in sorted(live):
+            if total <= self.max_bytes:
+                break
+            self._remove(key)
+            total -= size
+            removed += 1
+
+        return removed
+
+    def clear(self):
+        """Remove every cached entry"""
+        for key, _, _ in self.entries():
+            self._remove(key)
@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+"""
+In-process API for generating LinkedIn images with the OpenAI Direct API
+Import this module instead of shelling out to generate-image.py
+
+    from image_generator import generate_image, load_prompt
+
+    result = generate_image(load_prompt(prompt_file), output_path)
+    if result:
+        print(result.output_path, result.timings["total"])
+
+generate_image() returns a GenerationResult carrying the saved path (or the
+image bytes when no output path is given), the image URL, HTTP status,
+revised prompt and per-phase timings, so callers never parse console output.
+"""
+
+import io
+import os
+import re
+import glob
+import json
+import time
+import base64
+import asyncio
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Optional, Union
+
+import requests
+from dotenv import load_dotenv
+
+from downloads import DownloadError, download_bytes, download_file
+from http_client import get_client, iter_chunks, read_body
+from image_cache import ImageCache
+from prompt_index import get_index
+from prompt_index import extract_prompt as extract_prompt_variant
+from rate_limiter import DEFAULT_MAX_RETRIES, AdaptiveRateLimiter, get_limiter
+from url_ledger import UrlLedger, get_ledger
+
+# Load environment variables
+load_dotenv()
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROMPTS_DIR = SCRIPT_DIR.parent / "blog-post-prompts"
+OUTPUT_DIR = SCRIPT_DIR.parent / "output"
+
+# OPENAI_BASE_URL points generation at a proxy or the local mock server
+# (mock_image_api.py); the default is the real OpenAI endpoint
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+MODEL = "dall-e-3"
+QUALITY = "standard"  # or "hd" for higher quality (+cost)
+DEFAULT_SIZE = "1792x1024"  # LinkedIn landscape format
+DEFAULT_CONCURRENCY = 3
+
+# "url" returns a short-lived blob link that must be downloaded separately;
+# "b64_json" returns the PNG inline so no second request (or expiry) is involved
+RESPONSE_FORMATS = ("url", "b64_json")
+DEFAULT_RESPONSE_FORMAT = os.getenv("IMAGE_RESPONSE_FORMAT", "url")
+
+_B64_FIELD = re.compile(rb'"b64_json"\s*:\s*"')
+
+PathLike = Union[str, os.PathLike]
+
+def api_url():
+    """Images endpoint for the configured base URL (read on every call)"""
+    return os.getenv("OPENAI_BASE_URL", DEFAULT_BASE_URL).rstrip("/") + "/images/generations"
+
+@dataclass
+class GenerationResult:
+    """
+    Outcome of one generate_image() call.
+
+    Exactly one of output_path / image_bytes holds the image on success.
+    timings has "queue" (rate limiter wait), "request", "download" and
+    "total" in seconds. The result is truthy when generation succeeded.
+    """
+    success: bool
+    output_path: Optional[Path] = None
+    image_bytes: Optional[bytes] = None
+    url: Optional[str] = None
+    status_code: Optional[int] = None
+    revised_prompt: Optional[str] = None
+    size_bytes: int = 0
+    from_cache: bool = False
+    attempts: int = 0
+    timings: Dict[str, float] = field(default_factory=dict)
+    error: str = ""
+
+    def __bool__(self):
+        return self.success
+
+def decode_b64_json_stream(chunks, out_file):
+    """
+    Decode the first "b64_json" field of a streamed images API response into out_file.
+
+    The base64 payload is decoded incrementally as chunks arrive, so the
+    multi-megabyte string is never held in memory. Returns the parsed response
+    JSON with the image payload blanked out (revised_prompt etc. stay intact)
+    and the number of image bytes written.
+    """
+    skeleton = bytearray()
+    pending = b""
+    carry = b""
+    state = "scan"  # scan -> payload -> tail
+    written = 0
+
+    for chunk in chunks:
+        data = pending + chunk
+        pending = b""
+
+        if state == "scan":
+            match = _B64_FIELD.search(data)
+            if not match:
+                # Hold back enough bytes to catch a field name split across chunks
+                skeleton += data[:-64]
+                pending = data[-64:]
+                continue
+            skeleton += data[:match.end()]
+            data = data[match.end():]
+            state = "payload"
+
+        if state == "payload":
+            end = data.find(b'"')
+            payload = data if end == -1 else data[:end]
+            carry += payload.replace(b"\\", b"")  # tolerate escaped "\/"
+            usable = len(carry) - len(carry) % 4
+            if usable:
+                decoded = base64.b64decode(carry[:usable])
+                out_file.write(decoded)
+                written += len(decoded)
+                carry = carry[usable:]
+            if end == -1:
+                continue
+            if carry:
+                raise ValueError("truncated base64 image payload")
+            skeleton += data[end:]
+            state = "tail"
+            continue
+
+        skeleton += data
+
+    skeleton += pending
+    if state != "tail":
+        raise ValueError("response did not contain a complete b64_json image")
+    return json.loads(skeleton), written
+
+def save_b64_json_response(response, output_path):
+    """Stream a b64_json response into output_path atomically; returns (json, bytes)"""
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=output_path.parent, prefix=f".{output_path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            result, written = decode_b64_json_stream(iter_chunks(response), f)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return result, written
+
+def generate_image(prompt_text: str, output_path: Optional[PathLike] = None, *, size: str = DEFAULT_SIZE,
+                   response_format: str = DEFAULT_RESPONSE_FORMAT, cache: Optional[ImageCache] = None,
+                   refresh: bool = False, limiter: Optional[AdaptiveRateLimiter] = None,
+                   max_retries: int = DEFAULT_MAX_RETRIES, ledger: Optional[UrlLedger] = None,
+                   log: Callable[[str], None] = print) -> GenerationResult:
+    """
+    Generate an image for prompt_text using OpenAI Direct API (not Azure)
+
+    The image is written atomically to output_path, or returned in memory as
+    result.image_bytes when output_path is None. When a cache is given, an
+    identical earlier request is served from it instead of calling the API;
+    refresh=True skips the lookup but still stores the new image.
+    response_format="b64_json" receives the image inline instead of
+    downloading a URL.
+
+    In url mode the link is recorded in the URL ledger (the shared one
+    unless ledger is given) before downloading, so a failed download can
+    be retried from download-carousel-slides.py until the link expires.
+
+    Requests go through the shared adaptive rate limiter; 429 and 5xx
+    responses are retried up to max_retries times after the server's
+    Retry-After (or an exponential backoff). Errors are reported through the
+    result, never raised.
+    """
+    start = time.perf_counter()
+    output_path = Path(output_path) if output_path is not None else None
+    result = GenerationResult(False, output_path=output_path,
+                              timings={"queue": 0.0, "request": 0.0, "download": 0.0})
+
+    def finish(success, error=""):
+        result.success = success
+        result.error = error
+        result.timings["total"] = time.perf_counter() - start
+        return result
+
+    cache_key = ImageCache.make_key(prompt_text, MODEL, size, QUALITY, 1) if cache else None
+    if cache and not refresh:
+        if output_path is None:
+            result.image_bytes = cache.read(cache_key)
+            hit = result.image_bytes is not None
+        else:
+            hit = cache.restore(cache_key, output_path)
+        if hit:
+            result.from_cache = True
+            result.size_bytes = len(result.image_bytes) if output_path is None else output_path.stat().st_size
+            log(f"⚡ Cache hit ({cache_key[:12]}) - no API call needed")
+            if output_path is not None:
+                log(f"✅ Image saved: {output_path}")
+            log(f"📊 File size: {result.size_bytes // 1024} KB")
+            return finish(True)
+
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        log("❌ Error: OPENAI_API_KEY not found in .env file")
+        log("💡 Get your API key from: https://platform.openai.com/api-keys")
+        return finish(False, "OPENAI_API_KEY not set")
+
+    log(f"🎨 Generating LinkedIn image using OpenAI Direct API...")
+    log(f"📐 Size: {size} (LinkedIn optimized)")
+    log(f"💰 Cost: ~$0.08")
+
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json"
+    }
+
+    payload = {
+        "model": MODEL,
+        "prompt": prompt_text,
+        "size": size,
+        "quality": QUALITY,
+        "n": 1
+    }
+    if response_format == "b64_json":
+        payload["response_format"] = "b64_json"
+
+    limiter = limiter or get_limiter()
+
+    try:
+        client = get_client()
+
+        for attempt in range(1, max_retries + 2):
+            queued = time.perf_counter()
+            limiter.acquire()  # also waits out any backoff another worker triggered
+            sent = time.perf_counter()
+            result.timings["queue"] += sent - queued
+            result.attempts = attempt
+            log("🔄 Sending request to OpenAI...")
+
+            with client.stream("POST", api_url(), headers=headers, json=payload) as response:
+                status = result.status_code = response.status_code
+                retry_delay = limiter.on_response(status, response.headers)
+                if status == 200:
+                    if response_format == "b64_json":
+                        if output_path is None:
+                            buffer = io.BytesIO()
+                            data, written = decode_b64_json_stream(iter_chunks(response), buffer)
+                            result.image_bytes = buffer.getvalue()
+                        else:
+                            data, written = save_b64_json_response(response, output_path)
+                        result.size_bytes = written
+                    else:
+                        data = json.loads(read_body(response))
+                    result.timings["request"] += time.perf_counter() - sent
+                    break
+                body = read_body(response)
+            result.timings["request"] += time.perf_counter() - sent
+
+            if retry_delay is None or attempt > max_retries:
+                log(f"❌ API Error: {status}")
+                log(f"📝 Response: {body}")
+                return finish(False, f"API error {status}")
+            log(f"⏳ API returned {status}, retrying in {retry_delay:.1f}s (retry {attempt}/{max_retries})")
+
+        log("✅ Image generated successfully!")
+        result.revised_prompt = data["data"][0].get("revised_prompt")
+        if result.revised_prompt:
+            log(f"📝 Revised prompt: {result.revised_prompt[:100]}...")
+
+        if response_format != "b64_json":
+            result.url = data["data"][0]["url"]
+            log(f"🔗 Image URL: {result.url}")
+            if output_path is not None:
+                ledger = ledger or get_ledger()
+                ledger.record(output_path, result.url, prompt=prompt_text, size=size)
+
+            # Download the image (streamed to a temp file, resumed on drops)
+            log("💾 Downloading image...")
+            downloading = time.perf_counter()
+            try:
+                if output_path is None:
+                    result.image_bytes = download_bytes(result.url, client=client)
+                    result.size_bytes = len(result.image_bytes)
+                else:
+                    result.size_bytes = download_file(result.url, output_path, client=client).bytes
+                    ledger.update(output_path, status="downloaded")
+            except DownloadError as e:
+                log(f"❌ Failed to download image: {e}")
+                return finish(False, f"download failed: {e}")
+            finally:
+                result.timings["download"] = time.perf_counter() - downloading
+
+        if output_path is not None:
+            log(f"✅ Image saved: {output_path}")
+        log(f"📊 File size: {result.size_bytes // 1024} KB")
+
+        if cache:
+            metadata = {"model": MODEL, "size": size, "quality": QUALITY, "prompt_chars": len(prompt_text)}
+            if output_path is None:
+                cache.put_bytes(cache_key, result.image_bytes, metadata)
+            else:
+                cache.put(cache_key, output_path, metadata)
+        return finish(True)
+
+    except requests.exceptions.Timeout:
+        log("❌ Request timed out. Please try again.")
+        return finish(False, "request timed out")
+    except requests.exceptions.RequestException as e:
+        log(f"❌ Network error: {e}")
+        return finish(False, f"network error: {e}")
+    except Exception as e:
+        log(f"❌ Unexpected error: {e}")
+        return finish(False, f"unexpected error: {e}")
+
+def generate_image_openai_direct(prompt_text, output_path="linkedin_image.png", size=DEFAULT_SIZE, log=print,
+                                 cache=None, refresh=False, response_format=DEFAULT_RESPONSE_FORMAT,
+                                 limiter=None, max_retries=DEFAULT_MAX_RETRIES):
+    """Boolean wrapper around generate_image() kept for existing callers"""
+    return generate_image(prompt_text, output_path, size=size, response_format=response_format,
+                          cache=cache, refresh=refresh, limiter=limiter, max_retries=max_retries,
+                          log=log).success
+
+def extract_prompt(content):
+    """Extract the prompt text from prompt markdown (any heading variant the index knows)"""
+    return extract_prompt_variant(content)[0]
+
+def load_prompt(prompt_file):
+    """Return the extracted prompt for a file, re-parsing it only if it changed since last indexed"""
+    return get_index().get(prompt_file).prompt
+
+# ---------------------------------------------------------------------------
+# Batch mode
+# ---------------------------------------------------------------------------
+
+@dataclass
+class BatchItem:
+    """A single prompt file queued for generation"""
+    name: str
+    prompt_file: Path
+    output_path: Path
+    size: str = DEFAULT_SIZE
+
+@dataclass
+class BatchResult:
+    """Outcome of generating one batch item"""
+    item: BatchItem
+    success: bool
+    elapsed: float
+    error: str = ""
+    generation: Optional[GenerationResult] = None
+    prompt_text: str = ""
+
+    @property
+    def file_size_kb(self):
+        if self.success and self.item.output_path.exists():
+            return self.item.output_path.stat().st_size // 1024
+        return 0
+
+def _load_manifest(manifest_path, output_dir, size):
+    """
+    Read a batch manifest.
+
+    JSON manifests hold a list of prompt file paths or objects with
+    "prompt_file" and optional "output"/"size" keys; any other file is read
+    as one prompt path per line. Relative paths resolve against the manifest.
+    """
+    base_dir = manifest_path.parent
+    items = []
+
+    if manifest_path.suffix == ".json":
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+    else:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            entries = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+    for entry in entries:
+        if isinstance(entry, str):
+            entry = {"prompt_file": entry}
+        prompt_file = (base_dir / entry["prompt_file"]).resolve()
+        output = entry.get("output")
+        output_path = (base_dir / output).resolve() if output else output_dir / f"{prompt_file.stem}-linkedin.png"
+        items.append(BatchItem(prompt_file.stem, prompt_file, output_path, entry.get("size", size)))
+
+    return items
+
+def collect_batch_items(sources, output_dir=OUTPUT_DIR, size=DEFAULT_SIZE):
+    """
+    Expand batch sources into BatchItems.
+
+    Each source may be a directory (all *.md files), a glob pattern, a single
+    prompt markdown file, or a manifest (.json or .txt). Duplicates are dropped.
+    """
+    output_dir = Path(output_dir)
+    items = []
+
+    for source in sources:
+        path = Path(source)
+        if path.is_dir():
+            for prompt_file in sorted(path.glob("*.md")):
+                items.append(BatchItem(prompt_file.stem, prompt_file.resolve(),
+                                       output_dir / f"{prompt_file.stem}-linkedin.png", size))
+        elif path.is_file() and path.suffix in (".json", ".txt"):
+            items.extend(_load_manifest(path, output_dir, size))
+        else:
+            matches = sorted(glob.glob(source))
+            if not matches:
+                print(f"⚠️  No prompt files match: {source}")
+            for match in matches:
+                prompt_file = Path(match).resolve()
+                items.append(BatchItem(prompt_file.stem, prompt_file,
+                                       output_dir / f"{prompt_file.stem}-linkedin.png", size))
+
+    seen = set()
+    unique_items = []
+    for item in items:
+        if item.prompt_file not in seen:
+            seen.add(item.prompt_file)
+            unique_items.append(item)
+    return unique_items
+
+def changed_batch_items(output_dir=OUTPUT_DIR, size=DEFAULT_SIZE, items=None):
+    """
+    BatchItems for prompts that are new or whose text changed since an
+    image was last generated from them. With items, filter that list instead of
+    taking every changed prompt under blog-post-prompts/ and linkedin-carousel/.
+    """
+    changed, _ = get_index().refresh()
+    changed_files = {entry.file_path.resolve() for entry in changed if entry.prompt}
+    if items is not None:
+        return [item for item in items if Path(item.prompt_file).resolve() in changed_files]
+
+    output_dir = Path(output_dir)
+    return [BatchItem(path.stem, path, output_dir / f"{path.stem}-linkedin.png", size)
+            for path in sorted(changed_files)]
+
+def _run_batch_item(item, cache=None, refresh=False, response_format=DEFAULT_RESPONSE_FORMAT,
+                    max_retries=DEFAULT_MAX_RETRIES):
+    """Blocking generation of one batch item (runs in a worker thread)"""
+    start = time.perf_counter()
+
+    def log(message):
+        print(f"[{item.name}] {message}", flush=True)
+
+    try:
+        prompt_text = load_prompt(item.prompt_file)
+    except OSError as e:
+        return BatchResult(item, False, time.perf_counter() - start, f"cannot read prompt: {e}")
+
+    if not prompt_text:
+        return BatchResult(item, False, time.perf_counter() - start, "could not extract prompt")
+
+    generation = generate_image(prompt_text, item.output_path, size=item.size, response_format=response_format,
+                                cache=cache, refresh=refresh, max_retries=max_retries, log=log)
+    return BatchResult(item, generation.success, time.perf_counter() - start, generation.error, generation,
+                       prompt_text)
+
+async def run_batch(items, concurrency=DEFAULT_CONCURRENCY, cache=None, refresh=False,
+                    response_format=DEFAULT_RESPONSE_FORMAT, max_retries=DEFAULT_MAX_RETRIES):
+    """
+    Generate and download every item with at most `concurrency` requests in
+    flight. All workers share the process-wide rate limiter, so request
+    pacing follows the account quota rather than the worker count. Results
+    are returned in input order.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def worker(item):
+        async with semaphore:
+            return await asyncio.to_thread(_run_batch_item, item, cache, refresh, response_format, max_retries)
+
+    return await asyncio.gather(*(worker(item) for item in items))
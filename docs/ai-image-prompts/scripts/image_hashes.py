@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Perceptual-hash index of generated images for near-duplicate detection
+Catches a tweaked prompt that produced practically the same picture again
+
+Every image gets two 64-bit hashes, computed for a whole batch at once with
+NumPy over downscaled grayscale arrays:
+
+    phash  signs of the low-frequency 8x8 block of a 32x32 DCT (vs. its median)
+    dhash  whether each pixel of a 9x8 thumbnail is brighter than its neighbour
+
+Images whose phash differ in at most DEFAULT_THRESHOLD bits look the same to
+a reader. Hashes are cached in .phash-index.json next to this script
+(override with PHASH_INDEX_PATH), keyed by path and refreshed only for files
+whose size or mtime changed. Queries walk a BK-tree, so they only visit the
+part of the index within the threshold instead of comparing every image.
+
+Usage:
+    python image_hashes.py                          # list near-duplicate pairs
+    python image_hashes.py --query new-image.png    # images close to one file
+    python image_hashes.py --threshold 6
+"""
+
+import os
+import json
+import argparse
+import tempfile
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from image_optimizer import is_variant
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+DOCS_DIR = SCRIPT_DIR.parents[1]
+DEFAULT_DIRS = (SCRIPT_DIR.parent / "output", DOCS_DIR / "assets" / "linkedin-images", DOCS_DIR / "assets" / "images")
+DEFAULT_INDEX_PATH = SCRIPT_DIR / ".phash-index.json"
+IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg")
+DEFAULT_THRESHOLD = 10     # bits out of 64
+DCT_SIZE = 32
+HASH_SIZE = 8
+BATCH_SIZE = 64
+
+def _dct_matrix(n):
+    """Orthonormal DCT-II basis; the 2-D DCT of X is D @ X @ D.T"""
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    matrix = np.sqrt(2.0 / n) * np.cos(np.pi * (2 * i + 1) * k / (2 * n))
+    matrix[0] /= np.sqrt(2.0)
+    return matrix.astype(np.float32)
+
+_DCT = _dct_matrix(DCT_SIZE)
+
+def _thumbnails(path):
+    """32x32 and 9x8 grayscale arrays for one image"""
+    with Image.open(path) as image:
+        image.draft("L", (DCT_SIZE * 4, DCT_SIZE * 4))  # JPEG: decode at reduced scale
+        gray = image.convert("L")
+    # reducing_gap shrinks by an integer factor first, so 1792px sources stay cheap
+    small = gray.resize((DCT_SIZE, DCT_SIZE), Image.LANCZOS, reducing_gap=2.0)
+    tiny = gray.resize((HASH_SIZE + 1, HASH_SIZE), Image.LANCZOS, reducing_gap=2.0)
+    return np.asarray(small, dtype=np.float32), np.asarray(tiny, dtype=np.float32)
+
+def _pack(bits):
+    """(N, 64) booleans → list of N Python ints"""
+    return np.packbits(bits, axis=1).view(">u8").ravel().tolist()
+
+def hash_arrays(small, tiny):
+    """
+    phash and dhash for a stack of thumbnails.
+
+    small is (N, 32, 32), tiny is (N, 8, 9); returns two lists of N ints.
+    """
+    coefficients = _DCT @ small @ _DCT.T
+    low = coefficients[:, :HASH_SIZE, :HASH_SIZE].reshape(len(small), -1)
+    median = np.median(low[:, 1:], axis=1, keepdims=True)  # the DC term would skew it
+    phashes = _pack(low > median)
+    dhashes = _pack((tiny[:, :, 1:] > tiny[:, :, :-1]).reshape(len(tiny), -1))
+    return phashes, dhashes
+
+def compute_hashes(paths, log=print):
+    """{path: (phash, dhash)} for every readable image in paths, hashed in batches"""
+    hashes = {}
+    paths = [Path(path) for path in paths]
+    for start in range(0, len(paths), BATCH_SIZE):
+        loaded, smalls, tinies = [], [], []
+        for path in paths[start:start + BATCH_SIZE]:
+            try:
+                small, tiny = _thumbnails(path)
+            except (OSError, ValueError) as e:
+                log(f"⚠️  Cannot hash {path.name}: {e}")
+                continue
+            loaded.append(path)
+            smalls.append(small)
+            tinies.append(tiny)
+        if loaded:
+            phashes, dhashes = hash_arrays(np.stack(smalls), np.stack(tinies))
+            hashes.update({path: pair for path, pair in zip(loaded, zip(phashes, dhashes))})
+    return hashes
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+class BKTree:
+    """
+    Burkhard-Keller tree over 64-bit hashes with Hamming distance.
+
+    Each node's children are keyed by their distance to it; the triangle
+    inequality lets a search skip every child whose key is further than
+    the threshold from the query's distance to the node.
+    """
+
+    def __init__(self):
+        self.root = None
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def add(self, value, key):
+        self.size += 1
+        if self.root is None:
+            self.root = [value, [key], {}]
+            return
+        node = self.root
+        while True:
+            distance = hamming(value, node[0])
+            if distance == 0:
+                node[1].append(key)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, [key], {}]
+                return
+            node = child
+
+    def search(self, value, max_distance):
+        """(distance, key) for every entry within max_distance of value, closest first"""
+        found = []
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = hamming(value, node[0])
+            if distance <= max_distance:
+                found.extend((distance, key) for key in node[1])
+            for edge, child in node[2].items():
+                if distance - max_distance <= edge <= distance + max_distance:
+                    stack.append(child)
+        return sorted(found)
+
+@dataclass
+class Match:
+    """An indexed image close to the query"""
+    path: str
+    distance: int
+    dhash_distance: int
+
+    @property
+    def name(self):
+        return Path(self.path).name
+
+class PerceptualIndex:
+    """JSON-backed path → (phash, dhash) index with a BK-tree for queries"""
+
+    def __init__(self, path=None):
+        self.path = Path(path or os.getenv("PHASH_INDEX_PATH") or DEFAULT_INDEX_PATH)
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+        self._tree = None
+
+    def save(self):
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(self.entries, f, indent=1, sort_keys=True)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+    def tree(self):
+        with self._lock:
+            if self._tree is None:
+                self._tree = BKTree()
+                for path, entry in self.entries.items():
+                    self._tree.add(int(entry["phash"], 16), path)
+            return self._tree
+
+    def _store(self, path, hashes):
+        stat = path.stat()
+        self.entries[str(path)] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                                   "phash": f"{hashes[0]:016x}", "dhash": f"{hashes[1]:016x}"}
+
+    def refresh(self, sources=None, exclude=(), log=print):
+        """
+        Hash new and changed images under sources and drop deleted ones.
+
+        Paths in exclude keep their current entry (e.g. the previous version
+        of an image that was just regenerated). Returns how many were hashed.
+        """
+        exclude = {str(Path(path).resolve()) for path in exclude}
+        images = [path.resolve() for path in collect_images(sources or [d for d in DEFAULT_DIRS if d.exists()])]
+        todo = []
+        for path in images:
+            entry = self.entries.get(str(path))
+            if str(path) in exclude:
+                continue
+            stat = path.stat()
+            if not entry or entry["size"] != stat.st_size or entry["mtime_ns"] != stat.st_mtime_ns:
+                todo.append(path)
+        hashes = compute_hashes(todo, log=log)
+        with self._lock:
+            for path, pair in hashes.items():
+                self._store(path, pair)
+            deleted = [key for key in self.entries if key not in exclude and not Path(key).exists()]
+            for key in deleted:
+                del self.entries[key]
+            if hashes or deleted:
+                self._tree = None
+        if hashes or deleted or not self.path.exists():
+            self.save()
+        return len(hashes)
+
+    def add(self, path, hashes=None):
+        """Index (or re-index) one image"""
+        path = Path(path).resolve()
+        hashes = hashes or compute_hashes([path]).get(path)
+        if hashes is None:
+            return
+        with self._lock:
+            self._store(path, hashes)
+            self._tree = None
+        self.save()
+
+    def forget(self, path):
+        with self._lock:
+            if self.entries.pop(str(Path(path).resolve()), None) is not None:
+                self._tree = None
+        self.save()
+
+    def query(self, hashes, threshold=DEFAULT_THRESHOLD, exclude=()):
+        """Indexed images whose phash is within threshold bits of hashes=(phash, dhash)"""
+        exclude = {str(Path(path).resolve()) for path in exclude}
+        matches = []
+        for distance, path in self.tree().search(hashes[0], threshold):
+            if path in exclude:
+                continue
+            dhash_distance = hamming(hashes[1], int(self.entries[path]["dhash"], 16))
+            matches.append(Match(path, distance, dhash_distance))
+        return matches
+
+    def duplicates(self, threshold=DEFAULT_THRESHOLD):
+        """Every pair of indexed images within threshold, as (path, Match)"""
+        pairs = []
+        for path, entry in sorted(self.entries.items()):
+            hashes = (int(entry["phash"], 16), int(entry["dhash"], 16))
+            pairs.extend((path, match) for match in self.query(hashes, threshold, exclude=[path])
+                         if match.path > path)
+        return sorted(pairs, key=lambda pair: pair[1].distance)
+
+def collect_images(sources):
+    """Original images under the given files/directories (not optimizer variants or derivatives)"""
+    images = []
+    for source in sources:
+        source = Path(source)
+        candidates = sorted(source.rglob("*")) if source.is_dir() else [source]
+        images.extend(path for path in candidates if path.suffix.lower() in IMAGE_SUFFIXES and path.is_file()
+                      and not is_variant(path) and "responsive" not in path.parts)
+    return images
+
+def find_near_duplicates(paths, index=None, threshold=DEFAULT_THRESHOLD, log=print):
+    """
+    Compare freshly generated images against the other indexed images.
+
+    The index is refreshed first, except for paths themselves, whose entry
+    still describes the image they replaced. That image, and any published
+    copy of it, is left out of the comparison: regenerating a tweaked prompt
+    is expected to look like its previous version. Returns
+    {path: [Match, ...]} for the paths that have near-duplicates and their
+    fresh (phash, dhash).
+    """
+    index = index or get_phash_index()
+    paths = [Path(path).resolve() for path in paths]
+    fresh = compute_hashes(paths, log=log)
+    index.refresh(exclude=paths, log=log)
+    found = {}
+    for path, hashes in fresh.items():
+        replaced = index.entries.get(str(path))
+        exclude = [key for key, entry in index.entries.items()
+                   if replaced and (entry["phash"], entry["dhash"]) == (replaced["phash"], replaced["dhash"])]
+        matches = index.query(hashes, threshold, exclude=[path, *exclude])
+        if matches:
+            found[path] = matches
+    return found, fresh
+
+_shared_index = None
+_shared_lock = threading.Lock()
+
+def get_phash_index(**kwargs):
+    """Return the process-wide index, creating it on first use"""
+    global _shared_index
+    with _shared_lock:
+        if _shared_index is None:
+            _shared_index = PerceptualIndex(**kwargs)
+        return _shared_index
+
+def describe_match(path, match):
+    return f"{Path(path).name} ≈ {match.name} ({match.distance}/64 bits apart, dHash {match.dhash_distance})"
+
+def main():
+    parser = argparse.ArgumentParser(description="Find near-duplicate images with perceptual hashes")
+    parser.add_argument("paths", nargs="*", help="files or directories to index (default: ../output and assets)")
+    parser.add_argument("--query", help="list indexed images close to this file")
+    parser.add_argument("--threshold", type=int, default=DEFAULT_THRESHOLD,
+                        help=f"maximum phash distance in bits (default: {DEFAULT_THRESHOLD})")
+    args = parser.parse_args()
+
+    index = get_phash_index()
+    hashed = index.refresh(args.paths or None)
+    print(f"🔎 {len(index.entries)} images indexed ({hashed} hashed now)")
+
+    if args.query:
+        query = Path(args.query).resolve()
+        hashes = compute_hashes([query]).get(query)
+        if hashes is None:
+            return
+        matches = index.query(hashes, args.threshold, exclude=[query])
+        for match in matches:
+            print(f"  {match.distance:>2} bits  {match.path}")
+        print(f"{'⚠️ ' if matches else '✅'} {len(matches)} images within {args.threshold} bits")
+        return
+
+    pairs, copies = [], 0
+    for path, match in index.duplicates(args.threshold):
+        if match.distance == match.dhash_distance == 0 and \
+                index.entries[path]["size"] == index.entries[match.path]["size"]:
+            copies += 1  # the same file published twice; asset_store.py stores it once
+            continue
+        pairs.append((path, match))
+        print(f"  {match.distance:>2} bits  {Path(path).name}  ≈  {match.name}")
+    if copies:
+        print(f"📎 {copies} identical copies skipped (see asset_store.py)")
+    print(f"{'⚠️ ' if pairs else '✅'} {len(pairs)} near-duplicate pairs within {args.threshold} bits")
+
+if __name__ == "__main__":
+    main()
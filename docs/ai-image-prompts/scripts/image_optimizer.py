@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Post-generation image optimization across all CPU cores
+Shrinks generated PNGs and writes smaller web variants next to them
+
+For every image the stage writes:
+    png        the PNG re-encoded losslessly (only kept when smaller)
+    quantized  <name>-quantized.png, a 256-colour palette PNG
+    webp       <name>.webp (lossy, quality 82)
+    avif       <name>.avif, when Pillow has AVIF support (pillow-avif-plugin)
+
+Files are processed in a process pool. A state file (.optimize-state.json,
+override with OPTIMIZE_STATE_PATH) remembers each optimized PNG's size,
+mtime and sha256, so unchanged images are skipped on the next run.
+
+Usage:
+    python image_optimizer.py                       # ../output and docs/assets/linkedin-images
+    python image_optimizer.py ../output/foo.png --formats png webp
+    python image_optimizer.py --force --workers 4
+"""
+
+import io
+import os
+import json
+import time
+import hashlib
+import argparse
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict
+
+from PIL import Image
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+DOCS_DIR = SCRIPT_DIR.parents[1]
+DEFAULT_DIRS = (SCRIPT_DIR.parent / "output", DOCS_DIR / "assets" / "linkedin-images")
+DEFAULT_STATE_PATH = SCRIPT_DIR / ".optimize-state.json"
+
+FORMATS = ("png", "quantized", "webp", "avif")
+QUANTIZE_COLORS = 256
+WEBP_QUALITY = 82
+AVIF_QUALITY = 55
+
+def avif_available():
+    """True when Pillow can write AVIF (natively or via pillow-avif-plugin)"""
+    try:
+        import pillow_avif  # noqa: F401 (registers the AVIF plugin)
+    except ImportError:
+        pass
+    Image.init()
+    return "AVIF" in Image.SAVE
+
+def variant_path(png_path, fmt):
+    """Where the fmt variant of png_path is written"""
+    png_path = Path(png_path)
+    if fmt == "png":
+        return png_path
+    if fmt == "quantized":
+        return png_path.with_name(f"{png_path.stem}-quantized.png")
+    return png_path.with_suffix(f".{fmt}")
+
+def is_variant(path):
+    """True for files this stage produced from another image"""
+    return Path(path).stem.endswith("-quantized")
+
+def _fingerprint(path):
+    stat = path.stat()
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+
+def _write_atomic(path, data):
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def _encode(image, fmt):
+    buffer = io.BytesIO()
+    if fmt == "png":
+        image.save(buffer, "PNG", optimize=True)
+    elif fmt == "quantized":
+        if image.mode in ("RGBA", "LA", "PA"):
+            palette = image.convert("RGBA").quantize(QUANTIZE_COLORS, method=Image.Quantize.FASTOCTREE)
+        else:
+            palette = image.convert("RGB").quantize(QUANTIZE_COLORS, method=Image.Quantize.MEDIANCUT)
+        palette.save(buffer, "PNG", optimize=True)
+    elif fmt == "webp":
+        image.save(buffer, "WEBP", quality=WEBP_QUALITY, method=6)
+    elif fmt == "avif":
+        image.save(buffer, "AVIF", quality=AVIF_QUALITY)
+    return buffer.getvalue()
+
+@dataclass
+class OptimizeResult:
+    """Output sizes for one optimized image"""
+    source: str
+    destination: str
+    source_bytes: int = 0
+    outputs: Dict[str, int] = field(default_factory=dict)
+    elapsed: float = 0.0
+    skipped: bool = False
+    error: str = ""
+
+    @property
+    def saved_bytes(self):
+        """Bytes saved by the lossless PNG (what the site serves today)"""
+        if "png" not in self.outputs:
+            return 0
+        return max(0, self.source_bytes - self.outputs["png"])
+
+    @property
+    def paths(self):
+        """The optimized PNG and every variant written for it"""
+        return [variant_path(self.destination, fmt) for fmt in self.outputs]
+
+    def describe(self):
+        sizes = ", ".join(f"{fmt} {size / 1024 / 1024:.2f} MB" for fmt, size in self.outputs.items())
+        return (f"{Path(self.destination).name}: {self.source_bytes / 1024 / 1024:.2f} MB → {sizes} "
+                f"({self.saved_bytes // 1024} KB saved)")
+
+def optimize_file(source, destination=None, formats=FORMATS):
+    """
+    Optimize source into destination (default: in place) and write its variants.
+
+    Runs in a worker process; errors are returned on the result, not raised.
+    """
+    start = time.perf_counter()
+    source = Path(source)
+    destination = Path(destination or source)
+    result = OptimizeResult(str(source), str(destination))
+    try:
+        result.source_bytes = source.stat().st_size
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        with Image.open(source) as image:
+            image.load()
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+            for fmt in formats:
+                if fmt == "avif" and not avif_available():
+                    continue
+                data = _encode(image, fmt)
+                if fmt == "png":
+                    if len(data) >= result.source_bytes:
+                        # Already as small as Pillow can make it; keep the original bytes
+                        data = source.read_bytes() if destination != source else None
+                    if data is not None:
+                        _write_atomic(destination, data)
+                    result.outputs[fmt] = destination.stat().st_size
+                else:
+                    _write_atomic(variant_path(destination, fmt), data)
+                    result.outputs[fmt] = len(data)
+    except Exception as e:
+        result.error = str(e)
+    result.elapsed = time.perf_counter() - start
+    return result
+
+class ImageOptimizer:
+    """
+    Process-pool optimizer that skips images it has already optimized.
+
+    Safe to call from several threads (e.g. build graph workers); every
+    call shares one pool of worker processes.
+    """
+
+    def __init__(self, workers=None, formats=FORMATS, state_path=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.formats = tuple(fmt for fmt in formats if fmt != "avif" or avif_available())
+        self.state_path = Path(state_path or os.getenv("OPTIMIZE_STATE_PATH") or DEFAULT_STATE_PATH)
+        self._lock = threading.Lock()
+        self._pool = None
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                self.state = json.load(f)
+        except (OSError, ValueError):
+            self.state = {}
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def save(self):
+        with self._lock:
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.state_path.parent, prefix=f".{self.state_path.name}.",
+                                            suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(self.state, f, indent=1, sort_keys=True)
+                os.replace(tmp_path, self.state_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+    def is_current(self, path):
+        """True when path is unchanged since it was last optimized and its variants exist"""
+        path = Path(path)
+        record = self.state.get(str(path.resolve()))
+        if not record or not path.exists() or not set(self.formats) <= set(record["formats"]):
+            return False
+        if not all(variant_path(path, fmt).exists() for fmt in self.formats):
+            return False
+        stat = path.stat()
+        size, mtime_ns, sha = record["fingerprint"]
+        if stat.st_size == size and stat.st_mtime_ns == mtime_ns:
+            return True
+        return _fingerprint(path)[2] == sha
+
+    def _record(self, result):
+        if result.error:
+            return
+        destination = Path(result.destination)
+        with self._lock:
+            self.state[str(destination.resolve())] = {"fingerprint": _fingerprint(destination),
+                                                      "formats": sorted(result.outputs)}
+
+    def optimize_to(self, source, destination):
+        """Optimize source into destination in a worker process and wait for it"""
+        result = self._executor().submit(optimize_file, str(source), str(destination), self.formats).result()
+        self._record(result)
+        self.save()
+        return result
+
+    def optimize(self, paths, force=False, log=print):
+        """
+        Optimize every PNG in paths in place, in parallel.
+
+        Unchanged images are skipped unless force=True. log receives one line
+        per file as it finishes. Returns results in completion order.
+        """
+        results = []
+        todo = []
+        for path in paths:
+            path = Path(path)
+            if not force and self.is_current(path):
+                outputs = {fmt: variant_path(path, fmt).stat().st_size for fmt in self.formats}
+                results.append(OptimizeResult(str(path), str(path), path.stat().st_size, outputs, skipped=True))
+            else:
+                todo.append(path)
+
+        if todo:
+            pool = self._executor()
+            futures = [pool.submit(optimize_file, str(path), None, self.formats) for path in todo]
+            for future in as_completed(futures):
+                result = future.result()
+                self._record(result)
+                results.append(result)
+                if result.error:
+                    log(f"❌ {Path(result.source).name}: {result.error}")
+                else:
+                    log(f"🗜️  {result.describe()}")
+            self.save()
+        return results
+
+def collect_images(sources):
+    """PNG files in the given files/directories, excluding generated variants"""
+    images = []
+    for source in sources:
+        source = Path(source)
+        candidates = sorted(source.glob("*.png")) if source.is_dir() else [source]
+        images.extend(path for path in candidates if path.suffix == ".png" and not is_variant(path))
+    return images
+
+def print_summary(results, wall_time):
+    optimized = [result for result in results if not result.skipped and not result.error]
+    skipped = sum(1 for result in results if result.skipped)
+    failed = sum(1 for result in results if result.error)
+    before = sum(result.source_bytes for result in optimized)
+    saved = sum(result.saved_bytes for result in optimized)
+    print("-" * 60)
+    print(f"🗜️  {len(optimized)} optimized, {skipped} unchanged, {failed} failed in {wall_time:.1f}s")
+    if optimized:
+        print(f"💾 PNG: {before / 1024 / 1024:.1f} MB → {(before - saved) / 1024 / 1024:.1f} MB "
+              f"({saved / 1024 / 1024:.1f} MB saved)")
+        for fmt in FORMATS[1:]:
+            total = sum(result.outputs.get(fmt, 0) for result in optimized)
+            if total:
+                print(f"   {fmt}: {total / 1024 / 1024:.1f} MB ({100 * total / before:.0f}% of the originals)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Optimize generated images and write WebP/AVIF/quantized variants")
+    parser.add_argument("paths", nargs="*", help="PNG files or directories (default: ../output and assets)")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS),
+                        help="outputs to produce (default: all; avif needs pillow-avif-plugin)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--force", action="store_true", help="re-optimize unchanged images")
+    args = parser.parse_args()
+
+    images = collect_images(args.paths or [path for path in DEFAULT_DIRS if path.exists()])
+    if not images:
+        print("❌ No PNG images found")
+        return
+    if "avif" in args.formats and not avif_available():
+        print("⚠️  AVIF output needs pillow-avif-plugin (or Pillow with AVIF support) - skipping it")
+
+    print(f"🗜️  Optimizing {len(images)} images")
+    start = time.perf_counter()
+    with ImageOptimizer(args.workers, args.formats) as optimizer:
+        results = optimizer.optimize(images, force=args.force)
+    print_summary(results, time.perf_counter() - start)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the OpenAI /v1/images/generations endpoint
+Lets the generation and download scripts be load-tested offline for free
+
+Responses mimic the real service: "url" mode returns a signed blob link
+(with an Azure-style se= expiry) that is served by the same process, and
+"b64_json" mode returns the PNG inline. Latency, errors, 429s and link
+expiry are configurable so retry, rate limiting and download scheduling can
+be exercised deterministically (pass --seed).
+
+    python mock_image_api.py --port 8790 --latency 2 --rate-limit-rate 0.1
+    OPENAI_BASE_URL=http://127.0.0.1:8790/v1 python generate-image.py ai-workflow
+
+GET /stats returns request counters as JSON; POST /stats/reset clears them.
+"""
+
+import io
+import json
+import math
+import time
+import uuid
+import base64
+import random
+import struct
+import hashlib
+import argparse
+import threading
+import zlib
+from collections import Counter, OrderedDict
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, quote, urlsplit
+
+from PIL import Image
+
+DEFAULT_PORT = 8790
+DEFAULT_SIZE = "1792x1024"
+MAX_STORED_IMAGES = 256
+STREAM_CHUNK = 64 * 1024
+
+@dataclass
+class MockConfig:
+    """Behaviour of the mock service"""
+    latency: float = 0.5          # median generation time in seconds
+    jitter: float = 0.3           # sigma of the log-normal latency distribution (0 = fixed)
+    error_rate: float = 0.0       # fraction of generations that fail with a 500
+    rate_limit_rate: float = 0.0  # fraction of generations rejected with a 429
+    retry_after: float = 1.0      # Retry-After sent with 429 responses
+    quota_rpm: float = 0.0        # enforce a requests/minute quota with 429s (0 = unlimited)
+    url_ttl: float = 7200.0       # seconds before a url-mode link expires
+    bandwidth: float = 0.0        # bytes/second per image download (0 = unlimited)
+    noise: float = 16.0           # pixel noise; higher makes larger, less compressible PNGs
+    scale: float = 1.0            # image dimensions relative to the requested size
+    seed: Optional[int] = None
+
+def sign_blob_url(base_url, blob_id, expires_at):
+    """Azure-SAS-like URL for blob_id that is valid until expires_at (UTC datetime)"""
+    expiry = expires_at.strftime("%Y-%m-%dT%H:%M:%SZ")
+    signature = base64.b64encode(hashlib.sha256(f"{blob_id}{expiry}".encode()).digest()).decode()
+    return (f"{base_url}/private/img-{blob_id}.png?st={quote(expiry)}&se={quote(expiry)}"
+            f"&sp=r&sv=2021-08-06&sr=b&sig={quote(signature)}")
+
+def _png_chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+def tag_png(png_bytes, text):
+    """Insert a tEXt chunk before IEND so every response has distinct bytes"""
+    end = png_bytes.rindex(b"IEND") - 4
+    return png_bytes[:end] + _png_chunk(b"tEXt", b"Comment\0" + text.encode()) + png_bytes[end:]
+
+class MockImageAPI:
+    """
+    Threaded HTTP server implementing the images endpoint and its blob links.
+
+    Use as a context manager (or start()/stop()) to run it in a background
+    thread; base_url is the value for OPENAI_BASE_URL.
+    """
+
+    def __init__(self, config=None, host="127.0.0.1", port=0):
+        self.config = config or MockConfig()
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._templates = {}
+        self._images = OrderedDict()
+        self._recent = []
+        self.stats = Counter()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    @property
+    def root_url(self):
+        return self.base_url[:-len("/v1")]
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def snapshot(self):
+        """Copy of the request counters"""
+        with self._lock:
+            return dict(self.stats)
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats.clear()
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def _template(self, size):
+        """Encoded noise PNG for a requested size (built once per size)"""
+        with self._lock:
+            if size in self._templates:
+                return self._templates[size]
+        try:
+            width, height = (int(part) for part in size.lower().split("x"))
+        except ValueError:
+            width, height = (int(part) for part in DEFAULT_SIZE.split("x"))
+        width = max(1, int(width * self.config.scale))
+        height = max(1, int(height * self.config.scale))
+        bands = [Image.effect_noise((width, height), self.config.noise) for _ in range(3)]
+        buffer = io.BytesIO()
+        Image.merge("RGB", bands).save(buffer, "PNG")
+        with self._lock:
+            return self._templates.setdefault(size, buffer.getvalue())
+
+    def _sample_latency(self):
+        with self._lock:
+            if self.config.jitter <= 0:
+                return self.config.latency
+            return self.config.latency * math.exp(self._random.gauss(0, self.config.jitter))
+
+    def _roll(self, probability):
+        with self._lock:
+            return self._random.random() < probability
+
+    def _over_quota(self):
+        """Sliding one-minute window check for quota_rpm; returns seconds until a slot frees up"""
+        if self.config.quota_rpm <= 0:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            self._recent = [t for t in self._recent if now - t < 60]
+            if len(self._recent) >= self.config.quota_rpm:
+                return 60 - (now - self._recent[0])
+            self._recent.append(now)
+        return None
+
+    def _store(self, blob_id, data, expires_at):
+        with self._lock:
+            self._images[blob_id] = (data, expires_at)
+            while len(self._images) > MAX_STORED_IMAGES:
+                self._images.popitem(last=False)
+
+    def _handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, body=b"", content_type="application/json", headers=None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(body)
+                api._count(f"status_{status}")
+
+            def _send_json(self, status, payload, headers=None):
+                self._send(status, json.dumps(payload).encode(), headers=headers)
+
+            def _error(self, status, message, kind, headers=None):
+                self._send_json(status, {"error": {"message": message, "type": kind}}, headers)
+
+            def do_GET(self):
+                path = urlsplit(self.path).path
+                if path == "/stats":
+                    self._send_json(200, api.snapshot())
+                elif path.startswith("/private/img-"):
+                    self._serve_blob()
+                else:
+                    self._error(404, "not found", "invalid_request_error")
+
+            do_HEAD = do_GET
+
+            def do_POST(self):
+                path = urlsplit(self.path).path
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0) or 0))
+                if path == "/stats/reset":
+                    api.reset_stats()
+                    self._send_json(200, {})
+                elif path == "/v1/images/generations":
+                    self._generate(body)
+                else:
+                    self._error(404, "not found", "invalid_request_error")
+
+            def _generate(self, body):
+                api._count("generations")
+                if not self.headers.get("Authorization", "").startswith("Bearer "):
+                    self._error(401, "You didn't provide an API key.", "invalid_request_error")
+                    return
+                try:
+                    payload = json.loads(body)
+                    prompt = payload["prompt"]
+                except (ValueError, KeyError):
+                    self._error(400, "'prompt' is required", "invalid_request_error")
+                    return
+
+                quota_wait = api._over_quota()
+                if quota_wait is not None or api._roll(api.config.rate_limit_rate):
+                    wait = quota_wait if quota_wait is not None else api.config.retry_after
+                    headers = {"Retry-After": f"{max(wait, 0.001):.3f}"}
+                    if api.config.quota_rpm:
+                        headers.update({"x-ratelimit-limit-requests": f"{api.config.quota_rpm:g}",
+                                        "x-ratelimit-remaining-requests": "0",
+                                        "x-ratelimit-reset-requests": f"{wait:.3f}s"})
+                    self._error(429, "Rate limit exceeded for images per minute.", "requests", headers)
+                    return
+
+                time.sleep(api._sample_latency())
+                if api._roll(api.config.error_rate):
+                    self._error(500, "The server had an error processing your request.", "server_error")
+                    return
+
+                blob_id = uuid.uuid4().hex[:24]
+                image = tag_png(api._template(payload.get("size", DEFAULT_SIZE)), blob_id)
+                item = {"revised_prompt": f"Mock rendering of: {prompt[:200]}"}
+                if payload.get("response_format") == "b64_json":
+                    item["b64_json"] = base64.b64encode(image).decode()
+                    api._count("bytes_inline", len(image))
+                else:
+                    expires_at = datetime.now(timezone.utc) + timedelta(seconds=api.config.url_ttl)
+                    api._store(blob_id, image, expires_at)
+                    item["url"] = sign_blob_url(api.root_url, blob_id, expires_at)
+
+                headers = {}
+                if api.config.quota_rpm:
+                    headers["x-ratelimit-limit-requests"] = f"{api.config.quota_rpm:g}"
+                self._send_json(200, {"created": int(time.time()), "data": [item]}, headers)
+
+            def _serve_blob(self):
+                parts = urlsplit(self.path)
+                blob_id = parts.path[len("/private/img-"):].rsplit(".", 1)[0]
+                with api._lock:
+                    stored = api._images.get(blob_id)
+                if stored is None:
+                    self._send(404, b"<Error><Code>BlobNotFound</Code></Error>", "application/xml")
+                    return
+                data, expires_at = stored
+                expiry = parse_qs(parts.query).get("se", [""])[0]
+                if datetime.now(timezone.utc) >= expires_at or expiry != expires_at.strftime("%Y-%m-%dT%H:%M:%SZ"):
+                    api._count("expired")
+                    self._send(403, b"<Error><Code>AuthenticationFailed</Code>"
+                                    b"<AuthenticationErrorDetail>Signed expiry time has passed"
+                                    b"</AuthenticationErrorDetail></Error>", "application/xml")
+                    return
+
+                status, start, end = 200, 0, len(data) - 1
+                headers = {"Accept-Ranges": "bytes",
+                           "Content-MD5": base64.b64encode(hashlib.md5(data).digest()).decode()}
+                requested = self.headers.get("Range", "")
+                if requested.startswith("bytes="):
+                    first = int(requested[6:].split("-")[0] or 0)
+                    if first >= len(data):
+                        self._send(416, headers={"Content-Range": f"bytes */{len(data)}"})
+                        return
+                    status, start = 206, first
+                    headers = {"Content-Range": f"bytes {start}-{end}/{len(data)}"}
+
+                self.send_response(status)
+                self.send_header("Content-Type", "image/png")
+                self.send_header("Content-Length", str(end - start + 1))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                api._count(f"status_{status}")
+                api._count("downloads")
+                if self.command == "HEAD":
+                    return
+                for offset in range(start, end + 1, STREAM_CHUNK):
+                    chunk = data[offset:min(offset + STREAM_CHUNK, end + 1)]
+                    try:
+                        self.wfile.write(chunk)
+                    except (BrokenPipeError, ConnectionResetError):
+                        api._count("aborted_downloads")
+                        return
+                    api._count("bytes_downloaded", len(chunk))
+                    if api.config.bandwidth > 0:
+                        time.sleep(len(chunk) / api.config.bandwidth)
+
+        return Handler
+
+def add_config_arguments(parser):
+    """Register MockConfig options on an argparse parser (shared with bench-images.py)"""
+    defaults = MockConfig()
+    group = parser.add_argument_group("mock server")
+    group.add_argument("--latency", type=float, default=defaults.latency,
+                       help=f"median generation latency in seconds (default: {defaults.latency})")
+    group.add_argument("--jitter", type=float, default=defaults.jitter,
+                       help=f"log-normal sigma of the latency; 0 for a fixed delay (default: {defaults.jitter})")
+    group.add_argument("--error-rate", type=float, default=0.0, help="fraction of generations answered with 500")
+    group.add_argument("--rate-limit-rate", type=float, default=0.0,
+                       help="fraction of generations answered with 429")
+    group.add_argument("--retry-after", type=float, default=defaults.retry_after,
+                       help=f"Retry-After seconds on injected 429s (default: {defaults.retry_after})")
+    group.add_argument("--quota-rpm", type=float, default=0.0,
+                       help="enforce a requests/minute quota with 429s and x-ratelimit headers")
+    group.add_argument("--url-ttl", type=float, default=defaults.url_ttl,
+                       help=f"seconds before url-mode links expire (default: {defaults.url_ttl:g})")
+    group.add_argument("--bandwidth", type=float, default=0.0,
+                       help="per-download bandwidth cap in MB/s (default: unlimited)")
+    group.add_argument("--scale", type=float, default=defaults.scale,
+                       help="image dimensions relative to the requested size (e.g. 0.25 for quick runs)")
+    group.add_argument("--seed", type=int, help="seed for latency/error sampling")
+    return group
+
+def config_from_args(args):
+    return MockConfig(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                      rate_limit_rate=args.rate_limit_rate, retry_after=args.retry_after,
+                      quota_rpm=args.quota_rpm, url_ttl=args.url_ttl, bandwidth=args.bandwidth * 1024 * 1024,
+                      scale=args.scale, seed=args.seed)
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local mock of the OpenAI images API")
+    parser.add_argument("--host", default="127.0.0.1", help="interface to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"port (default: {DEFAULT_PORT})")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    api = MockImageAPI(config_from_args(args), args.host, args.port)
+    print("🧪 Mock OpenAI images API")
+    print(f"🔗 OPENAI_BASE_URL={api.base_url}")
+    print(f"⚙️  {json.dumps({k: v for k, v in asdict(api.config).items() if v is not None})}")
+    try:
+        api.server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n📊 " + json.dumps(api.snapshot()))
+    finally:
+        api.server.server_close()
+
+if __name__ == "__main__":
+    main()
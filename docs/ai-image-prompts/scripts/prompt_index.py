@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Incremental index of image prompts under blog-post-prompts/ and linkedin-carousel/
+Parses each markdown file once and re-parses only files whose mtime or size changed
+
+Each entry records the extracted prompt, which heading variant it came from,
+a sha256 of the prompt text and the file's mtime/size. The index is a JSON
+file next to this script (.prompt-index.json, override with PROMPT_INDEX_PATH).
+
+A prompt counts as changed until an image has been generated from its
+current text: each entry also keeps the hash of the prompt last generated
+(mark_generated), so listing or loading prompts never hides a change from
+generate-image.py --changed-only.
+
+Recognised prompt layouts:
+    dalle     "## 📝 Azure OpenAI DALL-E 3 Optimized Prompt" section
+    adobe     "## 📝 Complete Adobe AI Prompt" section; its
+              "[Start with default prompt template, then add:]" note pulls in
+              the base prompt from default-prompt-template.md
+    document  no "##" sections at all - the body under the title is the prompt
+
+Usage:
+    python prompt_index.py              # refresh and list every prompt
+    python prompt_index.py --changed    # print paths of prompts changed since last generated
+    python prompt_index.py --names      # prompt names only (for shell listings)
+"""
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+import tempfile
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+BASE_DIR = SCRIPT_DIR.parent
+PROMPT_ROOTS = (BASE_DIR / "blog-post-prompts", BASE_DIR / "linkedin-carousel")
+TEMPLATE_PATH = BASE_DIR / "default-prompt-template.md"
+DEFAULT_INDEX_PATH = SCRIPT_DIR / ".prompt-index.json"
+INDEX_VERSION = 2
+
+# Prompt section headings, in order of preference
+PROMPT_HEADING = '## 📝 Azure OpenAI DALL-E 3 Optimized Prompt'
+ADOBE_HEADING = '## 📝 Complete Adobe AI Prompt'
+HEADING_VARIANTS = (("dalle", PROMPT_HEADING), ("adobe", ADOBE_HEADING))
+TEMPLATE_HEADING = '## 📋 Standard Base Prompt'
+TEMPLATE_MARKER = '[Start with default prompt template'
+
+def _section(lines, heading):
+    """Lines between heading and the next "## " heading, or None when absent"""
+    for i, line in enumerate(lines):
+        if heading in line:
+            section = []
+            for line in lines[i + 1:]:
+                if line.startswith('## '):
+                    break
+                section.append(line)
+            return section
+    return None
+
+def _clean(lines):
+    """Drop blank lines and bare code fences; prompts are sent as plain text"""
+    return '\n'.join(line for line in lines if line.strip() and not line.strip().startswith('```')).strip()
+
+def extract_template_prompt(content):
+    """The fenced base prompt from default-prompt-template.md"""
+    section = _section(content.split('\n'), TEMPLATE_HEADING) or []
+    fenced = []
+    inside = False
+    for line in section:
+        if line.strip().startswith('```'):
+            if inside:
+                break
+            inside = True
+        elif inside:
+            fenced.append(line)
+    return _clean(fenced)
+
+def extract_prompt(content, template_prompt=""):
+    """
+    Extract the image prompt from a prompt markdown file.
+
+    Returns (prompt_text, variant); variant is None and the prompt empty when
+    the file has no recognisable prompt.
+    """
+    lines = content.split('\n')
+
+    for variant, heading in HEADING_VARIANTS:
+        section = _section(lines, heading)
+        if section is None:
+            continue
+        if any(TEMPLATE_MARKER in line for line in section):
+            section = [line for line in section if TEMPLATE_MARKER not in line]
+            return '\n'.join(part for part in (template_prompt, _clean(section)) if part), variant
+        return _clean(section), variant
+
+    if not any(line.startswith('## ') for line in lines):
+        body = [line for line in lines if not line.startswith('# ')]
+        prompt = _clean(body)
+        if prompt:
+            return prompt, "document"
+
+    return "", None
+
+def _hash(prompt):
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+def _file_key(path):
+    """Index key: path relative to ai-image-prompts/ when inside it, else absolute"""
+    path = Path(path).resolve()
+    try:
+        return path.relative_to(BASE_DIR).as_posix()
+    except ValueError:
+        return str(path)
+
+@dataclass
+class PromptEntry:
+    """Parsed prompt file as stored in the index"""
+    path: str
+    name: str
+    variant: str
+    prompt: str
+    prompt_hash: str
+    mtime_ns: int
+    size: int
+    generated_hash: str = ""
+
+    @property
+    def changed(self):
+        """True when the prompt text differs from the one last generated"""
+        return bool(self.prompt) and self.prompt_hash != self.generated_hash
+
+    @property
+    def file_path(self):
+        path = Path(self.path)
+        return path if path.is_absolute() else BASE_DIR / path
+
+class PromptIndex:
+    """
+    JSON-backed prompt index that only re-parses files that changed on disk.
+
+    Safe to share between threads; every public method takes the lock and
+    the file is rewritten atomically whenever an entry changes.
+    """
+
+    def __init__(self, index_path=None, roots=PROMPT_ROOTS, template_path=TEMPLATE_PATH):
+        self.index_path = Path(index_path or os.getenv("PROMPT_INDEX_PATH") or DEFAULT_INDEX_PATH)
+        self.roots = tuple(Path(root) for root in roots)
+        self.template_path = Path(template_path)
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._template_stat = None
+        self._template_prompt = None
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        version = data.get("version")
+        if version not in (1, INDEX_VERSION):
+            return
+        self._template_stat = data.get("template")
+        self._entries = {key: PromptEntry(**entry) for key, entry in data.get("entries", {}).items()}
+        if version == 1:
+            # Version 1 had no generated hash; treat what it had seen as generated
+            for entry in self._entries.values():
+                entry.generated_hash = entry.prompt_hash
+            self._dirty = True
+
+    def save(self):
+        """Write the index if anything changed since it was loaded"""
+        with self._lock:
+            self._save()
+
+    def _save(self):
+        if not self._dirty:
+            return
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "version": INDEX_VERSION,
+            "template": self._template_stat,
+            "entries": {key: asdict(entry) for key, entry in sorted(self._entries.items())},
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.index_path.parent, prefix=f".{self.index_path.name}.",
+                                        suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=1, ensure_ascii=False)
+            os.replace(tmp_path, self.index_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._dirty = False
+
+    def _check_template(self):
+        """Invalidate template-based entries when default-prompt-template.md changes"""
+        try:
+            stat = self.template_path.stat()
+            current = [stat.st_mtime_ns, stat.st_size]
+        except FileNotFoundError:
+            current = None
+        if current != self._template_stat:
+            self._template_stat = current
+            self._template_prompt = None
+            self._dirty = True
+            for entry in self._entries.values():
+                if entry.variant == "adobe":
+                    entry.mtime_ns = -1  # re-parse on next use, keeping generated_hash
+
+    def _template(self):
+        if self._template_prompt is None:
+            try:
+                self._template_prompt = extract_template_prompt(self.template_path.read_text(encoding='utf-8'))
+            except OSError:
+                self._template_prompt = ""
+        return self._template_prompt
+
+    def _update(self, path):
+        """Return the entry for path, re-parsing it only when stale"""
+        key = _file_key(path)
+        stat = Path(path).stat()
+        entry = self._entries.get(key)
+        if entry and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+            return entry
+        new_entry = self._parse(path, key, stat, entry)
+        self._entries[key] = new_entry
+        self._dirty = True
+        return new_entry
+
+    def _parse(self, path, key, stat, previous):
+        with open(path, 'r', encoding='utf-8') as f:
+            prompt, variant = extract_prompt(f.read(), self._template())
+        return PromptEntry(key, Path(path).stem, variant, prompt, _hash(prompt),
+                           stat.st_mtime_ns, stat.st_size, previous.generated_hash if previous else "")
+
+    def get(self, prompt_file):
+        """Return the PromptEntry for one file, parsing it if new or modified"""
+        with self._lock:
+            self._check_template()
+            entry = self._update(prompt_file)
+            self._save()
+            return entry
+
+    def mark_generated(self, prompt_file, prompt_text):
+        """Record that an image was generated from prompt_text, so the file stops counting as changed"""
+        with self._lock:
+            entry = self._entries.get(_file_key(prompt_file))
+            prompt_hash = _hash(prompt_text)
+            if entry is not None and entry.generated_hash != prompt_hash:
+                entry.generated_hash = prompt_hash
+                self._dirty = True
+                self._save()
+
+    def refresh(self):
+        """
+        Bring the index up to date with every prompt root.
+
+        Returns (changed, removed): entries whose prompt text has not been
+        generated yet (see mark_generated), and the keys of files that
+        disappeared. Refreshing does not change what counts as changed.
+        """
+        with self._lock:
+            self._check_template()
+            changed = []
+            seen = set()
+            for root in self.roots:
+                for path in sorted(root.glob("*.md")):
+                    entry = self._update(path)
+                    seen.add(entry.path)
+                    if entry.changed:
+                        changed.append(entry)
+
+            root_keys = {_file_key(root) for root in self.roots}
+            removed = [key for key in self._entries
+                       if key not in seen and key.rsplit('/', 1)[0] in root_keys]
+            for key in removed:
+                del self._entries[key]
+                self._dirty = True
+
+            self._save()
+            return changed, removed
+
+    def entries(self):
+        """Every indexed entry, sorted by path"""
+        with self._lock:
+            return [self._entries[key] for key in sorted(self._entries)]
+
+    def peek(self, name):
+        """
+        The current entry for the prompt file named name (a file stem) in the
+        prompt roots, or None. Read-only: a stale file is parsed but the index
+        is neither updated nor saved.
+        """
+        with self._lock:
+            for root in self.roots:
+                path = root / f"{name}.md"
+                if not path.is_file():
+                    continue
+                key = _file_key(path)
+                stat = path.stat()
+                entry = self._entries.get(key)
+                if entry and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+                    return entry
+                return self._parse(path, key, stat, entry)
+        return None
+
+    def find(self, name):
+        """Look up a prompt by file stem (e.g. "ai-first-development")"""
+        with self._lock:
+            for key in sorted(self._entries):
+                if self._entries[key].name == name:
+                    return self._entries[key]
+        return None
+
+_shared_index = None
+_shared_lock = threading.Lock()
+
+def get_index(**kwargs):
+    """Return the process-wide index, creating it on first use"""
+    global _shared_index
+    with _shared_lock:
+        if _shared_index is None:
+            _shared_index = PromptIndex(**kwargs)
+        return _shared_index
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh and list the prompt index")
+    parser.add_argument("--changed", action="store_true", help="print only new or changed prompt files")
+    parser.add_argument("--names", action="store_true", help="print prompt names only")
+    parser.add_argument("--rebuild", action="store_true", help="discard the index (and which prompts were generated) and re-parse everything")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        index_path = Path(os.getenv("PROMPT_INDEX_PATH") or DEFAULT_INDEX_PATH)
+        if index_path.exists():
+            index_path.unlink()
+
+    index = get_index()
+    changed, removed = index.refresh()
+
+    if args.changed:
+        for entry in changed:
+            print(entry.file_path)
+        return
+    if args.names:
+        for entry in index.entries():
+            if entry.prompt:
+                print(entry.name)
+        return
+
+    changed_paths = {entry.path for entry in changed}
+    print(f"{'Prompt':<60} {'Variant':<9} {'Chars':>6}  Hash")
+    print("-" * 90)
+    for entry in index.entries():
+        marker = "*" if entry.path in changed_paths else " "
+        print(f"{marker}{entry.path[:59]:<59} {entry.variant or '-':<9} {len(entry.prompt):>6}  "
+              f"{entry.prompt_hash[:12]}")
+    missing = [entry for entry in index.entries() if not entry.prompt]
+    print("-" * 90)
+    print(f"📚 {len(index.entries())} prompts, {len(changed)} new/changed (*), {len(removed)} removed")
+    if missing:
+        print(f"⚠️  {len(missing)} files have no recognisable prompt section")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Adaptive token-bucket rate limiter for the OpenAI images API
+Shared by every worker in a process so throughput tracks the account quota
+
+The bucket starts at a conservative rate and learns the real quota from the
+x-ratelimit-* response headers. 429 and 5xx responses pause all workers for
+the server's Retry-After (or an exponential backoff with full jitter when no
+hint is given) and halve the rate, which then recovers additively on success.
+
+Environment overrides:
+    IMAGE_RPM   initial requests per minute (default: 5)
+"""
+
+import os
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+
+DEFAULT_RPM = 5
+DEFAULT_MAX_RETRIES = 5
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+def parse_duration(value):
+    """
+    Parse OpenAI-style durations ("1s", "6m0s", "120ms", "1h2m3.5s") or plain
+    seconds into a float. Returns None when the value is not understood.
+    """
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    total = 0.0
+    number = ""
+    i = 0
+    units = {"h": 3600, "m": 60, "s": 1, "ms": 0.001}
+    while i < len(value):
+        ch = value[i]
+        if ch.isdigit() or ch == ".":
+            number += ch
+            i += 1
+            continue
+        unit = "ms" if value.startswith("ms", i) else ch
+        if unit not in units or not number:
+            return None
+        total += float(number) * units[unit]
+        number = ""
+        i += len(unit)
+    return total if not number else None
+
+def retry_after_seconds(headers):
+    """Server-suggested wait from Retry-After / retry-after-ms, or None"""
+    if headers.get("retry-after-ms"):
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+
+    value = headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class AdaptiveRateLimiter:
+    """
+    Thread-safe token bucket whose rate adapts to server feedback.
+
+    Call acquire() before each request and on_response() with its status and
+    headers afterwards. on_response() returns the delay a caller should
+    observe before retrying, or None when the response is not retryable.
+    """
+
+    def __init__(self, requests_per_minute=None, burst=1, base_backoff=1.0, max_backoff=60.0,
+                 min_rpm=1.0):
+        rpm = requests_per_minute or float(os.getenv("IMAGE_RPM", DEFAULT_RPM))
+        self.rate = rpm / 60.0           # tokens per second currently allowed
+        self.target_rate = self.rate     # best known sustainable rate
+        self.min_rate = min_rpm / 60.0
+        self.capacity = max(1, burst)
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        self._tokens = float(self.capacity)
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        self._failures = 0
+        self._lock = threading.Lock()
+
+        self.throttled = 0
+        self.waited = 0.0
+
+    @property
+    def requests_per_minute(self):
+        return self.rate * 60
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    wait = self._blocked_until - now
+                else:
+                    self._refill(now)
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            self.waited += wait
+            time.sleep(wait)
+
+    def _block_for(self, seconds):
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    def _learn(self, headers):
+        """Adopt the quota the server reports for this key"""
+        limit = headers.get("x-ratelimit-limit-requests")
+        remaining = headers.get("x-ratelimit-remaining-requests")
+        reset = parse_duration(headers.get("x-ratelimit-reset-requests"))
+
+        if limit:
+            try:
+                # Request limits for the images endpoint are per minute
+                self.target_rate = max(self.min_rate, float(limit) / 60.0)
+            except ValueError:
+                pass
+
+        if remaining is not None and reset is not None:
+            try:
+                if int(remaining) <= 0:
+                    self._block_for(reset)
+            except ValueError:
+                pass
+
+    def on_response(self, status_code, headers):
+        """Update the limiter from a response; returns a retry delay or None"""
+        with self._lock:
+            self._learn(headers)
+
+            if status_code not in RETRYABLE_STATUS:
+                self._failures = 0
+                if self.rate < self.target_rate:
+                    # Additive increase back toward the learned quota
+                    self.rate = min(self.target_rate, self.rate + self.target_rate * 0.1)
+                else:
+                    self.rate = self.target_rate
+                return None
+
+            self._failures += 1
+            self.throttled += 1
+            delay = retry_after_seconds(headers)
+            if delay is None:
+                ceiling = min(self.max_backoff, self.base_backoff * 2 ** self._failures)
+                delay = random.uniform(self.base_backoff, ceiling)
+
+            if status_code == 429:
+                # Multiplicative decrease; empty the bucket so nobody sneaks in
+                self.rate = max(self.min_rate, self.rate * 0.5)
+                self._tokens = 0.0
+
+            self._block_for(delay)
+            return delay
+
+_shared_limiter = None
+_shared_lock = threading.Lock()
+
+def get_limiter(**kwargs):
+    """Return the process-wide limiter, creating it on first use"""
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = AdaptiveRateLimiter(**kwargs)
+        return _shared_limiter
+
+def configure_limiter(**kwargs):
+    """Replace the process-wide limiter (e.g. from CLI flags)"""
+    global _shared_limiter
+    with _shared_lock:
+        _shared_limiter = AdaptiveRateLimiter(**kwargs)
+        return _shared_limiter
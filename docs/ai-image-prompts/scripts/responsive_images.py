@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Responsive image derivatives and the _data/images.yml manifest for Jekyll
+Resizes each site image to a width ladder so phones stop downloading 1792px PNGs
+
+For every image under docs/assets/linkedin-images and docs/assets/images the
+builder writes WebP derivatives at RESPONSIVE_WIDTHS (never wider than the
+source) to a responsive/ folder beside it, and records them in
+docs/_data/images.yml keyed by the image's site path:
+
+    /assets/linkedin-images/foo-linkedin.png:
+      width: 1792
+      height: 1024
+      sha256: 3f1c...
+      variants:
+      - {path: /assets/linkedin-images/responsive/foo-linkedin-480w.webp, width: 480, height: 274, bytes: 20480}
+
+Layouts look the post's image up in site.data.images to build a srcset.
+Only images whose sha256 changed (or whose derivatives are missing) are
+resized, in a process pool.
+
+Usage:
+    python responsive_images.py             # update derivatives and manifest
+    python responsive_images.py --force     # rebuild every derivative
+"""
+
+import os
+import time
+import hashlib
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import yaml
+from PIL import Image
+
+from image_optimizer import is_variant
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+DOCS_DIR = SCRIPT_DIR.parents[1]
+SOURCE_DIRS = (DOCS_DIR / "assets" / "linkedin-images", DOCS_DIR / "assets" / "images")
+MANIFEST_PATH = DOCS_DIR / "_data" / "images.yml"
+RESPONSIVE_DIR = "responsive"
+RESPONSIVE_WIDTHS = (480, 960, 1792)
+IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg")
+WEBP_QUALITY = 80
+MANIFEST_HEADER = "# Generated by docs/ai-image-prompts/scripts/responsive_images.py - do not edit by hand\n"
+
+def site_path(path):
+    """Path of a file as the site serves it (/assets/...)"""
+    return "/" + Path(path).resolve().relative_to(DOCS_DIR).as_posix()
+
+def derivative_path(source, width):
+    source = Path(source)
+    return source.parent / RESPONSIVE_DIR / f"{source.stem}-{width}w.webp"
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def find_sources(dirs=SOURCE_DIRS):
+    """Site images that get derivatives (not derivatives or optimizer variants themselves)"""
+    sources = []
+    for directory in dirs:
+        for path in sorted(Path(directory).rglob("*")):
+            if path.suffix.lower() in IMAGE_SUFFIXES and RESPONSIVE_DIR not in path.parts \
+                    and not is_variant(path):
+                sources.append(path)
+    return sources
+
+def build_derivatives(source, widths=RESPONSIVE_WIDTHS):
+    """Write the width ladder for one image (worker process); returns its manifest fields"""
+    source = Path(source)
+    with Image.open(source) as image:
+        image.load()
+        width, height = image.size
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+        ladder = sorted({w for w in widths if w < width} | {min(width, max(widths))})
+        variants = []
+        for target in ladder:
+            target_height = max(1, round(height * target / width))
+            # reducing_gap shrinks by an integer factor first, then filters the rest with LANCZOS
+            resized = image if target == width else image.resize((target, target_height), Image.LANCZOS,
+                                                                  reducing_gap=3.0)
+            output = derivative_path(source, target)
+            output.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=output.parent, prefix=f".{output.name}.", suffix=".tmp")
+            os.close(fd)
+            try:
+                resized.save(tmp_path, "WEBP", quality=WEBP_QUALITY, method=4)
+                os.replace(tmp_path, output)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            variants.append({"path": site_path(output), "width": target, "height": target_height,
+                             "bytes": output.stat().st_size})
+    return {"width": width, "height": height, "variants": variants}
+
+def load_manifest(path=MANIFEST_PATH):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return yaml.safe_load(f) or {}
+    except (OSError, yaml.YAMLError):
+        return {}
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(MANIFEST_HEADER)
+            yaml.safe_dump(manifest, f, sort_keys=True, default_flow_style=None, width=200)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def _is_current(entry, sha, widths):
+    if not entry or entry.get("sha256") != sha or entry.get("widths") != list(widths):
+        return False
+    return all((DOCS_DIR / variant["path"].lstrip("/")).exists() for variant in entry.get("variants", []))
+
+def update_manifest(sources=None, widths=RESPONSIVE_WIDTHS, workers=None, force=False, manifest_path=MANIFEST_PATH,
+                    log=print):
+    """
+    Bring derivatives and the manifest up to date with the site images.
+
+    Returns (built, unchanged, removed) counts. Derivatives of images that
+    no longer exist are deleted along with their manifest entries.
+    """
+    sources = find_sources() if sources is None else [Path(source) for source in sources]
+    manifest = load_manifest(manifest_path)
+    updated = {}
+    todo = {}
+    for source in sources:
+        key = site_path(source)
+        sha = file_sha256(source)
+        if not force and _is_current(manifest.get(key), sha, widths):
+            updated[key] = manifest[key]
+        else:
+            todo[key] = (source, sha)
+
+    if todo:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+            futures = {pool.submit(build_derivatives, str(source), widths): key for key, (source, _) in todo.items()}
+            for future in as_completed(futures):
+                key = futures[future]
+                source, sha = todo[key]
+                try:
+                    entry = future.result()
+                except Exception as e:
+                    log(f"❌ {source.name}: {e}")
+                    continue
+                entry.update({"sha256": sha, "bytes": source.stat().st_size, "widths": list(widths)})
+                updated[key] = entry
+                sizes = ", ".join(f"{v['width']}w {v['bytes'] // 1024} KB" for v in entry["variants"])
+                log(f"📐 {source.name}: {sizes}")
+
+    # Entries (and derivative files) whose source image is gone
+    removed = [key for key in manifest if key not in updated and not (DOCS_DIR / key.lstrip("/")).exists()]
+    for key in removed:
+        for variant in manifest[key].get("variants", []):
+            (DOCS_DIR / variant["path"].lstrip("/")).unlink(missing_ok=True)
+    for key, entry in manifest.items():
+        if key not in updated and key not in removed:
+            updated[key] = entry  # outside the scanned sources; keep as is
+
+    if updated != manifest:
+        save_manifest(updated, manifest_path)
+    return len(todo), len(sources) - len(todo), len(removed)
+
+def main():
+    parser = argparse.ArgumentParser(description="Build responsive image derivatives and _data/images.yml")
+    parser.add_argument("paths", nargs="*", help="images to process (default: every site image)")
+    parser.add_argument("--widths", type=int, nargs="+", default=list(RESPONSIVE_WIDTHS),
+                        help=f"width ladder (default: {' '.join(map(str, RESPONSIVE_WIDTHS))})")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--force", action="store_true", help="rebuild derivatives even if unchanged")
+    args = parser.parse_args()
+
+    print("📐 Responsive image derivatives")
+    start = time.perf_counter()
+    built, unchanged, removed = update_manifest(args.paths or None, tuple(sorted(args.widths)), args.workers,
+                                                args.force)
+    print(f"✅ {built} resized, {unchanged} unchanged, {removed} removed in {time.perf_counter() - start:.1f}s")
+    print(f"🗂️  Manifest: {MANIFEST_PATH.relative_to(DOCS_DIR)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Ledger of short-lived image URLs and an expiry-aware download scheduler
+Downloads the links closest to expiring first and never requests a dead one
+
+url-mode generations return signed blob links that stop working about two
+hours later. image_generator records every link here (.url-ledger.json next
+to this script, override with URL_LEDGER_PATH) with its generation time and
+the expiry parsed from the signature's se= parameter. download_pending()
+then fetches outstanding links earliest-expiry-first; links that have
+already expired (or expire mid-download) are handed to a regenerate callback
+instead of being requested.
+
+Usage:
+    python url_ledger.py            # list links and time left
+    python url_ledger.py --prune    # drop finished entries older than a day
+"""
+
+import os
+import json
+import time
+import argparse
+import tempfile
+import threading
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from downloads import DEFAULT_RETRIES, DEFAULT_WORKERS, DownloadJob, JobOutcome, download_all
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+DEFAULT_LEDGER_PATH = SCRIPT_DIR / ".url-ledger.json"
+DEFAULT_TTL = 2 * 60 * 60      # assumed lifetime when a URL carries no se= expiry
+EXPIRY_MARGIN = 60             # seconds; links with less time left are treated as expired
+PRUNE_AGE = 24 * 60 * 60
+
+def parse_expiry(url):
+    """Expiry of a signed blob URL as a UTC timestamp (from se=), or None"""
+    values = parse_qs(urlsplit(url).query).get("se")
+    if not values:
+        return None
+    try:
+        expiry = datetime.fromisoformat(values[0].replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if expiry.tzinfo is None:
+        expiry = expiry.replace(tzinfo=timezone.utc)
+    return expiry.timestamp()
+
+@dataclass
+class LedgerEntry:
+    """One generated link and where its image belongs"""
+    output_path: str
+    url: str
+    generated_at: float
+    expires_at: float
+    prompt: str = ""
+    size: str = ""
+    status: str = "pending"    # pending, downloaded, expired, regenerated
+    finished_at: Optional[float] = None
+    error: str = ""
+
+    @property
+    def name(self):
+        return Path(self.output_path).stem
+
+    def seconds_left(self, now=None):
+        return self.expires_at - (time.time() if now is None else now)
+
+@dataclass
+class ScheduleReport:
+    """What download_pending() did"""
+    downloaded: List[str] = field(default_factory=list)
+    regenerated: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+    outcomes: List[JobOutcome] = field(default_factory=list)
+
+    @property
+    def ok(self):
+        return not self.failed
+
+class UrlLedger:
+    """JSON-backed, thread-safe record of generated URLs keyed by output path"""
+
+    def __init__(self, path=None):
+        self.path = Path(path or os.getenv("URL_LEDGER_PATH") or DEFAULT_LEDGER_PATH)
+        self._lock = threading.Lock()
+        self._entries = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._entries = {entry["output_path"]: LedgerEntry(**entry) for entry in json.load(f)}
+        except (OSError, ValueError, TypeError, KeyError):
+            pass
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump([asdict(entry) for entry in self._entries.values()], f, indent=1)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def record(self, output_path, url, prompt="", size="", generated_at=None):
+        """Remember a freshly generated url for output_path (replacing any older link)"""
+        generated_at = time.time() if generated_at is None else generated_at
+        expires_at = parse_expiry(url) or generated_at + DEFAULT_TTL
+        entry = LedgerEntry(str(Path(output_path).resolve()), url, generated_at, expires_at, prompt, size)
+        with self._lock:
+            self._entries[entry.output_path] = entry
+            self._save()
+        return entry
+
+    def update(self, output_path, **changes):
+        """Change fields of the entry for output_path (no-op when it is not in the ledger)"""
+        with self._lock:
+            entry = self._entries.get(str(Path(output_path).resolve()))
+            if entry is None:
+                return None
+            for key, value in changes.items():
+                setattr(entry, key, value)
+            if changes.get("status") in ("downloaded", "regenerated"):
+                entry.finished_at = time.time()
+                entry.error = ""
+            self._save()
+            return entry
+
+    def entries(self):
+        with self._lock:
+            return sorted(self._entries.values(), key=lambda entry: entry.expires_at)
+
+    def pending(self):
+        """Entries that still need their image, earliest expiry first"""
+        return [entry for entry in self.entries() if entry.status in ("pending", "expired")]
+
+    def prune(self, max_age=PRUNE_AGE):
+        """Drop finished entries older than max_age seconds; returns how many were removed"""
+        cutoff = time.time() - max_age
+        with self._lock:
+            stale = [key for key, entry in self._entries.items()
+                     if entry.status in ("downloaded", "regenerated") and (entry.finished_at or 0) < cutoff]
+            for key in stale:
+                del self._entries[key]
+            if stale:
+                self._save()
+            return len(stale)
+
+def plan_downloads(entries, now=None, margin=EXPIRY_MARGIN):
+    """Split entries into (downloadable earliest-expiry-first, already expired)"""
+    now = time.time() if now is None else now
+    ready = sorted((entry for entry in entries if entry.seconds_left(now) > margin),
+                   key=lambda entry: entry.expires_at)
+    expired = [entry for entry in entries if entry.seconds_left(now) <= margin]
+    return ready, expired
+
+def download_pending(ledger=None, workers=DEFAULT_WORKERS, deadline=None, retries=DEFAULT_RETRIES,
+                     verify=True, timeout=None, margin=EXPIRY_MARGIN, regenerate=None, log=print):
+    """
+    Download every pending link in the ledger, closest to expiry first.
+
+    Each download is cut off when its link expires (or after deadline
+    seconds, whichever is sooner). Expired links are never requested; they
+    are passed to regenerate(entry), which should produce the image another
+    way and return True on success. Without a callback they are reported as
+    failed so the caller can regenerate them.
+    """
+    ledger = ledger or get_ledger()
+    report = ScheduleReport()
+    ready, expired = plan_downloads(ledger.pending(), margin=margin)
+
+    for entry in expired:
+        log(f"⌛ {entry.name}: link has expired - not requesting it")
+        ledger.update(entry.output_path, status="expired")
+
+    jobs = []
+    for entry in ready:
+        budget = entry.seconds_left() - margin
+        log(f"⏰ {entry.name}: {entry.seconds_left() / 60:.0f} min left")
+        jobs.append(DownloadJob(entry.name, entry.url, Path(entry.output_path),
+                                deadline=min(deadline, budget) if deadline else budget))
+    by_path = {str(job.output_path): entry for job, entry in zip(jobs, ready)}
+
+    def on_done(outcome):
+        entry = by_path[str(outcome.job.output_path)]
+        report.outcomes.append(outcome)
+        if outcome.success:
+            ledger.update(entry.output_path, status="downloaded")
+            report.downloaded.append(entry.name)
+            log(f"✅ {entry.name} saved ({outcome.result.bytes // 1024} KB, {outcome.elapsed:.1f}s)")
+        elif outcome.error.startswith("HTTP 403") or entry.seconds_left() <= margin:
+            ledger.update(entry.output_path, status="expired", error=outcome.error)
+            expired.append(entry)
+            log(f"⌛ {entry.name}: link expired during download")
+        else:
+            ledger.update(entry.output_path, error=outcome.error)
+            report.failed[entry.name] = outcome.error
+            log(f"❌ {entry.name}: {outcome.error}")
+
+    # download_all starts jobs in submission order, so the earliest expiry goes first
+    download_all(jobs, workers=workers, verify=verify, timeout=timeout, retries=retries, on_done=on_done)
+
+    for entry in expired:
+        if regenerate is None or not entry.prompt:
+            report.failed[entry.name] = "link expired - regenerate the image"
+            continue
+        log(f"🔄 Regenerating {entry.name}...")
+        if regenerate(entry):
+            ledger.update(entry.output_path, status="regenerated")
+            report.regenerated.append(entry.name)
+        else:
+            report.failed[entry.name] = "link expired and regeneration failed"
+    return report
+
+_shared_ledger = None
+_shared_lock = threading.Lock()
+
+def get_ledger(**kwargs):
+    """Return the process-wide ledger, creating it on first use"""
+    global _shared_ledger
+    with _shared_lock:
+        if _shared_ledger is None:
+            _shared_ledger = UrlLedger(**kwargs)
+        return _shared_ledger
+
+def main():
+    parser = argparse.ArgumentParser(description="List generated image links and their expiry")
+    parser.add_argument("--prune", action="store_true", help="drop finished entries older than a day")
+    args = parser.parse_args()
+
+    ledger = get_ledger()
+    if args.prune:
+        print(f"🧹 Removed {ledger.prune()} finished entries")
+
+    now = time.time()
+    print(f"{'Image':<48} {'Status':<12} {'Left':>8}  Generated")
+    print("-" * 90)
+    for entry in ledger.entries():
+        left = entry.seconds_left(now)
+        left_text = f"{left / 60:.0f} min" if left > 0 else "expired"
+        generated = datetime.fromtimestamp(entry.generated_at).strftime("%Y-%m-%d %H:%M")
+        print(f"{entry.name[:48]:<48} {entry.status:<12} {left_text:>8}  {generated}")
+    print("-" * 90)
+    print(f"🔗 {len(ledger.pending())} of {len(ledger.entries())} links still need downloading")
+
+if __name__ == "__main__":
+    main()
@@ -2,12 +2,31 @@
 """
 Download LinkedIn Carousel Slides
 Handles SSL certificate verification issues by disabling SSL verification for these specific downloads
+
+Only needed for URLs from --response-format url runs; b64_json generations are
+written straight to disk by generate-image.py and never expire.
+
+Links recorded in the URL ledger by image_generator are downloaded first,
+earliest expiry first; links that have already expired are regenerated
+(inline, so they cannot expire again) instead of being requested. With an
+empty ledger (or --legacy) the hardcoded slide URLs below are used.
+
+Slides download in parallel (--workers) so the whole set takes about as long
+as the slowest link, which matters when the links are close to expiring.
 """
 
-import requests
+import sys
+import time
+import argparse
 import urllib3
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent / "ai-image-prompts" / "scripts"))
+from downloads import DEFAULT_RETRIES, DownloadJob, download_all
+from http_client import configure_client
+from image_generator import DEFAULT_SIZE, generate_image
+from url_ledger import download_pending, get_ledger
+
 # Disable SSL warnings for this specific download task
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -21,52 +40,82 @@ slides = {
     "slide-6-framework": "https://oaidalleapiprodscus.blob.core.windows.net/private/org-M1Xd7CdmA74jylXQPwDC5Wfi/user-3CsZOA2eyyQXJvWWAwnVc7g5/img-I1AHaOob9EEFQxlZbMofTGse.png"
 }
 
-def download_slide(url, filename):
-    """Download a single slide with SSL verification disabled"""
-    try:
-        print(f"📥 Downloading {filename}...")
-        
-        # Use verify=False to bypass SSL certificate verification
-        response = requests.get(url, verify=False, timeout=30)
-        
-        if response.status_code == 200:
-            # Create output directory if it doesn't exist
-            output_dir = Path("ai-image-prompts/output")
-            output_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Save the image
-            output_path = output_dir / f"{filename}.png"
-            with open(output_path, "wb") as f:
-                f.write(response.content)
-            
-            file_size = len(response.content) // 1024
-            print(f"✅ {filename} saved ({file_size} KB)")
-            return True
-        else:
-            print(f"❌ Failed to download {filename}: HTTP {response.status_code}")
-            return False
-            
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Network error downloading {filename}: {e}")
-        return False
-    except Exception as e:
-        print(f"❌ Unexpected error downloading {filename}: {e}")
-        return False
+OUTPUT_DIR = Path(__file__).resolve().parent / "ai-image-prompts" / "output"
+DEFAULT_DEADLINE = 120  # seconds per slide, retries included
+
+def print_download_report(outcomes, wall_time):
+    """Per-slide latency/throughput table for a parallel run"""
+    print("=" * 78)
+    print(f"{'Slide':<24} {'Status':<8} {'Time':>7} {'Size':>9} {'Speed':>11} {'Tries':>5}")
+    print("-" * 78)
+    for outcome in outcomes:
+        status = "✅ ok" if outcome.success else "❌ fail"
+        size = f"{outcome.result.bytes // 1024} KB" if outcome.success else "-"
+        speed = f"{outcome.throughput / 1024 / 1024:.2f} MB/s" if outcome.success else "-"
+        print(f"{outcome.job.name[:24]:<24} {status:<8} {outcome.elapsed:>6.1f}s {size:>9} {speed:>11} "
+              f"{outcome.attempts:>5}")
+        if outcome.error:
+            print(f"    ↳ {outcome.error}")
+    print("-" * 78)
+    total_bytes = sum(outcome.result.bytes for outcome in outcomes if outcome.success)
+    slowest = max((outcome.elapsed for outcome in outcomes), default=0.0)
+    print(f"⏱️  Wall time: {wall_time:.1f}s (slowest slide {slowest:.1f}s, "
+          f"sum {sum(outcome.elapsed for outcome in outcomes):.1f}s)")
+    if wall_time:
+        print(f"📶 Throughput: {total_bytes / wall_time / 1024 / 1024:.2f} MB/s")
+
+def regenerate_slide(entry):
+    """Replace an expired link by generating its image again, inline this time"""
+    return generate_image(entry.prompt, entry.output_path, size=entry.size or DEFAULT_SIZE,
+                          response_format="b64_json").success
 
 def main():
     """Download all carousel slides"""
+    parser = argparse.ArgumentParser(description="Download generated carousel slides before their links expire")
+    parser.add_argument("--workers", type=int, default=len(slides),
+                        help=f"slides downloaded at once; 1 downloads serially (default: {len(slides)})")
+    parser.add_argument("--deadline", type=float, default=DEFAULT_DEADLINE,
+                        help=f"seconds allowed per slide including retries (default: {DEFAULT_DEADLINE})")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES,
+                        help=f"extra attempts per slide on network errors (default: {DEFAULT_RETRIES})")
+    parser.add_argument("--legacy", action="store_true", help="download the hardcoded slide URLs, not the ledger")
+    parser.add_argument("--no-regenerate", action="store_true",
+                        help="report expired ledger links instead of regenerating them")
+    args = parser.parse_args()
+
     print("🎨 LinkedIn Carousel Slide Downloader")
     print("=" * 50)
-    
-    successful_downloads = 0
-    total_slides = len(slides)
-    
-    for filename, url in slides.items():
-        if download_slide(url, filename):
-            successful_downloads += 1
-        print()  # Add spacing between downloads
-    
-    print("=" * 50)
+
+    # One keep-alive pool shared by every worker; verify=False as above
+    configure_client(pool_size=max(1, args.workers))
+    ledger = get_ledger()
+    pending = [] if args.legacy else ledger.pending()
+
+    start = time.perf_counter()
+    if pending:
+        print(f"🔗 {len(pending)} links in the URL ledger, earliest expiry first ({args.workers} at a time)")
+        report = download_pending(ledger, workers=args.workers, deadline=args.deadline, retries=args.retries,
+                                  verify=False, timeout=(10, 30),
+                                  regenerate=None if args.no_regenerate else regenerate_slide)
+        outcomes = report.outcomes
+        successful_downloads = len(report.downloaded) + len(report.regenerated)
+        total_slides = len(pending)
+    else:
+        print(f"⚡ {len(slides)} slides, {args.workers} at a time")
+        jobs = [DownloadJob(filename, url, OUTPUT_DIR / f"{filename}.png") for filename, url in slides.items()]
+
+        def report(outcome):
+            if outcome.success:
+                print(f"✅ {outcome.job.name} saved ({outcome.result.bytes // 1024} KB, {outcome.elapsed:.1f}s)")
+            else:
+                print(f"❌ Failed to download {outcome.job.name}: {outcome.error}")
+
+        outcomes = download_all(jobs, workers=args.workers, verify=False, timeout=(10, 30),
+                                deadline=args.deadline, retries=args.retries, on_done=report)
+        successful_downloads = sum(1 for outcome in outcomes if outcome.success)
+        total_slides = len(slides)
+    print()
+    print_download_report(outcomes, time.perf_counter() - start)
     print(f"📊 Download Summary: {successful_downloads}/{total_slides} successful")
     
     if successful_downloads == total_slides:
@@ -1,17 +1,23 @@
 #!/usr/bin/env python3
 """
 Regenerate and Download LinkedIn Carousel Slides
-Generates fresh URLs and downloads immediately to avoid expiration
+Requests images inline (b64_json) so there is no URL to scrape or let expire
 """
 
-import os
 import sys
-import subprocess
-import requests
+import argparse
+import asyncio
 import urllib3
 from pathlib import Path
 import time
 
+sys.path.insert(0, str(Path(__file__).resolve().parent / "ai-image-prompts" / "scripts"))
+from downloads import DownloadError, download_file
+from image_cache import ImageCache
+from image_generator import OUTPUT_DIR, PROMPTS_DIR, generate_image, load_prompt
+from rate_limiter import configure_limiter
+from url_ledger import get_ledger
+
 # Disable SSL warnings for downloads
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -25,110 +31,118 @@ slides = [
     "linkedin-carousel-slide-6-success-framework"
 ]
 
-def extract_url_from_output(output):
-    """Extract the image URL from the generation script output"""
-    lines = output.split('\n')
-    for line in lines:
-        if line.startswith('🔗 Image URL: '):
-            return line.replace('🔗 Image URL: ', '').strip()
-    return None
+# Slides generated at the same time (keep within the account's image rate limit)
+DEFAULT_CONCURRENCY = 3
 
 def download_image(url, filename):
     """Download image with SSL verification disabled"""
     try:
         print(f"📥 Downloading {filename}...")
-        response = requests.get(url, verify=False, timeout=30)
-        
-        if response.status_code == 200:
-            # Create output directory
-            output_dir = Path("../output")
-            output_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Save the image
-            output_path = output_dir / f"{filename}.png"
-            with open(output_path, "wb") as f:
-                f.write(response.content)
-            
-            file_size = len(response.content) // 1024
-            print(f"✅ {filename} downloaded ({file_size} KB)")
-            return True
-        else:
-            print(f"❌ Download failed: HTTP {response.status_code}")
-            return False
-            
+        result = download_file(url, OUTPUT_DIR / f"{filename}.png", verify=False, timeout=(10, 30))
+        get_ledger().update(result.path, status="downloaded")
+        print(f"✅ {filename} downloaded ({result.bytes // 1024} KB)")
+        return True
+
+    except DownloadError as e:
+        print(f"❌ Download failed: {e}")
+        return False
     except Exception as e:
         print(f"❌ Download error: {e}")
         return False
 
-def generate_and_download_slide(slide_name):
-    """Generate a slide and download it immediately"""
+def generate_and_download_slide(slide_name, cache=None, refresh=False, response_format="b64_json"):
+    """
+    Generate a slide straight into the output directory.
+
+    Generation runs in-process through image_generator, so the image URL,
+    status and timings come back on the result instead of being scraped from
+    console output. In b64_json mode (the default) the image arrives inline
+    and nothing can expire; in url mode a failed download is retried here
+    without SSL verification.
+    """
     print(f"\n🎨 Processing {slide_name}...")
-    print("-" * 50)
-    
+
+    def log(message):
+        print(f"[{slide_name}] {message}", flush=True)
+
+    prompt_file = PROMPTS_DIR / f"{slide_name}.md"
     try:
-        # Run the generation script and capture output
-        result = subprocess.run(
-            ["python3", "generate-image.py", slide_name],
-            cwd="/Users/victorsaly/Documents/StormDev/ConquerTheWorldGame/docs/ai-image-prompts/scripts",
-            capture_output=True,
-            text=True,
-            timeout=120
-        )
-        
-        print(result.stdout)
-        
-        if result.stderr:
-            print("Stderr:", result.stderr)
-        
-        # Extract URL from output
-        url = extract_url_from_output(result.stdout)
-        
-        if url:
-            print(f"🔗 Fresh URL obtained: {url[:80]}...")
-            
-            # Download immediately
-            success = download_image(url, slide_name)
-            return success
-        else:
-            print("❌ Could not extract URL from generation output")
-            return False
-            
-    except subprocess.TimeoutExpired:
-        print("❌ Generation timed out")
+        prompt_text = load_prompt(prompt_file)
+    except OSError as e:
+        print(f"❌ Cannot read prompt {prompt_file}: {e}")
         return False
-    except Exception as e:
-        print(f"❌ Generation error: {e}")
+    if not prompt_text:
+        print(f"❌ Could not extract prompt from {prompt_file}")
         return False
 
+    result = generate_image(prompt_text, OUTPUT_DIR / f"{slide_name}.png", size="1792x1024",
+                            response_format=response_format, cache=cache, refresh=refresh, log=log)
+    if result:
+        print(f"✅ {slide_name} saved ({result.size_bytes // 1024} KB)")
+        return True
+
+    # URL mode: the generator's own download may have failed (e.g. SSL), retry it here
+    if result.url:
+        print(f"🔗 Fresh URL obtained: {result.url[:80]}...")
+        return download_image(result.url, slide_name)
+
+    print(f"❌ Generation failed: {result.error}")
+    return False
+
+async def generate_all_slides(concurrency, cache=None, refresh=False, response_format="b64_json"):
+    """Generate and download every slide with a bounded number in flight"""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    total = len(slides)
+
+    async def worker(i, slide):
+        async with semaphore:
+            print(f"\n🎯 Slide {i}/{total}: {slide}")
+            start = time.perf_counter()
+            success = await asyncio.to_thread(generate_and_download_slide, slide, cache, refresh,
+                                              response_format)
+            elapsed = time.perf_counter() - start
+            if success:
+                print(f"✅ Slide {i} complete! ({elapsed:.1f}s)")
+            else:
+                print(f"❌ Slide {i} failed ({elapsed:.1f}s)")
+            return slide, success, elapsed
+
+    return await asyncio.gather(*(worker(i, slide) for i, slide in enumerate(slides, 1)))
+
 def main():
     """Generate and download all carousel slides"""
+    parser = argparse.ArgumentParser(description="Regenerate and download LinkedIn carousel slides")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"slides generated in parallel (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--no-cache", action="store_true", help="bypass the prompt → image cache entirely")
+    parser.add_argument("--refresh", action="store_true", help="regenerate even if a cached image exists")
+    parser.add_argument("--response-format", choices=("b64_json", "url"), default="b64_json",
+                        help="b64_json returns images inline (default); url downloads a 2-hour link")
+    args = parser.parse_args()
+    cache = None if args.no_cache else ImageCache()
+    configure_limiter(burst=args.concurrency)
+
     print("🚀 LinkedIn Carousel Generator & Downloader")
     print("=" * 60)
-    print("This will generate fresh URLs and download all 6 slides")
-    print("Estimated time: 3-5 minutes")
+    print("This will generate and save all 6 slides")
+    print(f"Concurrency: {args.concurrency} slides at a time")
     print("Cost: ~$0.48 (6 slides × $0.08 each)")
     print("=" * 60)
-    
-    successful = 0
+
+    start = time.perf_counter()
+    results = asyncio.run(generate_all_slides(args.concurrency, cache, args.refresh,
+                                          args.response_format))
+    wall_time = time.perf_counter() - start
+
+    successful = sum(1 for _, success, _ in results if success)
     total = len(slides)
-    
-    for i, slide in enumerate(slides, 1):
-        print(f"\n🎯 Slide {i}/{total}: {slide}")
-        
-        if generate_and_download_slide(slide):
-            successful += 1
-            print(f"✅ Slide {i} complete!")
-        else:
-            print(f"❌ Slide {i} failed")
-        
-        # Small delay between generations to be respectful to the API
-        if i < total:
-            print("⏳ Waiting 5 seconds before next generation...")
-            time.sleep(5)
-    
+
     print("\n" + "=" * 60)
+    for slide, success, elapsed in results:
+        print(f"   {'✅' if success else '❌'} {slide:<48} {elapsed:>6.1f}s")
     print(f"📊 Final Results: {successful}/{total} slides successful")
-    
+    print(f"⏱️  Wall time: {wall_time:.1f}s")
+
     if successful == total:
         print("🎉 All carousel slides generated and downloaded!")
         print("📁 Location: docs/ai-image-prompts/output/")
@@ -141,7 +155,7 @@ def main():
         print("   5. Use hashtags: #AIDrivenDevelopment #DeveloperExperience")
     else:
         print(f"⚠️  {total - successful} slides failed. You can retry those individually.")
-    
+
     print("=" * 60)
 
 if __name__ == "__main__":
@@ -42,40 +42,50 @@ declare -a slides=(
 echo "🚀 Generating LinkedIn carousel slides..."
 echo ""
 
-# Generate each slide
+# Collect every slide into one batch manifest so a single generator process
+# handles them all (shared connections, cache and rate limiter)
+MANIFEST="$OUTPUT_DIR/carousel-manifest.json"
+entries=()
 for slide_info in "${slides[@]}"; do
     IFS=':' read -r slide_file slide_name <<< "$slide_info"
-    
-    echo "🎨 Generating: $slide_name"
-    
+
     # Input prompt file
     PROMPT_FILE="docs/ai-image-prompts/linkedin-carousel/${slide_file}.md"
-    
-    # Output image file
-    OUTPUT_FILE="$OUTPUT_DIR/${slide_file}.png"
-    
+
     # Check if prompt file exists
     if [[ ! -f "$PROMPT_FILE" ]]; then
         echo "❌ Prompt file not found: $PROMPT_FILE"
         continue
     fi
-    
-    # Generate the image
+
+    echo "🎨 Queued: $slide_name"
     echo "   📝 Using prompt: $PROMPT_FILE"
-    echo "   💾 Output: $OUTPUT_FILE"
-    
-    cd docs/ai-image-prompts/scripts
-    python3 generate-image.py --prompt-file "../linkedin-carousel/${slide_file}.md" --output "../../../$OUTPUT_FILE" --size "1024x1024"
-    cd ../../../
-    
-    if [[ -f "$OUTPUT_FILE" ]]; then
-        echo "   ✅ Generated successfully!"
-    else
-        echo "   ❌ Generation failed!"
-    fi
-    echo ""
+    echo "   💾 Output: $OUTPUT_DIR/${slide_file}.png"
+    entries+=("{\"prompt_file\": \"$PWD/$PROMPT_FILE\", \"output\": \"${slide_file}.png\", \"size\": \"1024x1024\"}")
 done
 
+if [[ ${#entries[@]} -eq 0 ]]; then
+    echo "❌ No slide prompts found"
+    exit 1
+fi
+
+{
+    echo "["
+    for i in "${!entries[@]}"; do
+        separator=","
+        [[ $i -eq $((${#entries[@]} - 1)) ]] && separator=""
+        echo "  ${entries[$i]}$separator"
+    done
+    echo "]"
+} > "$MANIFEST"
+echo ""
+
+# Generate all slides in one process; the batch report lists any failures
+if ! python3 "$GENERATOR_SCRIPT" --batch "$MANIFEST"; then
+    echo "⚠️  Some slides failed - see the batch report above"
+fi
+echo ""
+
 echo "🎉 Carousel generation complete!"
 echo ""
 echo "📋 Next steps:"